@@ -0,0 +1,199 @@
+"""
+Analytics reports composed from the review_rollups table.
+
+A report covers [start, end) at one-hour resolution. Whole days inside the
+range are read from daily rollups and the partial days at either edge from
+hourly ones, so the rows read grow with the length of the range, never
+with the number of reviews.
+"""
+import hashlib
+import json
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from database import MySQLPool
+from rating_stats import (
+    GLOBAL_SCOPE,
+    GLOBAL_SHARDS,
+    STAR_BUCKETS,
+    day_start,
+    hour_start,
+)
+
+GRANULARITY_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def report_key(params: dict[str, Any]) -> str:
+    """Identical report requests share a key and therefore a job."""
+    content = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def as_utc_naive(moment: datetime | None) -> datetime | None:
+    """Timestamps are stored as naive UTC."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def report_params(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    walker_ids: list[str] | None = None,
+    granularity: str = "day",
+    moving_average_window: int = 7,
+) -> dict[str, Any]:
+    """Canonical, JSON-safe report parameters (the job's params and key)."""
+    start, end = as_utc_naive(start), as_utc_naive(end)
+    return {
+        "report": "summary",
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "walkerIds": sorted(set(walker_ids or [])),
+        "granularity": granularity,
+        "movingAverageWindow": moving_average_window,
+    }
+
+
+def _ceil_hour(moment: datetime) -> datetime:
+    floor = hour_start(moment)
+    return floor if floor == moment else floor + timedelta(hours=1)
+
+
+def _ceil_day(moment: datetime) -> datetime:
+    floor = day_start(moment)
+    return floor if floor == moment else floor + timedelta(days=1)
+
+
+def plan_segments(
+    start: datetime | None, end: datetime | None, granularity: str
+) -> list[tuple[str, datetime | None, datetime | None]]:
+    """Rollup reads (granularity, from, to) that tile [start, end) exactly."""
+    start = hour_start(start) if start else None
+    end = _ceil_hour(end) if end else None
+    if start and end and start >= end:
+        return []
+    if granularity == "hour":
+        return [("hour", start, end)]
+
+    first_day = _ceil_day(start) if start else None
+    last_day = day_start(end) if end else None
+    if first_day and last_day and first_day >= last_day:
+        return [("hour", start, end)]
+
+    segments = [("day", first_day, last_day)]
+    if start and start < first_day:
+        segments.append(("hour", start, first_day))
+    if end and last_day < end:
+        segments.append(("hour", last_day, end))
+    return segments
+
+
+def fetch_buckets(
+    pool: MySQLPool,
+    scopes: list[str],
+    start: datetime | None,
+    end: datetime | None,
+    granularity: str,
+) -> dict[str, dict[datetime, list[float]]]:
+    """
+    Per scope, {bucket start at the report granularity: [count, sum, 1..5 stars]}.
+    GLOBAL_SCOPE sums the rows of all its shards.
+    """
+    buckets: dict[str, dict[datetime, list[float]]] = {s: {} for s in scopes}
+    # Stored walker_id -> scope it adds to
+    stored = {s: s for s in scopes if s != GLOBAL_SCOPE}
+    if GLOBAL_SCOPE in scopes:
+        stored.update(dict.fromkeys(GLOBAL_SHARDS, GLOBAL_SCOPE))
+    scope_sql = ", ".join(["%s"] * len(stored))
+    for rollup, seg_start, seg_end in plan_segments(start, end, granularity):
+        clauses = ["granularity = %s", f"walker_id IN ({scope_sql})"]
+        params: list[Any] = [rollup, *stored]
+        if seg_start is not None:
+            clauses.append("bucket_start >= %s")
+            params.append(seg_start)
+        if seg_end is not None:
+            clauses.append("bucket_start < %s")
+            params.append(seg_end)
+        rows = pool.fetchall_sync(
+            f"SELECT * FROM review_rollups WHERE {' AND '.join(clauses)}",
+            tuple(params),
+        )
+        for row in rows:
+            bucket = row["bucket_start"]
+            if granularity == "day":
+                bucket = day_start(bucket)
+            totals = buckets[stored[row["walker_id"]]].setdefault(bucket, [0] * 7)
+            totals[0] += row["review_count"]
+            totals[1] += float(row["rating_sum"])
+            for i, star in enumerate(STAR_BUCKETS):
+                totals[2 + i] += row[f"stars_{star}"]
+    return buckets
+
+
+def summarize(
+    buckets: dict[datetime, list[float]], granularity: str, window: int
+) -> dict[str, Any]:
+    """Totals, distribution and trend (with moving average) of one scope."""
+    count = sum(b[0] for b in buckets.values())
+    rating_sum = sum(b[1] for b in buckets.values())
+
+    span = GRANULARITY_STEP[granularity] * window
+    recent: deque = deque()
+    window_count = window_sum = 0.0
+    trend = []
+    for bucket in sorted(buckets):
+        bucket_count, bucket_sum = buckets[bucket][0], buckets[bucket][1]
+        if bucket_count <= 0:
+            continue
+        recent.append((bucket, bucket_count, bucket_sum))
+        window_count += bucket_count
+        window_sum += bucket_sum
+        while recent[0][0] <= bucket - span:
+            _, old_count, old_sum = recent.popleft()
+            window_count -= old_count
+            window_sum -= old_sum
+        trend.append(
+            {
+                "bucket": bucket.isoformat(),
+                "count": int(bucket_count),
+                "averageRating": round(bucket_sum / bucket_count, 2),
+                "movingAverage": round(window_sum / window_count, 2),
+            }
+        )
+
+    return {
+        "totalReviews": int(count),
+        "averageRating": round(rating_sum / count, 2) if count > 0 else 0,
+        "distribution": {
+            str(star): int(sum(b[2 + i] for b in buckets.values()))
+            for i, star in enumerate(STAR_BUCKETS)
+        },
+        "trend": trend,
+    }
+
+
+def generate_report(pool: MySQLPool, params: dict[str, Any]) -> dict[str, Any]:
+    start = datetime.fromisoformat(params["start"]) if params.get("start") else None
+    end = datetime.fromisoformat(params["end"]) if params.get("end") else None
+    granularity = params.get("granularity", "day")
+    window = params.get("movingAverageWindow", 7)
+    walker_ids = params.get("walkerIds", [])
+
+    buckets = fetch_buckets(pool, [GLOBAL_SCOPE, *walker_ids], start, end, granularity)
+
+    report = summarize(buckets[GLOBAL_SCOPE], granularity, window)
+    report.update(
+        {
+            "range": {"start": params.get("start"), "end": params.get("end")},
+            "granularity": granularity,
+            "movingAverageWindow": window,
+            "walkers": {
+                walker_id: summarize(buckets[walker_id], granularity, window)
+                for walker_id in walker_ids
+            },
+            "completedAt": datetime.utcnow().isoformat(),
+        }
+    )
+    return report
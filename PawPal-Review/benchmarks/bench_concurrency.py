@@ -0,0 +1,187 @@
+"""Throughput of the Review service as concurrent requests grow.
+
+Drives ``main.app`` in-process over ASGI with ``GET /reviews/{id}`` from
+1, 5, 20 and 100 concurrent clients, twice:
+
+* ``blocking``: queries run inline on the event loop, as handlers did
+  when they called mysql-connector directly;
+* ``async``: the awaitable ``MySQLPool`` methods, which run queries on the
+  pool's bounded executor.
+
+By default the MySQL connection pool is replaced by an in-memory one whose
+queries sleep for ``--latency-ms`` (a network round trip plus server time)
+and which raises, like mysql-connector, when asked for more connections
+than ``pool_size``. ``--real`` uses the database configured in ``.env``.
+
+Usage (from the PawPal-Review directory):
+
+    python -m benchmarks.bench_concurrency --latency-ms 5 --requests 400
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from mysql.connector.errors import PoolError
+
+from database import mysql_pool
+
+REVIEW_ID = "550e8400-e29b-41d4-a716-446655440001"
+ROW = {
+    "id": REVIEW_ID,
+    "walk_id": "walk-001",
+    "owner_id": "owner-alice",
+    "walker_id": "walker-bob",
+    "rating": 5.0,
+    "comment": "Excellent service!",
+    "created_at": datetime(2025, 11, 20, 10, 0),
+    "updated_at": datetime(2025, 11, 20, 10, 0),
+}
+
+
+class FakeCursor:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        time.sleep(self.latency)
+
+    def fetchone(self):
+        return dict(ROW)
+
+    def fetchall(self):
+        return [dict(ROW)]
+
+
+class FakeConnection:
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.pool.latency)
+
+    def commit(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.pool.checked_out -= 1
+
+
+class FakePool:
+    def __init__(self, size: int, latency: float):
+        self.size = size
+        self.latency = latency
+        self.checked_out = 0
+
+    def get_connection(self):
+        if self.checked_out >= self.size:
+            raise PoolError("Failed getting connection; pool exhausted")
+        self.checked_out += 1
+        return FakeConnection(self)
+
+
+def use_blocking_queries() -> None:
+    """Restore the pre-executor behaviour: queries block the event loop."""
+
+    async def execute(sql, params=None):
+        return mysql_pool.execute_sync(sql, params)
+
+    async def fetchall(sql, params=None):
+        return mysql_pool.fetchall_sync(sql, params)
+
+    async def fetchone(sql, params=None):
+        return mysql_pool.fetchone_sync(sql, params)
+
+    mysql_pool.execute = execute
+    mysql_pool.fetchall = fetchall
+    mysql_pool.fetchone = fetchone
+
+
+async def get(app, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    status = 0
+    # Yield as a network read would, so the request queues behind the others
+    await asyncio.sleep(0)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, concurrency: int, requests: int) -> tuple[float, float, int]:
+    """(requests/sec, p99 latency in ms, errors) for ``requests`` spread over ``concurrency`` clients."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            if await get(app, f"/reviews/{REVIEW_ID}") != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000
+    return len(latencies) / elapsed, p99, errors
+
+
+async def run(args) -> None:
+    from main import app
+
+    if not args.real:
+        mysql_pool.pool = FakePool(mysql_pool._pool_size, args.latency_ms / 1000)
+        mysql_pool._initialized = True
+    source = "configured MySQL" if args.real else f"simulated {args.latency_ms:g} ms queries"
+    print(f"GET /reviews/{{id}}, {source}, pool_size {mysql_pool._pool_size}")
+    print(f"{'mode':<10}{'clients':>8}{'req/s':>10}{'p99 ms':>10}{'errors':>8}")
+
+    modes = [("async", None), ("blocking", use_blocking_queries)]
+    for mode, setup in modes:
+        if setup is not None:
+            setup()
+        for concurrency in args.concurrency:
+            rate, p99, errors = await measure(app, concurrency, args.requests)
+            print(f"{mode:<10}{concurrency:>8}{rate:>10,.0f}{p99:>10.1f}{errors:>8}")
+    mysql_pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=400, help="Requests per run.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 20, 100])
+    parser.add_argument("--real", action="store_true", help="Query the database from .env.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
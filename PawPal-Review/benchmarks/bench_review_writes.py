@@ -0,0 +1,223 @@
+"""Throughput of concurrent review writes as the shared rows are sharded.
+
+Every ``POST /reviews`` also updates rows other writes touch: the walker's
+stats, the hourly and daily rollups for the walker and for all walkers,
+and the ``reviews`` data version. Rows shared by all walkers serialize
+every write on their locks until commit. This drives ``main.app`` in-process
+over ASGI with creates for ``--walkers`` random walkers from 1, 5, 20 and 100
+concurrent clients, once per ``--shards`` value (``rating_stats.WRITE_SHARDS``;
+1 is a single global row, as before sharding).
+
+By default the MySQL connection pool is replaced by an in-memory one whose
+statements sleep for ``--latency-ms`` and which models InnoDB row locks on
+those aggregate rows: a statement waits for rows another open transaction
+has written and holds them until its own commit. ``--real`` writes to the
+database configured in ``.env``; use a scratch database, as the reviews
+are kept.
+
+Usage (from the PawPal-Review directory):
+
+    python -m benchmarks.bench_review_writes --latency-ms 2 --requests 400
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from mysql.connector.errors import PoolError
+
+import rating_stats
+from database import mysql_pool
+
+
+class RowLocks:
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: dict[tuple, threading.Lock] = {}
+
+    def get(self, key: tuple) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+def locked_rows(sql: str, params) -> list[tuple]:
+    """Aggregate rows a write statement locks, in statement order."""
+    if "INTO walker_rating_stats" in sql:
+        return [("walker_rating_stats", params[0])]
+    if "INTO review_rollups" in sql:
+        return [
+            ("review_rollups", *params[i : i + 3]) for i in range(0, len(params), 10)
+        ]
+    if "INTO data_versions" in sql:
+        return [("data_versions", params[0], params[1])]
+    return []
+
+
+class FakeCursor:
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        for key in locked_rows(sql, params or ()):
+            self.conn.lock(key)
+        time.sleep(self.conn.pool.latency)
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+
+class FakeConnection:
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+        self.held: dict[tuple, threading.Lock] = {}
+
+    def lock(self, key: tuple) -> None:
+        if key not in self.held:
+            lock = self.pool.rows.get(key)
+            lock.acquire()
+            self.held[key] = lock
+
+    def start_transaction(self):
+        pass
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        time.sleep(self.pool.latency)
+        self.release()
+
+    def rollback(self):
+        self.release()
+
+    def release(self):
+        for lock in self.held.values():
+            lock.release()
+        self.held.clear()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.release()
+        self.pool.checked_out -= 1
+
+
+class FakePool:
+    def __init__(self, size: int, latency: float):
+        self.size = size
+        self.latency = latency
+        self.checked_out = 0
+        self.rows = RowLocks()
+
+    def get_connection(self):
+        if self.checked_out >= self.size:
+            raise PoolError("Failed getting connection; pool exhausted")
+        self.checked_out += 1
+        return FakeConnection(self)
+
+
+async def post(app, path: str, body: dict) -> int:
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+    }
+    status = 0
+    await asyncio.sleep(0)
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(
+    app, concurrency: int, requests: int, walkers: int
+) -> tuple[float, float, int]:
+    """(writes/sec, p99 latency in ms, errors) for ``requests`` creates over ``concurrency`` clients."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            body = {
+                "walkId": "walk-bench",
+                "ownerId": "owner-bench",
+                "walkerId": f"walker-bench-{random.randrange(walkers)}",
+                "rating": random.choice([1.0, 2.5, 3.0, 4.5, 5.0]),
+            }
+            started = time.perf_counter()
+            if await post(app, "/reviews", body) != 201:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000
+    return len(latencies) / elapsed, p99, errors
+
+
+async def run(args) -> None:
+    from main import app
+
+    if not args.real:
+        mysql_pool.pool = FakePool(mysql_pool._pool_size, args.latency_ms / 1000)
+        mysql_pool._initialized = True
+    source = "configured MySQL" if args.real else f"simulated {args.latency_ms:g} ms queries"
+    print(f"POST /reviews, {args.walkers} walkers, {source}, pool_size {mysql_pool._pool_size}")
+    print(f"{'shards':<8}{'clients':>8}{'writes/s':>10}{'p99 ms':>10}{'errors':>8}")
+
+    for shards in args.shards:
+        rating_stats.WRITE_SHARDS = shards
+        for concurrency in args.concurrency:
+            rate, p99, errors = await measure(
+                app, concurrency, args.requests, args.walkers
+            )
+            print(f"{shards:<8}{concurrency:>8}{rate:>10,.0f}{p99:>10.1f}{errors:>8}")
+    mysql_pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--requests", type=int, default=400, help="Writes per run.")
+    parser.add_argument("--walkers", type=int, default=1000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 20, 100])
+    parser.add_argument("--real", action="store_true", help="Write to the database from .env.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,23 @@ export CONNECTION_NAME=
   --tag gcr.io/$PROJECT_ID/pawpal-review \
   --project $PROJECT_ID
 
+# Release step: apply schema migrations once, with the new image, before any
+# instance of it starts (instances refuse to serve on a stale schema)
+~/google-cloud-sdk/bin/gcloud run jobs deploy pawpal-review-migrate \
+  --image gcr.io/$PROJECT_ID/pawpal-review \
+  --region $REGION \
+  --set-cloudsql-instances $CONNECTION_NAME \
+  --command python \
+  --args=-m,migrations \
+  --task-timeout 3600 \
+  --max-retries 0 \
+  --project $PROJECT_ID
+
+~/google-cloud-sdk/bin/gcloud run jobs execute pawpal-review-migrate \
+  --region $REGION \
+  --wait \
+  --project $PROJECT_ID || exit 1
+
 ~/google-cloud-sdk/bin/gcloud run deploy pawpal-review \
   --image gcr.io/$PROJECT_ID/pawpal-review \
   --platform managed \
@@ -0,0 +1,93 @@
+import threading
+import time
+from typing import Any, Callable
+
+Filters = dict[str, Any]
+
+
+class CountCache:
+    """
+    Per-filter row counts for the list endpoints.
+
+    Counts are kept current for writes made by this process: callers pass
+    every inserted, updated or deleted row to adjust(), which shifts each
+    cached count whose filters match it. Writes from other instances are
+    only picked up once an entry is older than ttl seconds: lookup() then
+    still returns it, marked stale, and the caller recounts in the
+    background, claiming the key with start_refresh() so only one count
+    per filter set runs at a time.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, tuple[dict, int, float]] = {}
+        self._generations: dict[str, int] = {}
+        self._refreshing: set[tuple] = set()
+
+    @staticmethod
+    def _key(table: str, filters: Filters) -> tuple:
+        items = sorted((k, v) for k, v in filters.items() if v is not None)
+        return (table,) + tuple(items)
+
+    def generation(self, table: str) -> int:
+        """Pass to put() so a count that raced with a write is not cached."""
+        return self._generations.get(table, 0)
+
+    def lookup(self, table: str, filters: Filters) -> tuple[int | None, bool]:
+        """(last known count or None, whether it is younger than ttl)."""
+        key = self._key(table, filters)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            return entry[1], time.monotonic() - entry[2] <= self.ttl
+
+    def start_refresh(self, table: str, filters: Filters) -> bool:
+        """Claim the recount of these filters; False if one is running."""
+        key = self._key(table, filters)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def finish_refresh(self, table: str, filters: Filters) -> None:
+        with self._lock:
+            self._refreshing.discard(self._key(table, filters))
+
+    def put(self, table: str, filters: Filters, total: int, generation: int) -> None:
+        with self._lock:
+            if self._generations.get(table, 0) != generation:
+                return
+            if len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][2])
+                del self._entries[oldest]
+            self._entries[self._key(table, filters)] = (
+                dict(filters),
+                total,
+                time.monotonic(),
+            )
+
+    def adjust(
+        self,
+        table: str,
+        row: dict[str, Any],
+        delta: int,
+        matches: Callable[[Filters, dict[str, Any]], bool],
+    ) -> None:
+        """Add delta to every cached count of table whose filters match row."""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key, (filters, total, stored_at) in self._entries.items():
+                if key[0] == table and matches(filters, row):
+                    self._entries[key] = (filters, max(total + delta, 0), stored_at)
+
+    def invalidate(self, table: str) -> None:
+        """Mark every count of table stale; lookup() keeps serving it until recounted."""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key, (filters, total, _) in self._entries.items():
+                if key[0] == table:
+                    self._entries[key] = (filters, total, float("-inf"))
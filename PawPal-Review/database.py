@@ -1,5 +1,9 @@
+import asyncio
+import functools
 import os
-from typing import Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
 import mysql.connector
 from mysql.connector.pooling import PooledMySQLConnection
 from dotenv import load_dotenv
@@ -13,6 +17,8 @@ CLOUD_SQL_CONNECTION_NAME = os.getenv("CLOUD_SQL_CONNECTION_NAME")
 
 DB_SOCKET_DIR = "/cloudsql"
 
+T = TypeVar("T")
+
 MYSQL_CONFIG: dict[str, str | int] = {
     "user": DB_USER,
     "password": DB_PASS,
@@ -22,6 +28,15 @@ MYSQL_CONFIG: dict[str, str | int] = {
 
 
 class MySQLPool:
+    """Pooled MySQL access with awaitable query methods.
+
+    mysql-connector is a blocking driver, so every query runs on a dedicated
+    thread pool with one worker per pooled connection. A slow query then
+    holds one worker instead of the event loop, and the pool can never be
+    asked for more connections than it has: excess queries wait in the
+    executor queue rather than failing with "pool exhausted".
+    """
+
     def __init__(self, pool_size: int, **kwargs: dict[str, Any]) -> None:
         self._user: str = kwargs.get("user", "root")
         self._password: str = kwargs.get("password", "")
@@ -38,9 +53,15 @@ class MySQLPool:
 
         self.pool = None
         self._initialized = False
+        self._init_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
 
     def _ensure_initialized(self) -> None:
-        if not self._initialized:
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
             self.pool = mysql.connector.pooling.MySQLConnectionPool(
                 pool_name="cloudSQL_pool",
                 pool_size=self._pool_size,
@@ -55,6 +76,27 @@ class MySQLPool:
     def initialize(self) -> None:
         self._ensure_initialized()
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so that gunicorn's --preload fork happens
+        # before any worker thread exists.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._pool_size, thread_name_prefix="mysql"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking callable on the database executor and await it."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args)
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
     def get_connection(self) -> PooledMySQLConnection:
         self._ensure_initialized()
         return self.pool.get_connection()
@@ -62,7 +104,7 @@ class MySQLPool:
     def close(self, sql_conns: PooledMySQLConnection) -> None:
         sql_conns.close()
 
-    def execute(self, sql: str, params: tuple[Any, ...] | None = None) -> None:
+    def execute_sync(self, sql: str, params: tuple[Any, ...] | None = None) -> None:
         conn = self.get_connection()
         try:
             with conn.cursor() as cursor:
@@ -73,7 +115,7 @@ class MySQLPool:
         finally:
             conn.close()
 
-    def fetchall(
+    def fetchall_sync(
         self, sql: str, params: tuple[Any, ...] | None = None
     ) -> list[dict[str, Any]]:
         conn = self.get_connection()
@@ -86,7 +128,7 @@ class MySQLPool:
         finally:
             conn.close()
 
-    def fetchone(
+    def fetchone_sync(
         self, sql: str, params: tuple[Any, ...] | None = None
     ) -> dict[str, Any] | None:
         conn = self.get_connection()
@@ -100,5 +142,44 @@ class MySQLPool:
             if conn.is_connected():
                 conn.close()
 
+    def transaction_sync(self, work: Callable[[Any], T]) -> T:
+        """Run work(cursor) on one connection as a single transaction.
+
+        This is a write request's unit of work: every statement runs on the
+        same connection and executor thread, with one checkout and one
+        commit. The cursor returns rows as dictionaries. The transaction
+        commits if work returns and rolls back if it raises.
+        """
+        conn = self.get_connection()
+        try:
+            conn.start_transaction()
+            with conn.cursor(dictionary=True) as cursor:
+                result = work(cursor)
+            conn.commit()
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    async def execute(self, sql: str, params: tuple[Any, ...] | None = None) -> None:
+        await self.run(self.execute_sync, sql, params)
+
+    async def fetchall(
+        self, sql: str, params: tuple[Any, ...] | None = None
+    ) -> list[dict[str, Any]]:
+        return await self.run(self.fetchall_sync, sql, params)
+
+    async def fetchone(
+        self, sql: str, params: tuple[Any, ...] | None = None
+    ) -> dict[str, Any] | None:
+        return await self.run(self.fetchone_sync, sql, params)
+
+    async def transaction(self, work: Callable[[Any], T]) -> T:
+        return await self.run(self.transaction_sync, work)
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
 
-mysql_pool = MySQLPool(5, **MYSQL_CONFIG)
+mysql_pool = MySQLPool(DB_POOL_SIZE, **MYSQL_CONFIG)
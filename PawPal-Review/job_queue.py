@@ -0,0 +1,267 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any
+
+from mysql.connector.errors import IntegrityError
+
+from database import MySQLPool, mysql_pool
+
+SUBMIT_ATTEMPTS = 3
+
+# Walks idx_jobs_status_created in created_at order and stops at the first
+# due, unlocked row, so claiming neither sorts nor locks the whole backlog
+CLAIM_SQL = """
+    SELECT * FROM analytics_jobs
+    WHERE status = 'pending' AND (run_after IS NULL OR run_after <= %s)
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+"""
+
+
+def read_data_version(cursor: Any, name: str = "reviews") -> int:
+    """The dataset's version: the sum of its shard counters."""
+    cursor.execute(
+        "SELECT COALESCE(SUM(version), 0) AS version FROM data_versions "
+        "WHERE name = %s",
+        (name,),
+    )
+    row = cursor.fetchone()
+    return int(row["version"]) if row else 0
+
+
+def bump_data_version(cursor: Any, shard: int = 0, name: str = "reviews") -> None:
+    """
+    Mark the dataset as changed by incrementing one shard counter (see
+    rating_stats.write_shard); any bump raises the sum. Run inside the
+    writing transaction, and last, since the counter row stays locked until
+    commit.
+    """
+    cursor.execute(
+        """
+        INSERT INTO data_versions (name, shard, version) VALUES (%s, %s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+        """,
+        (name, shard),
+    )
+
+
+class JobQueue:
+    """
+    Analytics jobs as a durable queue on the analytics_jobs table.
+
+    A job is pending until a worker claims it. Claiming locks the oldest due
+    row with FOR UPDATE SKIP LOCKED, so concurrent workers never block on or
+    double-claim the same job, and marks it processing under a lease that
+    the worker renews by heartbeat. Completion and failure only apply while
+    the worker still owns the lease. A job whose lease expires (worker
+    crashed or was restarted) is put back to pending by reap(); failed
+    attempts are retried with exponential backoff up to max_attempts.
+
+    Jobs are submitted under a request key. A completed job whose report
+    was computed at the current data version is reused instead of queueing
+    a new one, and inflight_key (unique while a job is pending or
+    processing) coalesces identical requests onto the job already running.
+
+    All methods are blocking; call them through MySQLPool.run from async
+    code.
+    """
+
+    def __init__(
+        self,
+        pool: MySQLPool,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        retry_delay: float = 10.0,
+    ) -> None:
+        self.pool = pool
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def submit(
+        self, job_id: str, request_key: str, params: str | None = None
+    ) -> tuple[dict[str, Any], str]:
+        """
+        Return the job answering request_key and how it was found:
+        "reused" (completed at the current data version), "coalesced"
+        (identical job pending or processing) or "queued" (new job job_id,
+        stored with the JSON report request params).
+        """
+
+        def work(cursor) -> tuple[dict[str, Any], str]:
+            cursor.execute(
+                """
+                SELECT * FROM analytics_jobs
+                WHERE request_key = %s AND data_version = %s AND status = 'completed'
+                ORDER BY completed_at DESC
+                LIMIT 1
+                """,
+                (request_key, read_data_version(cursor)),
+            )
+            job = cursor.fetchone()
+            if job is not None:
+                return job, "reused"
+
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO analytics_jobs
+                        (id, status, created_at, max_attempts, request_key,
+                         inflight_key, params)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (
+                        job_id,
+                        "pending",
+                        datetime.utcnow(),
+                        self.max_attempts,
+                        request_key,
+                        request_key,
+                        params,
+                    ),
+                )
+            except IntegrityError:
+                # A locking read sees the committed in-flight job even though
+                # it postdates this transaction's snapshot
+                cursor.execute(
+                    "SELECT * FROM analytics_jobs WHERE inflight_key = %s FOR SHARE",
+                    (request_key,),
+                )
+                job = cursor.fetchone()
+                if job is None:
+                    raise
+                return job, "coalesced"
+
+            cursor.execute("SELECT * FROM analytics_jobs WHERE id = %s", (job_id,))
+            return cursor.fetchone(), "queued"
+
+        # The in-flight job can finish between the failed INSERT and the
+        # lookup; the next attempt then finds it completed or queues anew
+        for attempt in range(SUBMIT_ATTEMPTS):
+            try:
+                return self.pool.transaction_sync(work)
+            except IntegrityError:
+                if attempt == SUBMIT_ATTEMPTS - 1:
+                    raise
+
+    def data_version(self) -> int:
+        return self.pool.transaction_sync(read_data_version)
+
+    def claim(self, worker_id: str) -> dict[str, Any] | None:
+        """Lease the oldest due pending job to worker_id, or return None."""
+
+        def work(cursor) -> dict[str, Any] | None:
+            now = datetime.utcnow()
+            cursor.execute(CLAIM_SQL, (now,))
+            job = cursor.fetchone()
+            if job is None:
+                return None
+            cursor.execute(
+                """
+                UPDATE analytics_jobs
+                SET status = 'processing', lease_owner = %s, lease_expires_at = %s,
+                    heartbeat_at = %s, attempts = attempts + 1
+                WHERE id = %s
+                """,
+                (worker_id, self._lease_end(now), now, job["id"]),
+            )
+            job["attempts"] += 1
+            return job
+
+        return self.pool.transaction_sync(work)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False if worker_id no longer owns the job."""
+        now = datetime.utcnow()
+        return self._update_owned(
+            job_id,
+            worker_id,
+            "lease_expires_at = %s, heartbeat_at = %s",
+            (self._lease_end(now), now),
+        )
+
+    def complete(
+        self, job_id: str, worker_id: str, result: str, data_version: int
+    ) -> bool:
+        return self._update_owned(
+            job_id,
+            worker_id,
+            """
+            status = 'completed', completed_at = %s, result = %s,
+            data_version = %s, inflight_key = NULL,
+            lease_owner = NULL, lease_expires_at = NULL, last_error = NULL
+            """,
+            (datetime.utcnow(), result, data_version),
+        )
+
+    def fail(self, job: dict[str, Any], worker_id: str, error: str) -> bool:
+        """Schedule a retry with backoff, or fail the job after max_attempts."""
+        now = datetime.utcnow()
+        if job["attempts"] < job["max_attempts"]:
+            delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+            return self._update_owned(
+                job["id"],
+                worker_id,
+                """
+                status = 'pending', run_after = %s, last_error = %s,
+                lease_owner = NULL, lease_expires_at = NULL
+                """,
+                (now + timedelta(seconds=delay), error[:2000]),
+            )
+        return self._update_owned(
+            job["id"],
+            worker_id,
+            """
+            status = 'failed', completed_at = %s, last_error = %s,
+            inflight_key = NULL, lease_owner = NULL, lease_expires_at = NULL
+            """,
+            (now, error[:2000]),
+        )
+
+    def reap(self) -> int:
+        """Requeue (or fail, when out of attempts) jobs whose lease has expired."""
+
+        def work(cursor) -> int:
+            now = datetime.utcnow()
+            cursor.execute(
+                """
+                UPDATE analytics_jobs
+                SET status = IF(attempts >= max_attempts, 'failed', 'pending'),
+                    completed_at = IF(attempts >= max_attempts, %s, NULL),
+                    inflight_key = IF(attempts >= max_attempts, NULL, inflight_key),
+                    last_error = 'lease expired',
+                    lease_owner = NULL, lease_expires_at = NULL
+                WHERE status = 'processing' AND lease_expires_at < %s
+                """,
+                (now, now),
+            )
+            return cursor.rowcount
+
+        return self.pool.transaction_sync(work)
+
+    def _lease_end(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.lease_seconds)
+
+    def _update_owned(
+        self, job_id: str, worker_id: str, assignments: str, params: tuple
+    ) -> bool:
+        def work(cursor) -> bool:
+            cursor.execute(
+                f"""
+                UPDATE analytics_jobs SET {assignments}
+                WHERE id = %s AND lease_owner = %s AND status = 'processing'
+                """,
+                params + (job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        return self.pool.transaction_sync(work)
+
+
+job_queue = JobQueue(
+    mysql_pool,
+    lease_seconds=float(os.getenv("ANALYTICS_LEASE_SECONDS", "60")),
+    max_attempts=int(os.getenv("ANALYTICS_MAX_ATTEMPTS", "3")),
+    retry_delay=float(os.getenv("ANALYTICS_RETRY_DELAY", "10")),
+)
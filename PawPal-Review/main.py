@@ -1,19 +1,58 @@
 from fastapi import FastAPI, HTTPException, Header, Response, Request, status
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from contextlib import asynccontextmanager
 import uuid
 import asyncio
-from enum import Enum
 import json
+from enum import Enum
+import os
 
-from utils import generate_etag
+from utils import generate_etag, encode_cursor, decode_cursor
 from database import mysql_pool
+from count_cache import CountCache
+from rating_stats import record_rating, row_to_rating, write_shard
+from job_queue import bump_data_version, job_queue
+from worker import AnalyticsWorker
+from analytics import report_key, report_params
+from migrations import check_schema
+
+MAX_PAGE_OFFSET = int(os.getenv("MAX_PAGE_OFFSET", "1000"))
+
+MAX_BATCH_WALKERS = int(os.getenv("MAX_BATCH_WALKERS", "100"))
+ANALYTICS_INPROCESS_WORKERS = int(os.getenv("ANALYTICS_INPROCESS_WORKERS", "1"))
+MAX_REPORT_WALKERS = int(os.getenv("MAX_REPORT_WALKERS", "50"))
+
+GENERATE_MESSAGES = {
+    "queued": "Analytics generation queued",
+    "coalesced": "Identical analytics job already in progress",
+    "reused": "No reviews changed since this report was generated",
+}
+
+count_cache = CountCache(ttl=float(os.getenv("COUNT_CACHE_TTL", "30")))
+count_refreshes: Set[asyncio.Task] = set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await mysql_pool.run(check_schema, mysql_pool)
+    stop = asyncio.Event()
+    workers = [
+        asyncio.create_task(AnalyticsWorker(mysql_pool, job_queue).run(stop))
+        for _ in range(ANALYTICS_INPROCESS_WORKERS)
+    ]
+    yield
+    stop.set()
+    await asyncio.gather(*workers, return_exceptions=True)
+    mysql_pool.shutdown()
 
 
 app = FastAPI(
     title="PawPal Review Service",
     description="Microservice for managing reviews and ratings in PawPal dog-walking coordination system.",
+    lifespan=lifespan,
 )
 
 
@@ -48,6 +87,24 @@ class PaginatedReviews(BaseModel):
     links: Dict[str, Optional[str]]
 
 
+class WalkReviews(BaseModel):
+    walkId: str
+    data: List[Review]
+    links: Dict[str, str]
+
+
+class WalkerRating(BaseModel):
+    walkerId: str
+    reviewCount: int
+    averageRating: Optional[float] = None
+    histogram: Dict[str, int]
+    links: Optional[Dict[str, str]] = None
+
+
+class WalkerRatings(BaseModel):
+    data: List[WalkerRating]
+
+
 class JobStatus(str, Enum):
     pending = "pending"
     processing = "processing"
@@ -55,6 +112,19 @@ class JobStatus(str, Enum):
     failed = "failed"
 
 
+class Granularity(str, Enum):
+    hour = "hour"
+    day = "day"
+
+
+class AnalyticsRequest(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    walkerIds: List[str] = Field(default_factory=list)
+    granularity: Granularity = Granularity.day
+    movingAverageWindow: int = Field(7, ge=1, le=365)
+
+
 class AnalyticsJobResponse(BaseModel):
     jobId: str
     status: JobStatus
@@ -63,12 +133,23 @@ class AnalyticsJobResponse(BaseModel):
     result: Optional[str] = ""
 
 
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
 class PaginatedJobs(BaseModel):
     data: List[AnalyticsJobResponse]
     pagination: Dict[str, Any]
     links: Dict[str, Optional[str]]
 
 
+def stored_rating(rating: float) -> Decimal:
+    """The value reviews.rating (DECIMAL(2,1)) stores for rating."""
+    return Decimal(str(rating)).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
+
+
 def row_to_review(row: dict) -> dict:
     return {
         "id": row["id"],
@@ -104,53 +185,278 @@ def add_review_links(review: dict, request: Request) -> dict:
     return review_copy
 
 
-async def process_analytics_job(job_id: str):
-    await asyncio.sleep(1)
+def add_rating_links(rating: dict, request: Request) -> dict:
+    base_url = str(request.base_url).rstrip("/")
+    rating_copy = rating.copy()
+    rating_copy["links"] = {
+        "self": f"{base_url}/walkers/{rating['walkerId']}/rating",
+        "reviews": f"{base_url}/reviews?walkerId={rating['walkerId']}",
+    }
+    return rating_copy
+
+
+def review_filters(
+    walkerId: Optional[str] = None,
+    ownerId: Optional[str] = None,
+    walkId: Optional[str] = None,
+    minRating: Optional[float] = None,
+    maxRating: Optional[float] = None,
+) -> Tuple[List[str], List[Any]]:
+    where_clauses = []
+    params = []
+
+    if walkerId:
+        where_clauses.append("walker_id = %s")
+        params.append(walkerId)
+
+    if ownerId:
+        where_clauses.append("owner_id = %s")
+        params.append(ownerId)
+
+    if walkId:
+        where_clauses.append("walk_id = %s")
+        params.append(walkId)
+
+    if minRating is not None:
+        where_clauses.append("rating >= %s")
+        params.append(minRating)
+
+    if maxRating is not None:
+        where_clauses.append("rating <= %s")
+        params.append(maxRating)
+
+    return where_clauses, params
+
+
+def review_matches(filters: Dict[str, Any], row: dict) -> bool:
+    """Whether a reviews row satisfies review_filters(**filters)."""
+    rating = float(row["rating"])
+    return (
+        filters.get("walkerId") in (None, row["walker_id"])
+        and filters.get("ownerId") in (None, row["owner_id"])
+        and filters.get("walkId") in (None, row["walk_id"])
+        and (filters.get("minRating") is None or rating >= filters["minRating"])
+        and (filters.get("maxRating") is None or rating <= filters["maxRating"])
+    )
+
+
+async def count_exact(
+    table: str, where_sql: str, params: List[Any], filters: Dict[str, Any]
+) -> int:
+    generation = count_cache.generation(table)
+    count_result = await mysql_pool.fetchone(
+        f"SELECT COUNT(*) as total FROM {table}{where_sql}",
+        tuple(params) if params else None,
+    )
+    total = count_result["total"]
+    count_cache.put(table, filters, total, generation)
+    return total
+
+
+def refresh_count(
+    table: str, where_sql: str, params: List[Any], filters: Dict[str, Any]
+) -> None:
+    """Recount in the background unless a recount of these filters is running."""
+    if not count_cache.start_refresh(table, filters):
+        return
+
+    async def refresh() -> None:
+        try:
+            await count_exact(table, where_sql, params, filters)
+        except Exception as e:
+            print(f"Count refresh for {table} failed: {e}")
+        finally:
+            count_cache.finish_refresh(table, filters)
+
+    task = asyncio.create_task(refresh())
+    count_refreshes.add(task)
+    task.add_done_callback(count_refreshes.discard)
+
+
+async def count_rows(
+    table: str,
+    where_sql: str,
+    params: List[Any],
+    filters: Dict[str, Any],
+    mode: CountMode,
+) -> Optional[int]:
+    """
+    Total rows of table matching the filters, as chosen by the count mode.
 
+    Exact counts run COUNT(*) and refresh the cache. Estimate never counts
+    on the request path: it returns the last known count, even if expired,
+    or None on a miss, and recounts in the background when the count is
+    missing or stale.
+    """
+    if mode == CountMode.none:
+        return None
+    if mode == CountMode.estimate:
+        cached, fresh = count_cache.lookup(table, filters)
+        if not fresh:
+            refresh_count(table, where_sql, params, filters)
+        return cached
+    return await count_exact(table, where_sql, params, filters)
+
+
+def page_summary(
+    limit: int, page: Optional[int], total: Optional[int], mode: CountMode
+) -> Dict[str, Any]:
+    pagination: Dict[str, Any] = {"limit": limit, "count": mode.value}
+    if total is not None:
+        pagination["total"] = total
+        pagination["totalPages"] = (total + limit - 1) // limit if limit > 0 else 1
+    if page is not None:
+        pagination["page"] = page
+    return pagination
+
+
+def parse_cursor(token: str) -> dict:
     try:
-        result = mysql_pool.fetchone(
-            "SELECT COUNT(*) as total, AVG(rating) as avg_rating FROM reviews"
-        )
+        cursor = decode_cursor(token)
+        if cursor.get("d") not in ("next", "prev"):
+            raise ValueError("Unknown cursor direction")
+        if "c" in cursor:
+            cursor["c"] = datetime.fromisoformat(cursor["c"])
+            cursor["i"] = str(cursor["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cursor
+
+
+def row_cursor(row: dict, direction: str) -> str:
+    return encode_cursor(
+        {"d": direction, "c": row["created_at"].isoformat(sep=" "), "i": row["id"]}
+    )
 
-        total = result["total"] if result else 0
-        avg_rating = (
-            float(result["avg_rating"]) if result and result["avg_rating"] else 0
-        )
 
-        mysql_pool.execute(
-            """
-            UPDATE analytics_jobs 
-            SET status = %s, completed_at = %s, result = %s
-            WHERE id = %s
-            """,
-            (
-                JobStatus.completed,
-                datetime.utcnow(),
-                json.dumps(
-                    {
-                        "totalReviews": total,
-                        "averageRating": round(avg_rating, 2),
-                        "completedAt": datetime.utcnow().isoformat(),
-                    }
-                ),
-                job_id,
-            ),
+def resolve_page(
+    cursor: Optional[str], page: int, limit: int
+) -> Tuple[Optional[dict], Optional[int], int]:
+    """
+    Return (cursor position, page number, offset) for a list request.
+
+    A cursor wins over page; page numbers are only honoured while the offset
+    stays within MAX_PAGE_OFFSET rows.
+    """
+    if cursor:
+        return parse_cursor(cursor), None, 0
+    page = max(1, page)
+    offset = (page - 1) * limit
+    if offset > MAX_PAGE_OFFSET:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Page offset beyond {MAX_PAGE_OFFSET} rows; follow links.next instead",
         )
-    except Exception as e:
-        print(f"Error processing analytics job {job_id}: {e}")
-        try:
-            mysql_pool.execute(
-                "UPDATE analytics_jobs SET status = %s WHERE id = %s",
-                (JobStatus.failed, job_id),
-            )
-        except Exception as update_error:
-            print(f"Error updating job status to failed: {update_error}")
+    return None, page, offset
+
+
+def keyset_query(
+    table: str,
+    where_clauses: List[str],
+    params: List[Any],
+    limit: int,
+    cursor: Optional[dict] = None,
+    offset: int = 0,
+) -> Tuple[str, tuple]:
+    """
+    Build the SQL and parameters for one page of table in keyset order.
+
+    Fetches limit + 1 rows so the caller can tell whether another page
+    follows.
+    """
+    clauses = list(where_clauses)
+    args = list(params)
+    backward = cursor is not None and cursor["d"] == "prev"
+
+    if cursor is not None and "c" in cursor:
+        op = ">" if backward else "<"
+        clauses.append(f"(created_at {op} %s OR (created_at = %s AND id {op} %s))")
+        args += [cursor["c"], cursor["c"], cursor["i"]]
+
+    where_sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+    order = "ASC" if backward else "DESC"
+
+    query = f"""
+        SELECT * FROM {table}
+        {where_sql}
+        ORDER BY created_at {order}, id {order}
+        LIMIT %s OFFSET %s
+    """
+    return query, tuple(args + [limit + 1, offset])
+
+
+async def fetch_keyset_page(
+    table: str,
+    where_clauses: List[str],
+    params: List[Any],
+    limit: int,
+    cursor: Optional[dict] = None,
+    offset: int = 0,
+) -> Tuple[List[dict], bool, bool]:
+    """
+    Fetch one page of table ordered by (created_at, id) descending.
+
+    Pages after a cursor seek past its key instead of skipping rows, so deep
+    pages cost the same as the first one. A "prev" cursor without a key
+    starts from the end of the collection. Returns (rows, has_prev, has_next).
+    """
+    backward = cursor is not None and cursor["d"] == "prev"
+    keyed = cursor is not None and "c" in cursor
+
+    query, args = keyset_query(table, where_clauses, params, limit, cursor, offset)
+    rows = await mysql_pool.fetchall(query, args)
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+        return rows, more, keyed
+    return rows, offset > 0 or keyed, more
+
+
+def page_links(
+    collection_url: str,
+    query_string: str,
+    rows: List[dict],
+    page: Optional[int],
+    cursor: Optional[str],
+    total_pages: Optional[int],
+    limit: int,
+    has_prev: bool,
+    has_next: bool,
+) -> Dict[str, Optional[str]]:
+    if cursor:
+        self_link = f"{collection_url}?cursor={cursor}{query_string}"
+    else:
+        self_link = f"{collection_url}?page={page}{query_string}"
+
+    if total_pages is not None and (total_pages - 1) * limit <= MAX_PAGE_OFFSET:
+        last_link = f"{collection_url}?page={total_pages}{query_string}"
+    else:
+        last_cursor = encode_cursor({"d": "prev"})
+        last_link = f"{collection_url}?cursor={last_cursor}{query_string}"
+
+    return {
+        "self": self_link,
+        "first": f"{collection_url}?page=1{query_string}",
+        "last": last_link,
+        "next": (
+            f"{collection_url}?cursor={row_cursor(rows[-1], 'next')}{query_string}"
+            if rows and has_next
+            else None
+        ),
+        "prev": (
+            f"{collection_url}?cursor={row_cursor(rows[0], 'prev')}{query_string}"
+            if rows and has_prev
+            else None
+        ),
+    }
 
 
 @app.get("/")
 async def root():
     try:
-        mysql_pool.fetchone("SELECT 1")
+        await mysql_pool.fetchone("SELECT 1")
         db_healthy = True
     except Exception:
         db_healthy = False
@@ -165,7 +471,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     try:
-        mysql_pool.fetchone("SELECT 1")
+        await mysql_pool.fetchone("SELECT 1")
     except Exception:
         raise HTTPException(status_code=503, detail="Database connection failed")
     return {"status": "healthy", "database": "connected"}
@@ -177,51 +483,43 @@ async def list_reviews(
     response: Response,
     walkerId: Optional[str] = None,
     ownerId: Optional[str] = None,
+    walkId: Optional[str] = None,
     minRating: Optional[float] = None,
     maxRating: Optional[float] = None,
     page: int = 1,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.estimate,
     if_none_match: Optional[str] = Header(None),
 ):
     """
     List all reviews with pagination, query parameters, and ETag support
-    """
-    where_clauses = []
-    params = []
-
-    if walkerId:
-        where_clauses.append("walker_id = %s")
-        params.append(walkerId)
-
-    if ownerId:
-        where_clauses.append("owner_id = %s")
-        params.append(ownerId)
-
-    if minRating is not None:
-        where_clauses.append("rating >= %s")
-        params.append(minRating)
-
-    if maxRating is not None:
-        where_clauses.append("rating <= %s")
-        params.append(maxRating)
 
+    Follow links.next / links.prev (keyset cursors) to page through the
+    collection; page numbers are accepted for the first MAX_PAGE_OFFSET rows.
+    count selects the total: exact runs COUNT(*), estimate (default) serves
+    the last known count, recounting in the background, and none skips it.
+    """
+    where_clauses, params = review_filters(
+        walkerId, ownerId, walkId, minRating, maxRating
+    )
     where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
-    count_query = f"SELECT COUNT(*) as total FROM reviews{where_sql}"
-    count_result = mysql_pool.fetchone(count_query, tuple(params) if params else None)
-    total = count_result["total"]
+    position, page, offset = resolve_page(cursor, page, limit)
 
-    total_pages = (total + limit - 1) // limit if limit > 0 else 1
-    page = max(1, page)
-    offset = (page - 1) * limit
+    filters = {
+        "walkerId": walkerId,
+        "ownerId": ownerId,
+        "walkId": walkId,
+        "minRating": minRating,
+        "maxRating": maxRating,
+    }
+    total = await count_rows("reviews", where_sql, params, filters, count)
+    pagination = page_summary(limit, page, total, count)
 
-    query = f"""
-        SELECT * FROM reviews
-        {where_sql}
-        ORDER BY created_at DESC
-        LIMIT %s OFFSET %s
-    """
-    rows = mysql_pool.fetchall(query, tuple(params + [limit, offset]))
+    rows, has_prev, has_next = await fetch_keyset_page(
+        "reviews", where_clauses, params, limit, position, offset
+    )
 
     reviews = [row_to_review(row) for row in rows]
     reviews_with_links = [add_review_links(r, request) for r in reviews]
@@ -232,6 +530,8 @@ async def list_reviews(
         query_params.append(f"walkerId={walkerId}")
     if ownerId:
         query_params.append(f"ownerId={ownerId}")
+    if walkId:
+        query_params.append(f"walkId={walkId}")
     if minRating is not None:
         query_params.append(f"minRating={minRating}")
     if maxRating is not None:
@@ -240,26 +540,21 @@ async def list_reviews(
 
     query_string = "&" + "&".join(query_params) if query_params else ""
 
-    links = {
-        "self": f"{base_url}/reviews?page={page}{query_string}",
-        "first": f"{base_url}/reviews?page=1{query_string}",
-        "last": f"{base_url}/reviews?page={total_pages}{query_string}",
-        "next": f"{base_url}/reviews?page={page + 1}{query_string}"
-        if page < total_pages
-        else None,
-        "prev": f"{base_url}/reviews?page={page - 1}{query_string}"
-        if page > 1
-        else None,
-    }
+    links = page_links(
+        f"{base_url}/reviews",
+        query_string,
+        rows,
+        page,
+        cursor,
+        pagination.get("totalPages"),
+        limit,
+        has_prev,
+        has_next,
+    )
 
     result_data = PaginatedReviews(
         data=reviews_with_links,
-        pagination={
-            "page": page,
-            "limit": limit,
-            "total": total,
-            "totalPages": total_pages,
-        },
+        pagination=pagination,
         links=links,
     )
 
@@ -267,12 +562,8 @@ async def list_reviews(
         {
             "data": reviews,
             "page": page,
-            "filters": {
-                "walkerId": walkerId,
-                "ownerId": ownerId,
-                "minRating": minRating,
-                "maxRating": maxRating,
-            },
+            "cursor": cursor,
+            "filters": filters,
         }
     )
 
@@ -289,31 +580,37 @@ async def create_review(review: ReviewCreate, request: Request, response: Respon
     """
     Create a new review - Returns 201 Created
     """
-    review_id = str(uuid.uuid4())
-    now = datetime.utcnow()
+    # The response is built from the values written, rounded as the columns
+    # store them, so creating a review takes no read-back
+    now = datetime.utcnow().replace(microsecond=0)
+    row = {
+        "id": str(uuid.uuid4()),
+        "walk_id": review.walkId,
+        "owner_id": review.ownerId,
+        "walker_id": review.walkerId,
+        "rating": stored_rating(review.rating),
+        "comment": review.comment,
+        "created_at": now,
+        "updated_at": now,
+    }
 
-    mysql_pool.execute(
-        """
-        INSERT INTO reviews (id, walk_id, owner_id, walker_id, rating, comment, created_at, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            review_id,
-            review.walkId,
-            review.ownerId,
-            review.walkerId,
-            review.rating,
-            review.comment,
-            now,
-            now,
-        ),
-    )
+    def write(cursor) -> None:
+        cursor.execute(
+            f"""
+            INSERT INTO reviews ({", ".join(row)})
+            VALUES ({", ".join(["%s"] * len(row))})
+            """,
+            tuple(row.values()),
+        )
+        record_rating(cursor, row["walker_id"], now, [(row["rating"], 1)])
+        bump_data_version(cursor, write_shard(row["walker_id"]))
 
-    row = mysql_pool.fetchone("SELECT * FROM reviews WHERE id = %s", (review_id,))
+    await mysql_pool.transaction(write)
+    count_cache.adjust("reviews", row, 1, review_matches)
     review_data = row_to_review(row)
 
     base_url = str(request.base_url).rstrip("/")
-    location = f"{base_url}/reviews/{review_id}"
+    location = f"{base_url}/reviews/{row['id']}"
     response.headers["Location"] = location
 
     review_with_links = add_review_links(review_data, request)
@@ -331,7 +628,9 @@ async def get_review(
     """
     Get a review by ID with ETag support
     """
-    row = mysql_pool.fetchone("SELECT * FROM reviews WHERE id = %s", (reviewId,))
+    row = await mysql_pool.fetchone(
+        "SELECT * FROM reviews WHERE id = %s", (reviewId,)
+    )
 
     if not row:
         raise HTTPException(status_code=404, detail="Review not found")
@@ -361,51 +660,62 @@ async def update_review(
     """
     Update an existing review
     """
-    row = mysql_pool.fetchone("SELECT * FROM reviews WHERE id = %s", (reviewId,))
+    changes: Dict[str, Any] = {}
 
-    if not row:
-        raise HTTPException(status_code=404, detail="Review not found")
+    if review_update.rating is not None:
+        changes["rating"] = stored_rating(review_update.rating)
 
-    review_data = row_to_review(row)
-    current_etag = generate_etag(review_data)
+    if review_update.comment is not None:
+        changes["comment"] = review_update.comment
 
-    if if_match and if_match != f'"{current_etag}"':
-        raise HTTPException(
-            status_code=412,
-            detail="Precondition Failed - Resource has been modified",
-        )
+    def write(cursor) -> Tuple[dict, dict]:
+        # Lock the row so the rating moved out of the walker's stats is the
+        # one being replaced
+        cursor.execute("SELECT * FROM reviews WHERE id = %s FOR UPDATE", (reviewId,))
+        row = cursor.fetchone()
 
-    update_fields = []
-    params = []
+        if not row:
+            raise HTTPException(status_code=404, detail="Review not found")
 
-    if review_update.rating is not None:
-        update_fields.append("rating = %s")
-        params.append(review_update.rating)
+        current_etag = generate_etag(row_to_review(row))
 
-    if review_update.comment is not None:
-        update_fields.append("comment = %s")
-        params.append(review_update.comment)
+        if if_match and if_match != f'"{current_etag}"':
+            raise HTTPException(
+                status_code=412,
+                detail="Precondition Failed - Resource has been modified",
+            )
 
-    if not update_fields:
-        review_with_links = add_review_links(review_data, request)
-        response.headers["ETag"] = f'"{current_etag}"'
-        return review_with_links
+        if not changes:
+            return row, row
 
-    update_fields.append("updated_at = %s")
-    params.append(datetime.utcnow())
+        # The locked row plus the changes is the updated row; no read-back
+        updated_row = {
+            **row,
+            **changes,
+            "updated_at": datetime.utcnow().replace(microsecond=0),
+        }
+        assignments = ", ".join(f"{column} = %s" for column in changes)
+        cursor.execute(
+            f"UPDATE reviews SET {assignments}, updated_at = %s WHERE id = %s",
+            (*changes.values(), updated_row["updated_at"], reviewId),
+        )
 
-    params.append(reviewId)
+        if updated_row["rating"] != row["rating"]:
+            record_rating(
+                cursor,
+                row["walker_id"],
+                row["created_at"],
+                [(row["rating"], -1), (updated_row["rating"], 1)],
+            )
+            bump_data_version(cursor, write_shard(row["walker_id"]))
 
-    update_query = f"""
-        UPDATE reviews
-        SET {", ".join(update_fields)}
-        WHERE id = %s
-    """
-    mysql_pool.execute(update_query, tuple(params))
+        return row, updated_row
 
-    updated_row = mysql_pool.fetchone(
-        "SELECT * FROM reviews WHERE id = %s", (reviewId,)
-    )
+    row, updated_row = await mysql_pool.transaction(write)
+
+    if updated_row is not row:
+        count_cache.adjust("reviews", row, -1, review_matches)
+        count_cache.adjust("reviews", updated_row, 1, review_matches)
     updated_review_data = row_to_review(updated_row)
 
     new_etag = generate_etag(updated_review_data)
@@ -421,47 +731,172 @@ async def delete_review(reviewId: str):
     """
     Delete a review
     """
-    existing = mysql_pool.fetchone("SELECT id FROM reviews WHERE id = %s", (reviewId,))
 
-    if not existing:
-        raise HTTPException(status_code=404, detail="Review not found")
+    def write(cursor) -> dict:
+        cursor.execute("SELECT * FROM reviews WHERE id = %s FOR UPDATE", (reviewId,))
+        existing = cursor.fetchone()
+
+        if not existing:
+            raise HTTPException(status_code=404, detail="Review not found")
+
+        cursor.execute("DELETE FROM reviews WHERE id = %s", (reviewId,))
+        record_rating(
+            cursor,
+            existing["walker_id"],
+            existing["created_at"],
+            [(existing["rating"], -1)],
+        )
+        bump_data_version(cursor, write_shard(existing["walker_id"]))
+        return existing
 
-    mysql_pool.execute("DELETE FROM reviews WHERE id = %s", (reviewId,))
+    existing = await mysql_pool.transaction(write)
+    count_cache.adjust("reviews", existing, -1, review_matches)
 
     return Response(status_code=204)
 
 
+@app.get("/walkers/ratings", response_model=WalkerRatings)
+async def get_walker_ratings(request: Request, ids: str):
+    """
+    Rating summaries for several walkers (comma-separated ids) in one lookup
+    """
+    walker_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+
+    if not walker_ids:
+        raise HTTPException(status_code=400, detail="ids must name at least one walker")
+    if len(walker_ids) > MAX_BATCH_WALKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_WALKERS} walker ids per request",
+        )
+
+    placeholders = ", ".join(["%s"] * len(walker_ids))
+    rows = await mysql_pool.fetchall(
+        f"SELECT * FROM walker_rating_stats WHERE walker_id IN ({placeholders})",
+        tuple(walker_ids),
+    )
+    by_walker = {row["walker_id"]: row for row in rows}
+
+    return WalkerRatings(
+        data=[
+            add_rating_links(row_to_rating(w, by_walker.get(w)), request)
+            for w in walker_ids
+        ]
+    )
+
+
+@app.get("/walkers/{walkerId}/rating", response_model=WalkerRating)
+async def get_walker_rating(walkerId: str, request: Request):
+    """
+    Average rating, review count and star histogram of a walker
+    """
+    row = await mysql_pool.fetchone(
+        "SELECT * FROM walker_rating_stats WHERE walker_id = %s", (walkerId,)
+    )
+    return add_rating_links(row_to_rating(walkerId, row), request)
+
+
+@app.get("/walks/{walkId}/reviews", response_model=WalkReviews)
+async def list_walk_reviews(
+    walkId: str,
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get every review of a walk in one indexed lookup, newest first
+    """
+    rows = await mysql_pool.fetchall(
+        """
+        SELECT * FROM reviews
+        WHERE walk_id = %s
+        ORDER BY created_at DESC, id DESC
+        """,
+        (walkId,),
+    )
+
+    reviews = [row_to_review(row) for row in rows]
+
+    etag = generate_etag({"walkId": walkId, "data": reviews})
+
+    if if_none_match and if_none_match == f'"{etag}"':
+        raise HTTPException(status_code=304, detail="Not Modified")
+
+    response.headers["ETag"] = f'"{etag}"'
+
+    base_url = str(request.base_url).rstrip("/")
+
+    return WalkReviews(
+        walkId=walkId,
+        data=[add_review_links(r, request) for r in reviews],
+        links={
+            "self": f"{base_url}/walks/{walkId}/reviews",
+            "walk": f"{base_url}/walks/{walkId}",
+        },
+    )
+
+
 @app.post(
     "/analytics/generate",
     response_model=AnalyticsJobResponse,
     status_code=status.HTTP_202_ACCEPTED,
 )
-async def generate_analytics(request: Request, response: Response):
+async def generate_analytics(
+    request: Request,
+    response: Response,
+    report: Optional[AnalyticsRequest] = None,
+):
     """
     Generate analytics report (Asynchronous) - Returns 202 Accepted
+
+    The optional body selects a [start, end) range, walkers to report on
+    individually and the trend granularity; without one the report covers
+    all reviews by day.
+
+    An identical job already pending or processing is returned instead of
+    queueing another (202), and a completed report is reused while no review
+    has changed since it was computed (200).
     """
-    job_id = str(uuid.uuid4())
+    report = report or AnalyticsRequest()
+    if report.start and report.end and report.start >= report.end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if len(set(report.walkerIds)) > MAX_REPORT_WALKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_REPORT_WALKERS} walker ids per report",
+        )
 
-    mysql_pool.execute(
-        """
-        INSERT INTO analytics_jobs (id, status, created_at)
-        VALUES (%s, %s, %s)
-        """,
-        (job_id, JobStatus.processing, datetime.utcnow()),
+    params = report_params(
+        report.start,
+        report.end,
+        report.walkerIds,
+        report.granularity.value,
+        report.movingAverageWindow,
     )
+    job, outcome = await mysql_pool.run(
+        job_queue.submit,
+        str(uuid.uuid4()),
+        report_key(params),
+        json.dumps(params),
+    )
+    job_id = job["id"]
 
-    asyncio.create_task(process_analytics_job(job_id))
+    if outcome == "queued":
+        count_cache.invalidate("analytics_jobs")
+    if outcome == "reused":
+        response.status_code = status.HTTP_200_OK
 
     base_url = str(request.base_url).rstrip("/")
 
     job_response = AnalyticsJobResponse(
         jobId=job_id,
-        status=JobStatus.processing,
-        message="Analytics generation in progress",
+        status=job["status"],
+        message=GENERATE_MESSAGES[outcome],
         links={
             "self": f"{base_url}/analytics/jobs/{job_id}",
             "status": f"{base_url}/analytics/jobs/{job_id}/status",
         },
+        result=job.get("result") or "",
     )
 
     response.headers["Location"] = f"{base_url}/analytics/jobs/{job_id}"
@@ -476,33 +911,31 @@ async def list_analytics_jobs(
     status_filter: Optional[JobStatus] = None,
     page: int = 1,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.estimate,
     if_none_match: Optional[str] = Header(None),
 ):
     """
     List all analytics jobs with pagination and query parameters
     """
-    where_sql = ""
+    where_clauses = []
     params = []
 
     if status_filter:
-        where_sql = " WHERE status = %s"
+        where_clauses.append("status = %s")
         params.append(status_filter)
 
-    count_query = f"SELECT COUNT(*) as total FROM analytics_jobs{where_sql}"
-    count_result = mysql_pool.fetchone(count_query, tuple(params) if params else None)
-    total = count_result["total"]
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
-    total_pages = (total + limit - 1) // limit if limit > 0 else 1
-    page = max(1, page)
-    offset = (page - 1) * limit
+    position, page, offset = resolve_page(cursor, page, limit)
 
-    query = f"""
-        SELECT * FROM analytics_jobs
-        {where_sql}
-        ORDER BY created_at DESC
-        LIMIT %s OFFSET %s
-    """
-    rows = mysql_pool.fetchall(query, tuple(params + [limit, offset]))
+    filters = {"status": status_filter.value if status_filter else None}
+    total = await count_rows("analytics_jobs", where_sql, params, filters, count)
+    pagination = page_summary(limit, page, total, count)
+
+    rows, has_prev, has_next = await fetch_keyset_page(
+        "analytics_jobs", where_clauses, params, limit, position, offset
+    )
 
     jobs = [row_to_job(row) for row in rows]
 
@@ -523,31 +956,26 @@ async def list_analytics_jobs(
 
     query_params = []
     if status_filter:
-        query_params.append(f"status_filter={status_filter}")
+        query_params.append(f"status_filter={status_filter.value}")
     query_params.append(f"limit={limit}")
 
     query_string = "&" + "&".join(query_params) if query_params else ""
 
-    links = {
-        "self": f"{base_url}/analytics/jobs?page={page}{query_string}",
-        "first": f"{base_url}/analytics/jobs?page=1{query_string}",
-        "last": f"{base_url}/analytics/jobs?page={total_pages}{query_string}",
-        "next": f"{base_url}/analytics/jobs?page={page + 1}{query_string}"
-        if page < total_pages
-        else None,
-        "prev": f"{base_url}/analytics/jobs?page={page - 1}{query_string}"
-        if page > 1
-        else None,
-    }
+    links = page_links(
+        f"{base_url}/analytics/jobs",
+        query_string,
+        rows,
+        page,
+        cursor,
+        pagination.get("totalPages"),
+        limit,
+        has_prev,
+        has_next,
+    )
 
     result_data = PaginatedJobs(
         data=jobs_with_links,
-        pagination={
-            "page": page,
-            "limit": limit,
-            "total": total,
-            "totalPages": total_pages,
-        },
+        pagination=pagination,
         links=links,
     )
 
@@ -555,7 +983,8 @@ async def list_analytics_jobs(
         {
             "data": jobs,
             "page": page,
-            "filter": {"status": status_filter.value if status_filter else None},
+            "cursor": cursor,
+            "filter": filters,
         }
     )
 
@@ -577,7 +1006,9 @@ async def get_analytics_job(
     """
     Get analytics job status and result with ETag support
     """
-    row = mysql_pool.fetchone("SELECT * FROM analytics_jobs WHERE id = %s", (jobId,))
+    row = await mysql_pool.fetchone(
+        "SELECT * FROM analytics_jobs WHERE id = %s", (jobId,)
+    )
 
     if not row:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -611,7 +1042,7 @@ async def get_analytics_job_status(jobId: str):
     """
     Get analytics job status only
     """
-    row = mysql_pool.fetchone(
+    row = await mysql_pool.fetchone(
         "SELECT id, status FROM analytics_jobs WHERE id = %s", (jobId,)
     )
 
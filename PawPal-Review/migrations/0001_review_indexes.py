@@ -0,0 +1,26 @@
+"""
+Indexes for the list query shapes in main.py.
+
+InnoDB appends the primary key to every secondary index, so each
+(..., created_at) index is also ordered by id and serves the keyset
+ORDER BY created_at, id without a filesort.
+"""
+from migrations import create_index
+
+
+def upgrade(cursor) -> None:
+    create_index(cursor, "reviews", "idx_reviews_created", ["created_at"])
+    create_index(
+        cursor, "reviews", "idx_reviews_walker_created", ["walker_id", "created_at"]
+    )
+    create_index(
+        cursor, "reviews", "idx_reviews_owner_created", ["owner_id", "created_at"]
+    )
+    create_index(cursor, "reviews", "idx_reviews_walk", ["walk_id"])
+    create_index(
+        cursor, "reviews", "idx_reviews_rating_created", ["rating", "created_at"]
+    )
+    create_index(cursor, "analytics_jobs", "idx_jobs_created", ["created_at"])
+    create_index(
+        cursor, "analytics_jobs", "idx_jobs_status_created", ["status", "created_at"]
+    )
@@ -0,0 +1,49 @@
+"""
+Per-walker rating aggregates (count, sum, whole-star histogram).
+
+Maintained by the review write endpoints in the same transaction as the
+review itself. The backfill recomputes every walker from reviews, so it is
+safe to re-run; INSERT ... SELECT takes shared locks on the rows it reads,
+so reviews written during the backfill wait for it rather than being lost.
+"""
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS walker_rating_stats (
+            walker_id VARCHAR(255) PRIMARY KEY,
+            review_count INT NOT NULL DEFAULT 0,
+            rating_sum DECIMAL(12,1) NOT NULL DEFAULT 0,
+            stars_1 INT NOT NULL DEFAULT 0,
+            stars_2 INT NOT NULL DEFAULT 0,
+            stars_3 INT NOT NULL DEFAULT 0,
+            stars_4 INT NOT NULL DEFAULT 0,
+            stars_5 INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                ON UPDATE CURRENT_TIMESTAMP
+        )
+        """
+    )
+    cursor.execute(
+        """
+        INSERT INTO walker_rating_stats
+            (walker_id, review_count, rating_sum,
+             stars_1, stars_2, stars_3, stars_4, stars_5)
+        SELECT walker_id, COUNT(*), SUM(rating),
+            SUM(FLOOR(rating) <= 1), SUM(FLOOR(rating) = 2),
+            SUM(FLOOR(rating) = 3), SUM(FLOOR(rating) = 4),
+            SUM(FLOOR(rating) >= 5)
+        FROM reviews
+        GROUP BY walker_id
+        ON DUPLICATE KEY UPDATE
+            review_count = VALUES(review_count),
+            rating_sum = VALUES(rating_sum),
+            stars_1 = VALUES(stars_1),
+            stars_2 = VALUES(stars_2),
+            stars_3 = VALUES(stars_3),
+            stars_4 = VALUES(stars_4),
+            stars_5 = VALUES(stars_5)
+        """
+    )
+    print("  backfilled walker_rating_stats from reviews")
@@ -0,0 +1,40 @@
+"""
+Turn analytics_jobs into a durable work queue.
+
+Workers claim pending jobs with SELECT ... FOR UPDATE SKIP LOCKED and hold
+a lease (lease_owner, lease_expires_at) that they renew by heartbeat;
+attempts, max_attempts and run_after drive retries with backoff. Jobs
+left in processing by the old in-process task have no lease and can
+never finish, so they are put back to pending.
+"""
+from migrations import add_column, create_index
+
+
+def upgrade(cursor) -> None:
+    add_column(cursor, "analytics_jobs", "attempts", "INT NOT NULL DEFAULT 0")
+    add_column(cursor, "analytics_jobs", "max_attempts", "INT NOT NULL DEFAULT 3")
+    add_column(cursor, "analytics_jobs", "run_after", "TIMESTAMP NULL")
+    add_column(cursor, "analytics_jobs", "lease_owner", "VARCHAR(100) NULL")
+    add_column(cursor, "analytics_jobs", "lease_expires_at", "TIMESTAMP NULL")
+    add_column(cursor, "analytics_jobs", "heartbeat_at", "TIMESTAMP NULL")
+    add_column(cursor, "analytics_jobs", "last_error", "TEXT NULL")
+    # claim() reads pending jobs oldest first; without this index InnoDB
+    # sorts and locks every pending row. 0001 creates it for the status-
+    # filtered list, so this is a no-op unless that index was dropped.
+    create_index(
+        cursor, "analytics_jobs", "idx_jobs_status_created", ["status", "created_at"]
+    )
+    create_index(
+        cursor,
+        "analytics_jobs",
+        "idx_jobs_status_lease",
+        ["status", "lease_expires_at"],
+    )
+    cursor.execute(
+        """
+        UPDATE analytics_jobs
+        SET status = 'pending'
+        WHERE status = 'processing' AND lease_owner IS NULL
+        """
+    )
+    print(f"  requeued {cursor.rowcount} unleased processing job(s)")
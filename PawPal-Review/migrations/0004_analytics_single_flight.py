@@ -0,0 +1,36 @@
+"""
+Coalesce identical analytics requests and reuse unchanged results.
+
+data_versions holds a counter per dataset that review writes bump in their
+own transaction; a completed job records the version its report was
+computed at (data_version) under its request_key. inflight_key equals
+request_key while a job is pending or processing and is cleared when it
+finishes, so its unique index admits one in-flight job per request.
+"""
+from migrations import add_column, create_index
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name VARCHAR(50) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+    cursor.execute(
+        "INSERT IGNORE INTO data_versions (name, version) VALUES ('reviews', 0)"
+    )
+    add_column(cursor, "analytics_jobs", "request_key", "VARCHAR(64) NULL")
+    add_column(cursor, "analytics_jobs", "inflight_key", "VARCHAR(64) NULL")
+    add_column(cursor, "analytics_jobs", "data_version", "BIGINT NULL")
+    create_index(
+        cursor, "analytics_jobs", "uq_jobs_inflight", ["inflight_key"], unique=True
+    )
+    create_index(
+        cursor,
+        "analytics_jobs",
+        "idx_jobs_request_version",
+        ["request_key", "data_version"],
+    )
@@ -0,0 +1,63 @@
+"""
+Hourly and daily review rollups, per walker and global.
+
+One row per (granularity, walker, bucket start) with count, rating sum and
+whole-star histogram; walker_id '' is the all-walkers rollup. Review writes
+keep them current in their own transaction, and analytics reports are
+composed from them, so report cost follows the number of buckets in the
+requested range rather than the number of reviews. The backfill recomputes
+every bucket from reviews and is safe to re-run. Jobs also gain a params
+column holding the report request.
+"""
+from migrations import add_column
+
+BUCKETS = {
+    "hour": "DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')",
+    "day": "DATE(created_at)",
+}
+SCOPES = {"walker": "walker_id", "global": "''"}
+
+
+def upgrade(cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS review_rollups (
+            granularity VARCHAR(4) NOT NULL,
+            bucket_start DATETIME NOT NULL,
+            walker_id VARCHAR(255) NOT NULL,
+            review_count INT NOT NULL DEFAULT 0,
+            rating_sum DECIMAL(12,1) NOT NULL DEFAULT 0,
+            stars_1 INT NOT NULL DEFAULT 0,
+            stars_2 INT NOT NULL DEFAULT 0,
+            stars_3 INT NOT NULL DEFAULT 0,
+            stars_4 INT NOT NULL DEFAULT 0,
+            stars_5 INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, walker_id, bucket_start)
+        )
+        """
+    )
+    for granularity, bucket in BUCKETS.items():
+        for scope, walker in SCOPES.items():
+            cursor.execute(
+                f"""
+                INSERT INTO review_rollups
+                    (granularity, bucket_start, walker_id, review_count, rating_sum,
+                     stars_1, stars_2, stars_3, stars_4, stars_5)
+                SELECT '{granularity}', {bucket}, {walker}, COUNT(*), SUM(rating),
+                    SUM(FLOOR(rating) <= 1), SUM(FLOOR(rating) = 2),
+                    SUM(FLOOR(rating) = 3), SUM(FLOOR(rating) = 4),
+                    SUM(FLOOR(rating) >= 5)
+                FROM reviews
+                GROUP BY {bucket}, {walker}
+                ON DUPLICATE KEY UPDATE
+                    review_count = VALUES(review_count),
+                    rating_sum = VALUES(rating_sum),
+                    stars_1 = VALUES(stars_1),
+                    stars_2 = VALUES(stars_2),
+                    stars_3 = VALUES(stars_3),
+                    stars_4 = VALUES(stars_4),
+                    stars_5 = VALUES(stars_5)
+                """
+            )
+            print(f"  backfilled {granularity} rollups ({scope})")
+    add_column(cursor, "analytics_jobs", "params", "JSON NULL")
@@ -0,0 +1,62 @@
+"""
+Shard the rows that every review write used to update.
+
+data_versions('reviews') and the all-walkers rollups (walker_id '') were
+written by every review create, rating change and delete, so concurrent
+writes for different walkers queued on their row locks until commit.
+Writes now touch only the shard of their walker (CRC32(walker_id) % 16,
+rating_stats.write_shard): data_versions gains a shard column in its
+primary key, and its version is the sum over shards; the global rollups
+move to walker_id '*<shard>' rows, backfilled from reviews, and readers
+sum the shards. The backfill is safe to re-run.
+"""
+from migrations import column_exists
+
+SHARDS = 16
+BUCKETS = {
+    "hour": "DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')",
+    "day": "DATE(created_at)",
+}
+
+
+def upgrade(cursor) -> None:
+    if column_exists(cursor, "data_versions", "shard"):
+        print("  column data_versions.shard already exists")
+    else:
+        # Existing counters become shard 0, so no version goes backwards
+        cursor.execute(
+            """
+            ALTER TABLE data_versions
+                ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0,
+                DROP PRIMARY KEY,
+                ADD PRIMARY KEY (name, shard)
+            """
+        )
+        print("  sharded data_versions")
+
+    shard = f"CONCAT('*', CRC32(walker_id) % {SHARDS})"
+    for granularity, bucket in BUCKETS.items():
+        cursor.execute(
+            f"""
+            INSERT INTO review_rollups
+                (granularity, bucket_start, walker_id, review_count, rating_sum,
+                 stars_1, stars_2, stars_3, stars_4, stars_5)
+            SELECT '{granularity}', {bucket}, {shard}, COUNT(*), SUM(rating),
+                SUM(FLOOR(rating) <= 1), SUM(FLOOR(rating) = 2),
+                SUM(FLOOR(rating) = 3), SUM(FLOOR(rating) = 4),
+                SUM(FLOOR(rating) >= 5)
+            FROM reviews
+            GROUP BY {bucket}, {shard}
+            ON DUPLICATE KEY UPDATE
+                review_count = VALUES(review_count),
+                rating_sum = VALUES(rating_sum),
+                stars_1 = VALUES(stars_1),
+                stars_2 = VALUES(stars_2),
+                stars_3 = VALUES(stars_3),
+                stars_4 = VALUES(stars_4),
+                stars_5 = VALUES(stars_5)
+            """
+        )
+        print(f"  backfilled sharded global {granularity} rollups")
+    cursor.execute("DELETE FROM review_rollups WHERE walker_id = ''")
+    print(f"  removed {cursor.rowcount} unsharded global rollup row(s)")
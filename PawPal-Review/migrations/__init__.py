@@ -0,0 +1,177 @@
+"""
+Versioned schema migrations for the Review service.
+
+db_init.sql is the baseline schema. Every module in this package named
+NNNN_description.py is one migration exposing upgrade(cursor); applied
+versions are recorded in schema_migrations and skipped on later runs.
+MySQL commits DDL implicitly, so a migration cannot be rolled back as a
+whole: each step checks the catalog first, which makes re-running a
+partially applied migration safe.
+"""
+import importlib
+import pkgutil
+from types import ModuleType
+from typing import Any
+
+import mysql.connector
+
+LOCK_NAME = "pawpal_review_migrations"
+# Wait for as long as another run holds the lock (negative: no timeout).
+# Backfills can take minutes; the lock is released if its session dies.
+LOCK_TIMEOUT_SECONDS = -1
+
+
+def discover() -> list[tuple[int, str, ModuleType]]:
+    """All migrations in this package as (version, name, module), oldest first."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        version, _, name = info.name.partition("_")
+        if not version.isdigit():
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append((int(version), name, module))
+    migrations.sort(key=lambda migration: migration[0])
+    return migrations
+
+
+def index_exists(cursor: Any, table: str, name: str) -> bool:
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+        """,
+        (table, name),
+    )
+    return cursor.fetchone() is not None
+
+
+def create_index(
+    cursor: Any, table: str, name: str, columns: list[str], unique: bool = False
+) -> None:
+    if index_exists(cursor, table, name):
+        print(f"  index {name} already exists")
+        return
+    # InnoDB builds secondary indexes online: reads and writes continue
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cursor.execute(
+        f"CREATE {kind} {name} ON {table} ({', '.join(columns)}) "
+        "ALGORITHM=INPLACE LOCK=NONE"
+    )
+    print(f"  created index {name} on {table} ({', '.join(columns)})")
+
+
+def column_exists(cursor: Any, table: str, name: str) -> bool:
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+        """,
+        (table, name),
+    )
+    return cursor.fetchone() is not None
+
+
+def add_column(cursor: Any, table: str, name: str, definition: str) -> None:
+    if column_exists(cursor, table, name):
+        print(f"  column {table}.{name} already exists")
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+    print(f"  added column {table}.{name}")
+
+
+def applied_versions(cursor: Any) -> set[int]:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def recorded_versions(cursor: Any) -> set[int]:
+    """Like applied_versions, but read-only: no schema_migrations means none."""
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = 'schema_migrations'
+        """
+    )
+    if cursor.fetchone() is None:
+        return set()
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def pending_versions(pool: Any) -> list[int]:
+    """Versions in this package not yet recorded in schema_migrations."""
+    conn = pool.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            done = recorded_versions(cursor)
+    finally:
+        conn.close()
+    return [version for version, _, _ in discover() if version not in done]
+
+
+def check_schema(pool: Any) -> None:
+    """
+    Refuse to serve against a schema older than the code: handlers and
+    workers write tables that only later migrations create.
+
+    Read-only. If the database cannot be reached the check is skipped with
+    a warning, and requests fail individually until it is back, as they
+    would for any outage.
+    """
+    try:
+        pending = pending_versions(pool)
+    except mysql.connector.Error as e:
+        print(f"Warning: schema version not checked, database unavailable: {e}")
+        return
+    if pending:
+        versions = ", ".join(f"{version:04d}" for version in pending)
+        raise RuntimeError(
+            f"Schema is behind the code (pending migrations: {versions}); "
+            "run python -m migrations"
+        )
+
+
+def migrate(pool: Any, target: int | None = None) -> list[int]:
+    """
+    Apply pending migrations up to target (default: all) and return their
+    versions. A MySQL named lock keeps concurrent runs from interleaving.
+    """
+    conn = pool.get_connection()
+    applied = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT_SECONDS)
+            )
+            if not cursor.fetchone()[0]:
+                raise RuntimeError("Another migration run holds the lock")
+            try:
+                done = applied_versions(cursor)
+                for version, name, module in discover():
+                    if version in done or (target is not None and version > target):
+                        continue
+                    print(f"Applying migration {version:04d} {name}")
+                    module.upgrade(cursor)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (version, name),
+                    )
+                    conn.commit()
+                    applied.append(version)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchone()
+    finally:
+        conn.close()
+    return applied
@@ -0,0 +1,38 @@
+"""
+Apply or list Review service schema migrations.
+
+Usage (from the PawPal-Review directory):
+
+    python -m migrations            # apply all pending migrations
+    python -m migrations --list     # show applied and pending versions
+"""
+import argparse
+
+from database import mysql_pool
+from migrations import applied_versions, discover, migrate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--list", action="store_true", help="List migrations.")
+    parser.add_argument("--target", type=int, help="Stop after this version.")
+    args = parser.parse_args()
+
+    if args.list:
+        conn = mysql_pool.get_connection()
+        try:
+            with conn.cursor() as cursor:
+                done = applied_versions(cursor)
+        finally:
+            conn.close()
+        for version, name, _ in discover():
+            state = "applied" if version in done else "pending"
+            print(f"{version:04d} {name:<40} {state}")
+        return
+
+    applied = migrate(mysql_pool, args.target)
+    print(f"Applied {len(applied)} migration(s)" if applied else "Schema up to date")
+
+
+if __name__ == "__main__":
+    main()
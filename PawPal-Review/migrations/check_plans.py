@@ -0,0 +1,160 @@
+"""
+EXPLAIN-based regression check for the list query shapes in main.py and
+the job queue's claim query.
+
+Builds each query exactly as the handlers do (review_filters, keyset_query)
+and asserts that MySQL plans it on one of the expected indexes, without a
+filesort for the shapes in NO_FILESORT. Exits
+non-zero on any failure, for use in CI against a migrated database that
+holds representative data (at least STRICT_MIN_ROWS rows per table).
+
+On small tables the optimizer may rightly prefer a full scan. --lenient
+accepts that below STRICT_MIN_ROWS rows as long as the indexes exist; it
+only proves the migrations ran, not that the queries use them.
+
+Usage (from the PawPal-Review directory):
+
+    python -m migrations.check_plans [--lenient]
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import Any
+
+from database import mysql_pool
+from job_queue import CLAIM_SQL
+from main import keyset_query, review_filters
+from migrations import index_exists
+
+STRICT_MIN_ROWS = 1000
+LIMIT = 10
+# Locking reads must find their row in index order: a filesort means
+# every candidate row is read, and locked, before one is returned
+NO_FILESORT = {"claim"}
+
+
+def query_shapes() -> list[tuple[str, str, tuple[str, ...], str, tuple[Any, ...]]]:
+    """(shape, table, accepted indexes, sql, params) for every query shape."""
+    cursor = {"d": "next", "c": datetime(2025, 11, 21), "i": "review-id"}
+    shapes = []
+
+    review_shapes = [
+        ("reviews", {}, None, ("idx_reviews_created",)),
+        (
+            "reviews?walkerId",
+            {"walkerId": "walker-bob"},
+            None,
+            ("idx_reviews_walker_created",),
+        ),
+        (
+            "reviews?ownerId",
+            {"ownerId": "owner-alice"},
+            None,
+            ("idx_reviews_owner_created",),
+        ),
+        ("reviews?walkId", {"walkId": "walk-001"}, None, ("idx_reviews_walk",)),
+        (
+            "reviews?minRating&maxRating",
+            {"minRating": 4.0, "maxRating": 5.0},
+            None,
+            # A selective range reads the rating index; a wide one may walk
+            # created_at in order and stop after LIMIT rows instead
+            ("idx_reviews_rating_created", "idx_reviews_created"),
+        ),
+        ("reviews?cursor", {}, cursor, ("idx_reviews_created",)),
+        (
+            "reviews?walkerId&cursor",
+            {"walkerId": "walker-bob"},
+            cursor,
+            ("idx_reviews_walker_created",),
+        ),
+    ]
+    for shape, filters, position, indexes in review_shapes:
+        clauses, params = review_filters(**filters)
+        sql, args = keyset_query("reviews", clauses, params, LIMIT, position)
+        shapes.append((shape, "reviews", indexes, sql, args))
+
+    job_shapes = [
+        ("analytics/jobs", [], [], ("idx_jobs_created",)),
+        (
+            "analytics/jobs?status_filter",
+            ["status = %s"],
+            ["completed"],
+            ("idx_jobs_status_created",),
+        ),
+    ]
+    for shape, clauses, params, indexes in job_shapes:
+        sql, args = keyset_query("analytics_jobs", clauses, params, LIMIT)
+        shapes.append((shape, "analytics_jobs", indexes, sql, args))
+
+    shapes.append(
+        (
+            "claim",
+            "analytics_jobs",
+            ("idx_jobs_status_created",),
+            CLAIM_SQL,
+            (datetime(2025, 11, 21),),
+        )
+    )
+    return shapes
+
+
+def table_rows(cursor: Any, table: str) -> int:
+    cursor.execute(
+        """
+        SELECT table_rows FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+        """,
+        (table,),
+    )
+    row = cursor.fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--lenient",
+        action="store_true",
+        help="Accept any plan on small tables if the indexes exist.",
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    conn = mysql_pool.get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for shape, table, indexes, sql, params in query_shapes():
+                strict = (
+                    not args.lenient or table_rows(cursor, table) >= STRICT_MIN_ROWS
+                )
+                cursor.execute(f"EXPLAIN {sql}", params)
+                columns = [column[0] for column in cursor.description]
+                plans = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                plan = next(p for p in plans if p["table"] == table)
+                extra = plan.get("Extra") or ""
+
+                if plan["key"] in indexes:
+                    verdict = f"ok ({plan['key']})"
+                elif not strict and all(
+                    index_exists(cursor, table, index) for index in indexes
+                ):
+                    verdict = f"ok (small table, planner chose {plan['key']})"
+                else:
+                    expected = " or ".join(indexes)
+                    verdict = f"FAIL: expected {expected}, got {plan['key']}"
+                    failures += 1
+                if "filesort" in extra:
+                    verdict += ", filesort"
+                    if strict and shape in NO_FILESORT and verdict.startswith("ok"):
+                        verdict = f"FAIL: filesort ({plan['key']})"
+                        failures += 1
+                print(f"{shape:<32} {plan['type'] or '-':<7} {verdict}")
+    finally:
+        conn.close()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
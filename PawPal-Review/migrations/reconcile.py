@@ -0,0 +1,150 @@
+"""
+Recompute the review aggregates from reviews after a rolling deploy.
+
+Migrations 0002, 0005 and 0006 backfill walker_rating_stats and
+review_rollups from reviews, but instances still running the previous
+code keep writing reviews without touching them until the rollout ends.
+Run this once every instance (web and worker.py) runs the new code, with
+--since set to when the migrations started: it recomputes every rollup
+bucket from that day on (or from the earliest review edited since, if
+older) and the stats of every walker with a review written since, then
+bumps the reviews data version so cached reports are regenerated.
+
+Reviews deleted by old instances leave no row behind, so the windowed
+pass cannot see which older buckets or walkers they changed; without
+--since everything is recomputed.
+
+All of it runs in one transaction: the zeroed rows stay locked and the
+reviews read stay share-locked until commit, so review writes arriving
+meanwhile wait instead of being counted twice or lost.
+
+Usage (from the PawPal-Review directory):
+
+    python -m migrations.reconcile --since 2025-11-21T09:00:00
+    python -m migrations.reconcile            # everything
+"""
+import argparse
+from datetime import datetime
+from typing import Any
+
+from analytics import as_utc_naive
+from database import mysql_pool
+from job_queue import bump_data_version
+from rating_stats import GLOBAL_SCOPE, WRITE_SHARDS, day_start
+
+STARS = """
+    SUM(FLOOR(rating) <= 1), SUM(FLOOR(rating) = 2), SUM(FLOOR(rating) = 3),
+    SUM(FLOOR(rating) = 4), SUM(FLOOR(rating) >= 5)
+"""
+ZEROED = """
+    review_count = 0, rating_sum = 0,
+    stars_1 = 0, stars_2 = 0, stars_3 = 0, stars_4 = 0, stars_5 = 0
+"""
+REPLACE = """
+    review_count = VALUES(review_count),
+    rating_sum = VALUES(rating_sum),
+    stars_1 = VALUES(stars_1),
+    stars_2 = VALUES(stars_2),
+    stars_3 = VALUES(stars_3),
+    stars_4 = VALUES(stars_4),
+    stars_5 = VALUES(stars_5)
+"""
+BUCKETS = {
+    "hour": "DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')",
+    "day": "DATE(created_at)",
+}
+SCOPES = {
+    "walker": "walker_id",
+    "global": f"CONCAT('{GLOBAL_SCOPE}', CRC32(walker_id) % {WRITE_SHARDS})",
+}
+
+
+def reconcile_walker_stats(cursor: Any, since: datetime | None) -> None:
+    walkers, params = "", ()
+    if since is not None:
+        walkers = (
+            "WHERE walker_id IN "
+            "(SELECT walker_id FROM (SELECT DISTINCT walker_id FROM reviews "
+            "WHERE updated_at >= %s) AS touched)"
+        )
+        params = (since,)
+    cursor.execute(f"UPDATE walker_rating_stats SET {ZEROED} {walkers}", params)
+    cursor.execute(
+        f"""
+        INSERT INTO walker_rating_stats
+            (walker_id, review_count, rating_sum,
+             stars_1, stars_2, stars_3, stars_4, stars_5)
+        SELECT walker_id, COUNT(*), SUM(rating), {STARS}
+        FROM reviews
+        {walkers}
+        GROUP BY walker_id
+        ON DUPLICATE KEY UPDATE {REPLACE}
+        """,
+        params,
+    )
+    print(f"  recomputed walker_rating_stats ({cursor.rowcount} row change(s))")
+
+
+def rollup_start(cursor: Any, since: datetime) -> datetime:
+    """Day of since, or of the earliest review created before it but edited after."""
+    cursor.execute(
+        "SELECT MIN(created_at) AS earliest FROM reviews WHERE updated_at >= %s",
+        (since,),
+    )
+    row = cursor.fetchone()
+    earliest = row["earliest"] if row and row["earliest"] else since
+    return day_start(min(since, earliest))
+
+
+def reconcile_rollups(cursor: Any, start: datetime | None) -> None:
+    window, params = "", ()
+    if start is not None:
+        window, params = "WHERE created_at >= %s", (start,)
+        cursor.execute(
+            f"UPDATE review_rollups SET {ZEROED} WHERE bucket_start >= %s", params
+        )
+    else:
+        cursor.execute(f"UPDATE review_rollups SET {ZEROED}")
+    for granularity, bucket in BUCKETS.items():
+        for scope, walker in SCOPES.items():
+            cursor.execute(
+                f"""
+                INSERT INTO review_rollups
+                    (granularity, bucket_start, walker_id, review_count, rating_sum,
+                     stars_1, stars_2, stars_3, stars_4, stars_5)
+                SELECT '{granularity}', {bucket}, {walker}, COUNT(*), SUM(rating),
+                    {STARS}
+                FROM reviews
+                {window}
+                GROUP BY {bucket}, {walker}
+                ON DUPLICATE KEY UPDATE {REPLACE}
+                """,
+                params,
+            )
+            print(f"  recomputed {granularity} rollups ({scope})")
+
+
+def reconcile(pool: Any, since: datetime | None = None) -> None:
+    def work(cursor) -> None:
+        start = rollup_start(cursor, since) if since is not None else None
+        reconcile_walker_stats(cursor, since)
+        reconcile_rollups(cursor, start)
+        bump_data_version(cursor)
+
+    pool.transaction_sync(work)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="UTC time the migrations started (default: recompute everything).",
+    )
+    args = parser.parse_args()
+    reconcile(mysql_pool, as_utc_naive(args.since))
+    print("Review aggregates reconciled")
+
+
+if __name__ == "__main__":
+    main()
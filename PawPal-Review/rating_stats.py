@@ -0,0 +1,134 @@
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+STAR_BUCKETS = (1, 2, 3, 4, 5)
+STAR_COLUMNS = ", ".join(f"stars_{star}" for star in STAR_BUCKETS)
+ACCUMULATE = ", ".join(
+    f"{column} = {column} + VALUES({column})"
+    for column in ["review_count", "rating_sum"]
+    + [f"stars_{star}" for star in STAR_BUCKETS]
+)
+# Rows every review write would otherwise update (the data version and the
+# all-walkers rollups) are split into shards, and a write touches the shard
+# of its walker only. Writes for one walker already queue on that walker's
+# stats row, so sharding by walker adds no new lock waits among them.
+# Changing it requires a migration that re-shards existing rows.
+WRITE_SHARDS = 16
+GLOBAL_SCOPE = "*"  # review_rollups.walker_id prefix of the all-walkers rollup
+
+
+def write_shard(walker_id: str) -> int:
+    """Shard of a walker's writes; CRC32 so that SQL can compute it too."""
+    return zlib.crc32(walker_id.encode()) % WRITE_SHARDS
+
+
+def global_scope(shard: int) -> str:
+    return f"{GLOBAL_SCOPE}{shard}"
+
+
+GLOBAL_SHARDS = tuple(global_scope(shard) for shard in range(WRITE_SHARDS))
+
+
+def star_bucket(rating: float) -> int:
+    """Histogram bucket of a rating: whole stars, so 4.5 counts as 4."""
+    return min(max(int(float(rating)), STAR_BUCKETS[0]), STAR_BUCKETS[-1])
+
+
+def rating_delta(changes: list[tuple[float, int]]) -> tuple[Any, ...]:
+    """
+    (review_count, rating_sum, stars_1..stars_5) to add to an aggregate for
+    ratings added (delta=1) or removed (delta=-1).
+    """
+    stars = dict.fromkeys(STAR_BUCKETS, 0)
+    for rating, delta in changes:
+        stars[star_bucket(rating)] += delta
+    return (
+        sum(delta for _, delta in changes),
+        sum(delta * Decimal(str(rating)) for rating, delta in changes),
+        *stars.values(),
+    )
+
+
+def apply_rating_delta(cursor: Any, walker_id: str, delta: tuple[Any, ...]) -> None:
+    """
+    Add a rating_delta to a walker's stats.
+
+    Must run on the cursor of the transaction that writes the review, so the
+    aggregate and the reviews table commit or roll back together.
+    """
+    cursor.execute(
+        f"""
+        INSERT INTO walker_rating_stats
+            (walker_id, review_count, rating_sum, {STAR_COLUMNS})
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE {ACCUMULATE}
+        """,
+        (walker_id, *delta),
+    )
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def apply_rollup_delta(
+    cursor: Any, walker_id: str, created_at: datetime, delta: tuple[Any, ...]
+) -> None:
+    """
+    Add a rating_delta to the hourly and daily rollups of the review's
+    creation time, for the walker and the walker's global shard, in one
+    statement.
+    """
+    rows = [
+        (granularity, bucket, scope, *delta)
+        for granularity, bucket in (
+            ("hour", hour_start(created_at)),
+            ("day", day_start(created_at)),
+        )
+        for scope in (walker_id, global_scope(write_shard(walker_id)))
+    ]
+    cursor.execute(
+        f"""
+        INSERT INTO review_rollups
+            (granularity, bucket_start, walker_id, review_count, rating_sum,
+             {STAR_COLUMNS})
+        VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(rows))}
+        ON DUPLICATE KEY UPDATE {ACCUMULATE}
+        """,
+        tuple(value for row in rows for value in row),
+    )
+
+
+def record_rating(
+    cursor: Any,
+    walker_id: str,
+    created_at: datetime,
+    changes: list[tuple[float, int]],
+) -> None:
+    """
+    Apply the (rating, delta) changes of one review write to every
+    aggregate, walker stats and rollups, with one statement per table.
+    """
+    delta = rating_delta(changes)
+    apply_rating_delta(cursor, walker_id, delta)
+    apply_rollup_delta(cursor, walker_id, created_at, delta)
+
+
+def row_to_rating(walker_id: str, row: dict[str, Any] | None) -> dict[str, Any]:
+    count = int(row["review_count"]) if row else 0
+    total = float(row["rating_sum"]) if row else 0.0
+    return {
+        "walkerId": walker_id,
+        "reviewCount": count,
+        "averageRating": round(total / count, 2) if count > 0 else None,
+        "histogram": {
+            str(star): int(row[f"stars_{star}"]) if row else 0
+            for star in STAR_BUCKETS
+        },
+    }
@@ -0,0 +1,118 @@
+"""
+Fixtures for the PawPal-Review tests.
+
+JobQueue only needs a pool with transaction_sync(work), so the queue tests
+run against an in-memory SQLite database holding the analytics_jobs and
+data_versions tables as migrations 0003-0006 leave them. The few MySQL
+spellings the queue uses are translated per statement; row locking
+(FOR UPDATE SKIP LOCKED, FOR SHARE) has no SQLite equivalent and is
+dropped, so these tests cover the lease state machine, not concurrency.
+"""
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable
+
+import pytest
+from mysql.connector.errors import IntegrityError
+
+SCHEMA = """
+CREATE TABLE analytics_jobs (
+    id VARCHAR(50) PRIMARY KEY,
+    status VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL,
+    result JSON,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NULL,
+    lease_owner VARCHAR(100) NULL,
+    lease_expires_at TIMESTAMP NULL,
+    heartbeat_at TIMESTAMP NULL,
+    last_error TEXT NULL,
+    request_key VARCHAR(64) NULL,
+    inflight_key VARCHAR(64) NULL UNIQUE,
+    data_version BIGINT NULL,
+    params JSON NULL
+);
+CREATE TABLE data_versions (
+    name VARCHAR(50) NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+INSERT INTO data_versions (name, shard, version) VALUES ('reviews', 0, 0);
+"""
+
+
+def to_sqlite(sql: str) -> str:
+    sql = re.sub(r"FOR UPDATE SKIP LOCKED|FOR UPDATE|FOR SHARE", "", sql)
+    sql = re.sub(r"\bIF\(", "IIF(", sql)
+    sql = sql.replace(
+        "ON DUPLICATE KEY UPDATE", "ON CONFLICT (name, shard) DO UPDATE SET"
+    )
+    return sql.replace("%s", "?")
+
+
+def to_param(value: Any) -> Any:
+    # MySQL TIMESTAMP text compares in time order as long as the format is fixed
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value
+
+
+class SQLiteCursor:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._cursor = conn.cursor()
+
+    def execute(self, sql: str, params: tuple | None = None) -> None:
+        try:
+            self._cursor.execute(
+                to_sqlite(sql), tuple(to_param(p) for p in params or ())
+            )
+        except sqlite3.IntegrityError as e:
+            raise IntegrityError(msg=str(e)) from e
+
+    def fetchone(self) -> dict[str, Any] | None:
+        row = self._cursor.fetchone()
+        return dict(row) if row is not None else None
+
+    def fetchall(self) -> list[dict[str, Any]]:
+        return [dict(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+
+class SQLitePool:
+    """The transaction_sync part of MySQLPool over one SQLite connection."""
+
+    def __init__(self) -> None:
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def transaction_sync(self, work: Callable[[SQLiteCursor], Any]) -> Any:
+        with self._lock:
+            try:
+                result = work(SQLiteCursor(self.conn))
+                self.conn.commit()
+                return result
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def query(self, sql: str, params: tuple = ()) -> list[dict[str, Any]]:
+        return self.transaction_sync(
+            lambda cursor: (cursor.execute(sql, params), cursor.fetchall())[1]
+        )
+
+
+@pytest.fixture
+def sqlite_pool() -> SQLitePool:
+    pool = SQLitePool()
+    yield pool
+    pool.conn.close()
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from job_queue import JobQueue, bump_data_version
+
+
+@pytest.fixture
+def queue(sqlite_pool) -> JobQueue:
+    return JobQueue(sqlite_pool, lease_seconds=60, max_attempts=2, retry_delay=10)
+
+
+def job_row(pool, job_id: str) -> dict:
+    return pool.query("SELECT * FROM analytics_jobs WHERE id = %s", (job_id,))[0]
+
+
+def expire_lease(pool, job_id: str) -> None:
+    pool.query(
+        "UPDATE analytics_jobs SET lease_expires_at = %s WHERE id = %s",
+        (datetime.utcnow() - timedelta(seconds=1), job_id),
+    )
+
+
+def test_claim_leases_oldest_pending_job_once(queue, sqlite_pool):
+    queue.submit("job-1", "key-1")
+    queue.submit("job-2", "key-2")
+
+    first = queue.claim("worker-a")
+    second = queue.claim("worker-b")
+
+    assert (first["id"], second["id"]) == ("job-1", "job-2")
+    assert first["attempts"] == 1
+    assert queue.claim("worker-c") is None
+    row = job_row(sqlite_pool, "job-1")
+    assert (row["status"], row["lease_owner"]) == ("processing", "worker-a")
+
+
+def test_only_the_lease_owner_can_heartbeat_and_complete(queue, sqlite_pool):
+    queue.submit("job-1", "key-1")
+    queue.claim("worker-a")
+
+    assert not queue.heartbeat("job-1", "worker-b")
+    assert not queue.complete("job-1", "worker-b", "{}", 0)
+    assert queue.heartbeat("job-1", "worker-a")
+    assert queue.complete("job-1", "worker-a", '{"totalReviews": 0}', 0)
+
+    row = job_row(sqlite_pool, "job-1")
+    assert row["status"] == "completed"
+    assert row["lease_owner"] is None and row["inflight_key"] is None
+
+
+def test_reap_requeues_expired_lease_and_old_owner_loses_it(queue, sqlite_pool):
+    queue.submit("job-1", "key-1")
+    queue.claim("worker-a")
+    expire_lease(sqlite_pool, "job-1")
+
+    assert queue.reap() == 1
+    assert job_row(sqlite_pool, "job-1")["status"] == "pending"
+    assert not queue.complete("job-1", "worker-a", "{}", 0)
+
+    retried = queue.claim("worker-b")
+    assert (retried["id"], retried["attempts"]) == ("job-1", 2)
+
+
+def test_reap_fails_job_out_of_attempts(queue, sqlite_pool):
+    queue.submit("job-1", "key-1")
+    for worker in ("worker-a", "worker-b"):
+        queue.claim(worker)
+        expire_lease(sqlite_pool, "job-1")
+        queue.reap()
+
+    row = job_row(sqlite_pool, "job-1")
+    assert (row["status"], row["last_error"]) == ("failed", "lease expired")
+    assert row["inflight_key"] is None
+
+
+def test_fail_retries_after_backoff_then_gives_up(queue, sqlite_pool):
+    queue.submit("job-1", "key-1")
+    job = queue.claim("worker-a")
+
+    assert queue.fail(job, "worker-a", "boom")
+    row = job_row(sqlite_pool, "job-1")
+    assert (row["status"], row["lease_owner"]) == ("pending", None)
+    # run_after is retry_delay seconds away, so the job is not due yet
+    assert queue.claim("worker-a") is None
+
+    sqlite_pool.query("UPDATE analytics_jobs SET run_after = NULL")
+    job = queue.claim("worker-a")
+    assert queue.fail(job, "worker-a", "boom again")
+    row = job_row(sqlite_pool, "job-1")
+    assert (row["status"], row["last_error"]) == ("failed", "boom again")
+
+
+def test_submit_coalesces_in_flight_and_reuses_current_report(queue, sqlite_pool):
+    job, outcome = queue.submit("job-1", "key-1")
+    assert (job["id"], outcome) == ("job-1", "queued")
+    job, outcome = queue.submit("job-2", "key-1")
+    assert (job["id"], outcome) == ("job-1", "coalesced")
+
+    queue.claim("worker-a")
+    queue.complete("job-1", "worker-a", "{}", queue.data_version())
+    job, outcome = queue.submit("job-3", "key-1")
+    assert (job["id"], outcome) == ("job-1", "reused")
+
+    sqlite_pool.transaction_sync(lambda cursor: bump_data_version(cursor, shard=3))
+    job, outcome = queue.submit("job-4", "key-1")
+    assert (job["id"], outcome) == ("job-4", "queued")
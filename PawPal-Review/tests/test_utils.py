@@ -0,0 +1,17 @@
+import pytest
+
+from utils import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    position = {"d": "next", "c": "2025-11-21 09:00:00", "i": "review-1"}
+    token = encode_cursor(position)
+
+    assert "=" not in token
+    assert decode_cursor(token) == position
+
+
+@pytest.mark.parametrize("token", ["not a cursor", "", "bnVsbA", "W10"])
+def test_malformed_cursor_raises_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
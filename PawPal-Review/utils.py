@@ -1,3 +1,4 @@
+import base64
 import json
 import hashlib
 
@@ -6,3 +7,21 @@ def generate_etag(data: dict) -> str:
     """Generate ETag from data"""
     content = json.dumps(data, sort_keys=True, default=str)
     return hashlib.md5(content.encode()).hexdigest()
+
+
+def encode_cursor(data: dict) -> str:
+    """Encode a pagination position as an opaque URL-safe token"""
+    content = json.dumps(data, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(content.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Decode a token from encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(data, dict):
+        raise ValueError("Malformed cursor")
+    return data
@@ -0,0 +1,133 @@
+"""
+Analytics job worker for the Review service.
+
+Claims jobs from the analytics_jobs queue, renews the lease while a report
+is generated and records the result; periodically requeues jobs whose
+lease expired. Run any number of these next to the web service:
+
+    python worker.py
+
+The web process also runs ANALYTICS_INPROCESS_WORKERS of them on its own
+event loop (default 1; set 0 when dedicated workers are deployed).
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Any
+
+from analytics import generate_report, report_params
+from database import MySQLPool, mysql_pool
+from job_queue import JobQueue, job_queue
+from migrations import check_schema
+
+POLL_INTERVAL = float(os.getenv("ANALYTICS_POLL_INTERVAL", "1"))
+REAP_INTERVAL = float(os.getenv("ANALYTICS_REAP_INTERVAL", "30"))
+
+
+def job_params(job: dict[str, Any]) -> dict[str, Any]:
+    """The report request stored with a job; jobs from before 0005 have none."""
+    params = job.get("params")
+    if params is None:
+        return report_params()
+    return json.loads(params) if isinstance(params, (str, bytes, bytearray)) else params
+
+
+class AnalyticsWorker:
+    def __init__(
+        self,
+        pool: MySQLPool,
+        queue: JobQueue,
+        worker_id: str | None = None,
+        poll_interval: float = POLL_INTERVAL,
+        reap_interval: float = REAP_INTERVAL,
+    ) -> None:
+        self.pool = pool
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.reap_interval = reap_interval
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Process jobs until stop is set; a job in progress is finished first."""
+        print(f"Analytics worker {self.worker_id} started")
+        last_reap = 0.0
+        while not stop.is_set():
+            try:
+                if time.monotonic() - last_reap >= self.reap_interval:
+                    last_reap = time.monotonic()
+                    reaped = await self.pool.run(self.queue.reap)
+                    if reaped:
+                        print(f"Requeued {reaped} job(s) with expired leases")
+
+                job = await self.pool.run(self.queue.claim, self.worker_id)
+            except Exception as e:
+                print(f"Analytics worker {self.worker_id} cannot reach the queue: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.process(job)
+        print(f"Analytics worker {self.worker_id} stopped")
+
+    async def process(self, job: dict[str, Any]) -> None:
+        job_id = job["id"]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            # Read before computing: a write landing mid-report bumps the
+            # version past the one recorded, so the result is not reused
+            version = await self.pool.run(self.queue.data_version)
+            report = await self.pool.run(generate_report, self.pool, job_params(job))
+            owned = await self.pool.run(
+                self.queue.complete,
+                job_id,
+                self.worker_id,
+                json.dumps(report),
+                version,
+            )
+            if not owned:
+                print(f"Lease on analytics job {job_id} was lost; result discarded")
+        except Exception as e:
+            print(f"Error processing analytics job {job_id}: {e}")
+            try:
+                await self.pool.run(self.queue.fail, job, self.worker_id, str(e))
+            except Exception as update_error:
+                print(f"Error recording failure of job {job_id}: {update_error}")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                if not await self.pool.run(
+                    self.queue.heartbeat, job_id, self.worker_id
+                ):
+                    print(f"Lease on analytics job {job_id} lost")
+                    return
+            except Exception as e:
+                print(f"Heartbeat for analytics job {job_id} failed: {e}")
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await mysql_pool.run(check_schema, mysql_pool)
+        await AnalyticsWorker(mysql_pool, job_queue).run(stop)
+    finally:
+        mysql_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Compare WalkBitmapIndex against hash-set intersection for list_walks filters.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_bitmap_index --walks 2000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import UUID
+
+from services.bitmap_index import WalkBitmapIndex
+
+STATUSES = ("completed", "completed", "completed", "accepted", "requested", "cancelled")
+CITIES = ["New York", "Boston", "Chicago", "Seattle", "Austin"]
+START = datetime(2025, 1, 1)
+
+
+class HashSetIndex:
+    """Baseline: one Python set of walk ids per filter value, plus per-day sets."""
+
+    def __init__(self):
+        self.sets = {}
+        self.days = {}
+
+    def add(self, walk) -> None:
+        for key in (("owner_id", walk.owner_id), ("city", walk.city), ("status", walk.status)):
+            self.sets.setdefault(key, set()).add(walk.id)
+        self.days.setdefault(walk.scheduled_time.date(), set()).add(walk.id)
+
+    def match(self, city, status, scheduled_from, scheduled_to):
+        window = set()
+        for day, ids in self.days.items():
+            if scheduled_from.date() <= day < scheduled_to.date():
+                window |= ids
+        return list(self.sets[("city", city)] & self.sets[("status", status)] & window)
+
+
+def build(n: int, seed: int):
+    rng = random.Random(seed)
+    owners = [UUID(int=rng.getrandbits(128)) for _ in range(n // 50 or 1)]
+    bitmap, hashed = WalkBitmapIndex(), HashSetIndex()
+    for i in range(n):
+        walk = SimpleNamespace(
+            id=UUID(int=i),
+            owner_id=rng.choice(owners),
+            city=rng.choice(CITIES),
+            status=rng.choice(STATUSES),
+            scheduled_time=START + timedelta(minutes=rng.randrange(60 * 24 * 90)),
+        )
+        bitmap.add(walk)
+        hashed.add(walk)
+    return bitmap, hashed
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--walks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"Building indexes over {args.walks:,} walks...")
+    bitmap, hashed = build(args.walks, args.seed)
+
+    # Both queries are low-selectivity: ~50% completed, ~20% per city, ~2/3 of the window.
+    frm, to = START, START + timedelta(days=60)
+
+    def bitmap_and():
+        return len(bitmap._bitmaps[("status", "completed")] & bitmap._bitmaps[("city", "Boston")])
+
+    def hashed_and():
+        return len(hashed.sets[("status", "completed")] & hashed.sets[("city", "Boston")])
+
+    def bitmap_window():
+        return len(bitmap.match(city="Boston", status="completed", scheduled_from=frm, scheduled_to=to))
+
+    def hashed_window():
+        return len(hashed.match("Boston", "completed", frm, to))
+
+    assert bitmap_and() == hashed_and()
+    assert bitmap_window() == hashed_window()
+    for label, b, h in (
+        ("status AND city (count)", bitmap_and, hashed_and),
+        ("status AND city AND 60-day window", bitmap_window, hashed_window),
+    ):
+        tb, th = best_of(b, args.repeat), best_of(h, args.repeat)
+        print(f"{label:<36} bitmap {tb * 1000:8.2f} ms   hash-set {th * 1000:8.2f} ms   speedup {th / tb:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
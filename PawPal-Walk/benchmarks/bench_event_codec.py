@@ -0,0 +1,91 @@
+"""Payload size and CPU of JSON vs MessagePack for batches of walk events.
+
+Mirrors what the service does per request: JSON responses go through
+pydantic's JSON-mode dump plus ``json.dumps`` (as FastAPI's JSONResponse
+does); msgpack responses dump models in Python mode and pack UUIDs as
+16-byte bin values and datetimes as msgpack Timestamps. Parsing includes pydantic validation.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_event_codec --events 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+from uuid import UUID
+
+from pydantic import TypeAdapter
+
+from models.event import EventRead
+from utils.codec import packb, unpackb
+
+EVENT_TYPES = ("started", "location_update", "location_update", "photo_uploaded", "paused", "finished")
+batch = TypeAdapter(List[EventRead])
+
+
+def make_events(n: int, seed: int) -> List[EventRead]:
+    rng = random.Random(seed)
+    walk_ids = [UUID(int=rng.getrandbits(128)) for _ in range(max(1, n // 100))]
+    start = datetime(2025, 10, 12, 14, 0)
+    return [
+        EventRead(
+            id=UUID(int=rng.getrandbits(128)),
+            walk_id=rng.choice(walk_ids),
+            timestamp=start + timedelta(seconds=i),
+            created_at=start + timedelta(seconds=i, milliseconds=250),
+            event_type=rng.choice(EVENT_TYPES),
+            message=rng.choice((None, "Resting in the shade", "40.7812,-73.9665")),
+        )
+        for i in range(n)
+    ]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.seed)
+
+    def json_dump() -> bytes:
+        return json.dumps(batch.dump_python(events, mode="json"), separators=(",", ":")).encode()
+
+    def msgpack_dump() -> bytes:
+        return packb(batch.dump_python(events))
+
+    json_body, msgpack_body = json_dump(), msgpack_dump()
+    # msgpack timestamps decode as aware UTC datetimes; compare instants.
+    for a, b in zip(batch.validate_python(unpackb(msgpack_body)), events):
+        assert a.id == b.id and a.timestamp.replace(tzinfo=None) == b.timestamp
+
+    print(f"{args.events:,} events")
+    print(f"{'payload bytes':<28} json {len(json_body):>12,}   msgpack {len(msgpack_body):>12,}   "
+          f"ratio {len(msgpack_body) / len(json_body):.2f}")
+    for label, j, m in (
+        ("serialize", json_dump, msgpack_dump),
+        ("decode", lambda: json.loads(json_body), lambda: unpackb(msgpack_body)),
+        ("decode + validate", lambda: batch.validate_python(json.loads(json_body)),
+         lambda: batch.validate_python(unpackb(msgpack_body))),
+    ):
+        tj, tm = best_of(j, args.repeat), best_of(m, args.repeat)
+        print(f"{label:<28} json {tj * 1000:9.2f} ms   msgpack {tm * 1000:9.2f} ms   speedup {tj / tm:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Store probes saved by the event-id dedup filter on the real ingest path.
+
+Posts a stream of events, a share of them client retries, to ``POST
+/events`` of ``main.app`` in-process over ASGI. The event store is wrapped
+to count membership probes: with the filter, only ids it reports as
+possibly seen are looked up, and new ids go straight to the insert
+(``setdefault``), which also acknowledges resends from outside the window.
+Reports events per second, how many needed a probe, and the filter's
+observed false-positive rate.
+
+Rate limiting and admission control are disabled so every event is served.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_event_dedup --events 100000 --retry-rate 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from uuid import UUID
+
+os.environ.setdefault("EVENT_RATE_PER_WALK", "0")
+os.environ.setdefault("EVENT_RATE_PER_WALKER", "0")
+os.environ.setdefault("ADMISSION_MAX_IN_FLIGHT", "0")
+os.environ.setdefault("PUBSUB_WARMUP", "0")
+
+
+class ProbedStore(dict):
+    """The event store, counting ``id in events`` probes."""
+
+    probes = 0
+
+    def __contains__(self, key) -> bool:
+        ProbedStore.probes += 1
+        return super().__contains__(key)
+
+
+async def post(app, body: bytes) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/events", "raw_path": b"/events", "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(args) -> None:
+    import main
+
+    main.events = ProbedStore()
+    rng = random.Random(args.seed)
+    walk_id = str(UUID(int=rng.getrandbits(128)))
+    stream, recent = [], []
+    for _ in range(args.events):
+        if recent and rng.random() < args.retry_rate:
+            stream.append(rng.choice(recent))
+        else:
+            body = {"id": str(UUID(int=rng.getrandbits(128))), "walk_id": walk_id, "event_type": "location_update"}
+            stream.append(json.dumps(body).encode())
+            recent.append(stream[-1])
+            if len(recent) > 1000:
+                recent.pop(0)
+
+    statuses = {}
+    started = time.perf_counter()
+    for body in stream:
+        status = await post(main.app, body)
+        statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    stats = main.seen_events.stats
+    probes = ProbedStore.probes
+    created = statuses.get(201, 0)
+    print(f"{args.events:,} events: {created:,} created, {statuses.get(200, 0):,} resends acknowledged, "
+          f"other {sum(n for s, n in statuses.items() if s not in (200, 201)):,}")
+    print(f"{'events/s (handler path)':<28} {args.events / elapsed:,.0f}")
+    print(f"{'store probes':<28} {probes:,} ({probes / args.events:.1%} of events; without the filter 100%)")
+    print(f"{'false positives':<28} {stats['false_positives']:,} "
+          f"({stats['false_positives'] / max(1, created):.4%} of new ids, target {main.EVENT_DEDUP_ERROR_RATE:.2%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--retry-rate", type=float, default=0.05, help="Share of events that are resends.")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Sustained requests/sec and latency percentiles under many concurrent clients.
+
+Each of ``--concurrency`` clients issues requests back to back for
+``--seconds``: mostly walk lookups, plus event ingest, filtered listings and
+facet counts. Two transports:
+
+* in-process (default): requests are driven straight into ``main.app``
+  over ASGI, isolating the app (handlers, threadpool, validation) from
+  the HTTP server;
+* ``--url``: keep-alive HTTP/1.1 connections to a running server, e.g.
+  ``uvicorn main:app --port 8000``.
+
+Rate limiting and admission control are disabled so every request is served.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_load --concurrency 2000 --seconds 10
+    python -m benchmarks.bench_load --url http://127.0.0.1:8000 --concurrency 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+os.environ.setdefault("EVENT_RATE_PER_WALK", "0")
+os.environ.setdefault("EVENT_RATE_PER_WALKER", "0")
+os.environ.setdefault("ADMISSION_MAX_IN_FLIGHT", "0")
+
+CITIES = ("New York", "Boston", "Chicago", "Seattle")
+Request = Tuple[str, str, Optional[bytes]]  # (method, path with query, JSON body)
+
+
+def seed_walks(n: int, rng: random.Random) -> List[Tuple[str, bytes]]:
+    walks = []
+    for _ in range(n):
+        walk_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        body = {
+            "id": walk_id,
+            "owner_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "pet_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "location": f"{rng.randint(1, 999)} Main St",
+            "city": rng.choice(CITIES),
+            "scheduled_time": "2035-06-01T10:00:00",
+            "duration_minutes": 30,
+        }
+        walks.append((walk_id, json.dumps(body).encode()))
+    return walks
+
+
+def next_request(rng: random.Random, walk_ids: List[str]) -> Request:
+    roll = rng.random()
+    if roll < 0.6:
+        return "GET", f"/walks/{rng.choice(walk_ids)}", None
+    if roll < 0.8:
+        body = {"walk_id": rng.choice(walk_ids), "event_type": "location_update", "message": "40.78,-73.96"}
+        return "POST", "/events", json.dumps(body).encode()
+    if roll < 0.9:
+        return "GET", f"/walks?city={rng.choice(CITIES).replace(' ', '%20')}&status=completed", None
+    return "GET", "/walks/facets?fields=city,status", None
+
+
+# -----------------------------------------------------------------------------
+# Transports
+# -----------------------------------------------------------------------------
+
+class AsgiClient:
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, target: str, body: Optional[bytes]) -> int:
+        path, _, query = target.partition("?")
+        headers = [(b"host", b"bench")]
+        if body is not None:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "root_path": "", "headers": headers, "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        }
+        sent = False
+        status = 0
+        # Yield as a network read would, so the request queues behind the others
+        await asyncio.sleep(0)
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body or b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client: one connection per simulated client."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.reader = self.writer = None
+
+    async def request(self, method: str, target: str, body: Optional[bytes]) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {target} HTTP/1.1\r\nHost: {self.host}\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + (body or b""))
+        await self.writer.drain()
+        header = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(header.split(b" ", 2)[1])
+        length = 0
+        for line in header.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        if length:
+            await self.reader.readexactly(length)
+        return status
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+# -----------------------------------------------------------------------------
+# Driver
+# -----------------------------------------------------------------------------
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    walks = seed_walks(args.walks, rng)
+    walk_ids = [walk_id for walk_id, _ in walks]
+
+    if args.url:
+        def make_client():
+            return HttpClient(args.url)
+    else:
+        from main import app
+
+        def make_client():
+            return AsgiClient(app)
+
+    setup = make_client()
+    for _, body in walks:
+        await setup.request("POST", "/walks", body)
+    await setup.close()
+
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def worker(seed: int) -> None:
+        nonlocal errors
+        client = make_client()
+        local = random.Random(seed)
+        try:
+            while time.perf_counter() < deadline:
+                method, target, body = next_request(local, walk_ids)
+                started = time.perf_counter()
+                status = await client.request(method, target, body)
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors += 1
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"{args.concurrency} clients, {elapsed:.1f}s, {'HTTP ' + args.url if args.url else 'in-process ASGI'}")
+    print(f"requests {len(latencies):,}   errors {errors:,}   {len(latencies) / elapsed:,.0f} req/s")
+    print(f"latency p50 {pct(0.50):.1f} ms   p90 {pct(0.90):.1f} ms   p99 {pct(0.99):.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Target a running server instead of driving main.app in-process.")
+    parser.add_argument("--concurrency", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--walks", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Events per second replayed from the event log, per projection.
+
+Writes a synthetic log through the real EventLog writer (walk creates,
+assignment creates and status updates), then replays it.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_replay --events 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from models.assignment import AssignmentRead
+from models.walk import WalkRead
+from services.changes import Change
+from services.event_log import EventLog
+from services.replay import EarningsProjection, StateProjection, replay
+
+
+def write_log(path: str, n: int, seed: int) -> None:
+    rng = random.Random(seed)
+    log = EventLog(path)
+    walkers = [UUID(int=rng.getrandbits(128)) for _ in range(500)]
+    start = datetime(2025, 10, 1)
+    seq = 0
+    open_assignments = []
+    while seq < n:
+        seq += 1
+        roll = rng.random()
+        if roll < 0.4 or not open_assignments:
+            walk = WalkRead.model_construct(
+                id=UUID(int=rng.getrandbits(128)), owner_id=UUID(int=seq), pet_id=UUID(int=seq),
+                location="123 Riverside Park", city="New York", scheduled_time=start + timedelta(minutes=seq),
+                duration_minutes=rng.choice((30, 45, 60)), status="requested",
+                created_at=start, updated_at=start,
+            )
+            log.append(Change(seq, "walk", walk.id, "create", walk, start))
+            assignment = AssignmentRead.model_construct(
+                id=UUID(int=rng.getrandbits(128)), walk_id=walk.id, walker_id=rng.choice(walkers),
+                start_time=None, end_time=None, status="pending", notes=None, created_at=start, updated_at=start,
+            )
+            seq += 1
+            log.append(Change(seq, "assignment", assignment.id, "create", assignment, start))
+            open_assignments.append(assignment)
+        else:
+            assignment = open_assignments.pop(rng.randrange(len(open_assignments)))
+            done = assignment.model_copy(update={"status": rng.choice(("completed", "completed", "cancelled"))})
+            log.append(Change(seq, "assignment", done.id, "update", done, start))
+    log.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "walk-events.log")
+        write_log(path, args.events, args.seed)
+        size = os.path.getsize(path)
+        print(f"Log: {args.events:,} events, {size / 1e6:.1f} MB")
+        for projection in (StateProjection(), EarningsProjection()):
+            stats = replay(path, projection, batch_size=args.batch_size)
+            print(f"{projection.name:<10} {stats['events']:>10,} events in {stats['seconds']:6.2f}s "
+                  f"= {stats['events_per_second']:>12,.0f} events/s")
+        checkpoint = os.path.join(tmp, "replay.ckpt")
+        stats = replay(path, EarningsProjection(), batch_size=args.batch_size,
+                       checkpoint=checkpoint, checkpoint_every=max(1, args.events // 10))
+        print(f"{'earnings + 10 checkpoints':<10} {stats['seconds']:6.2f}s "
+              f"= {stats['events_per_second']:>12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
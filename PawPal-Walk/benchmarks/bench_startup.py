@@ -0,0 +1,99 @@
+"""Cold-start cost of the Walk service: import time and time to first 200.
+
+* ``python -X importtime -c "import main"``: total import time of ``main``
+  and the slowest modules by cumulative time.
+* Time to first 200: starts uvicorn in a fresh process and polls ``GET /``
+  until it answers, as Cloud Run's startup probe would.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from statistics import median
+from typing import List, Optional, Tuple
+
+
+def import_times() -> List[Tuple[int, int, str]]:
+    """(cumulative microseconds, nesting depth, module) for every import done by ``import main``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        depth = (len(module) - len(module.lstrip(" ")) - 1) // 2
+        rows.append((int(cumulative), depth, module.strip()))
+    return rows
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_200(timeout: float = 60.0) -> Optional[float]:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                return None
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        return None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list.")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totals = [next(us for us, _, module in rows if module == "main") for rows in runs]
+    print(f"import main: median {median(totals) / 1000:.0f} ms over {args.runs} runs")
+    # Modules imported directly by main, from the last run
+    top = sorted((us, module) for us, depth, module in runs[-1] if depth == 1)[::-1][: args.top]
+    for us, module in top:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    # Look uvicorn up without importing it into the benchmark process
+    if importlib.util.find_spec("uvicorn") is None:
+        print("time to first 200: skipped (uvicorn not installed)")
+        return
+    samples = [t for t in (time_to_first_200() for _ in range(args.runs)) if t is not None]
+    if not samples:
+        print("time to first 200: server did not come up")
+        return
+    print(f"time to first 200: median {median(samples) * 1000:.0f} ms, "
+          f"min {min(samples) * 1000:.0f} ms over {len(samples)} runs")
+
+
+if __name__ == "__main__":
+    main()
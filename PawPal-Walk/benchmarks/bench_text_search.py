@@ -0,0 +1,85 @@
+"""Query latency and memory of the walk/event text index vs a linear scan.
+
+Indexes synthetic event messages (Zipf-distributed vocabulary, with a few
+rare support-relevant words) and times typical support-staff queries
+against scanning every message, as the service had to before.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m benchmarks.bench_text_search --events 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from statistics import median
+from typing import List
+
+from services.text_index import TextIndex, tokenize
+
+COMMON = (
+    "dog walk park resting shade water break leash street corner home started finished "
+    "happy running sniffing grass bench river avenue broadway main photo uploaded buddy"
+).split()
+RARE = ("vet", "veterinarian", "injury", "injured", "limping", "bleeding", "lost", "collar")
+QUERIES = ("vet", "injury", "limp", "vet injury", "park shade", "river photo", "lost collar", "dog")
+
+
+def make_messages(n: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(COMMON))]
+    messages = []
+    for _ in range(n):
+        words = rng.choices(COMMON, weights, k=rng.randint(3, 10))
+        if rng.random() < 0.002:
+            words.insert(rng.randrange(len(words)), rng.choice(RARE))
+        messages.append(" ".join(words))
+    return messages
+
+
+def scan(messages: List[str], query: str) -> int:
+    tokens = tokenize(query)
+    return sum(
+        1 for m in messages
+        if all(any(w.startswith(t) for w in tokenize(m)) for t in tokens)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    messages = make_messages(args.events, args.seed)
+    index = TextIndex()
+    started = time.perf_counter()
+    for i, message in enumerate(messages):
+        index.add(i, message)
+    build = time.perf_counter() - started
+
+    stats = index.stats()
+    raw = stats["postings"] * 8  # one 8-byte slot per posting in a plain list of ints, before object overhead
+    print(f"{args.events:,} events indexed in {build:.1f}s "
+          f"({args.events / build:,.0f}/s), {stats['terms']:,} terms, {stats['postings']:,} postings")
+    print(f"posting storage {stats['posting_bytes'] / 2**20:.1f} MiB "
+          f"(vs >= {raw / 2**20:.1f} MiB as uncompressed int lists)")
+
+    sample = messages[: min(len(messages), 100_000)]
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            total, _ = index.search(query, limit=20)
+            timings.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        scan(sample, query)
+        scan_ms = (time.perf_counter() - t0) * 1000 * len(messages) / len(sample)
+        print(f"q={query!r:<14} matches {total:>9,}   index {median(timings) * 1000:8.2f} ms   "
+              f"scan ~{scan_ms:9.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
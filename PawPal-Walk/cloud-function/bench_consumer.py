@@ -0,0 +1,93 @@
+"""Throughput of the batched walk-event consumer, in messages per second.
+
+Generates messages in the publisher's format and runs them through
+``consume`` from a LocalSource, against a one-message-at-a-time baseline
+(decode and apply each message individually, as the old function did).
+
+Usage (from the cloud-function directory):
+
+    python bench_consumer.py --messages 200000 --batch-size 1000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from consumer import LocalSource, WalkViews, consume
+
+CITIES = ("New York", "Boston", "Chicago", "Seattle", "Austin")
+WALK_STATUSES = ("requested", "accepted", "completed", "cancelled", "expired")
+ASSIGNMENT_STATUSES = ("pending", "in_progress", "completed", "cancelled")
+
+
+def make_messages(n: int, seed: int) -> List[bytes]:
+    rng = random.Random(seed)
+    walk_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(max(1, n // 4))]
+    walker_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(max(1, n // 50))]
+    start = datetime(2025, 10, 12, 8, 0)
+    messages = []
+    for i in range(n):
+        at = (start + timedelta(seconds=i)).isoformat()
+        walk_id = rng.choice(walk_ids)
+        if rng.random() < 0.6:
+            event_type = "walk_created" if rng.random() < 0.5 else "walk_updated"
+            data = {
+                "id": walk_id,
+                "owner_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "city": rng.choice(CITIES),
+                "status": rng.choice(WALK_STATUSES),
+                "scheduled_time": at,
+                "duration_minutes": 30,
+            }
+        else:
+            event_type = "assignment_updated"
+            data = {
+                "id": str(uuid.uuid5(uuid.NAMESPACE_OID, walk_id)),
+                "walk_id": walk_id,
+                "walker_id": rng.choice(walker_ids),
+                "status": rng.choice(ASSIGNMENT_STATUSES),
+                "updated_at": at,
+            }
+        message = {"event_type": event_type, "data": data, "timestamp": at, "version": [1, i + 1]}
+        messages.append(json.dumps(message).encode())
+    return messages
+
+
+def one_at_a_time(messages: List[bytes]) -> WalkViews:
+    views = WalkViews()
+    for body in messages:
+        views.apply([json.loads(body)])
+    return views
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.seed)
+
+    started = time.perf_counter()
+    baseline = one_at_a_time(messages)
+    single = time.perf_counter() - started
+
+    views = WalkViews()
+    stats = consume(LocalSource(messages), views, args.batch_size)
+    assert views.snapshot() == baseline.snapshot(), "batched views differ from the per-message baseline"
+
+    print(f"{args.messages:,} messages, batch size {args.batch_size}")
+    print(f"{'one at a time':<20} {args.messages / single:>12,.0f} msg/s")
+    print(f"{'batched':<20} {stats['messages_per_second']:>12,.0f} msg/s   "
+          f"speedup {single / stats['seconds']:.2f}x")
+    print(f"open walks by city: {dict(sorted(views.open_walks.items()))}")
+
+
+if __name__ == "__main__":
+    main()
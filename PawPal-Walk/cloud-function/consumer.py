@@ -0,0 +1,334 @@
+"""Batched consumer for Walk service events.
+
+Pulls messages in batches from a local stand-in (a newline-delimited JSON
+file) or a Pub/Sub subscription, decodes each batch with a single
+``json.loads`` call and applies it to materialized views:
+
+* open walks (``requested`` / ``accepted``) per city
+* walker activity: assignments per status and last activity time
+
+Views are upserts keyed by walk / assignment id. Every message carries the
+mutation's ``version``; the last applied version of each id is kept (for
+deleted ids too, as tombstones), and a message whose version is not newer
+is dropped. Pub/Sub redelivery and reordering therefore cannot bring back an
+older status or resurrect a deleted walk. A batch is acknowledged only after the views have been committed
+(written atomically to ``--views`` when given), so a crash between commit and
+ack only causes redelivery, never loss.
+
+Usage (from the cloud-function directory):
+
+    python consumer.py --local walk-events.ndjson --views views.json
+    python consumer.py --subscription walk-events-consumer --views views.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PROJECT_ID = "w4153-walk-service"
+OPEN_STATUSES = ("requested", "accepted")
+
+Message = Tuple[Any, bytes]  # (ack id, raw message body)
+
+
+# -----------------------------------------------------------------------------
+# Decoding
+# -----------------------------------------------------------------------------
+
+def decode_batch(bodies: List[bytes]) -> List[Optional[Dict[str, Any]]]:
+    """Decode a batch of JSON message bodies in one parser call.
+
+    Falls back to per-message decoding if any body is malformed; malformed
+    messages decode to None so one bad message cannot block the batch.
+    """
+    if not bodies:
+        return []
+    try:
+        decoded = json.loads(b"[" + b",".join(bodies) + b"]")
+        if len(decoded) == len(bodies):
+            return decoded
+    except ValueError:
+        pass
+    messages: List[Optional[Dict[str, Any]]] = []
+    for body in bodies:
+        try:
+            messages.append(json.loads(body))
+        except ValueError:
+            print(f"Warning: dropping undecodable message: {body[:80]!r}")
+            messages.append(None)
+    return messages
+
+
+# -----------------------------------------------------------------------------
+# Materialized views
+# -----------------------------------------------------------------------------
+
+class WalkViews:
+    """Per-city open-walk counts and per-walker activity, built from walk events."""
+
+    def __init__(self):
+        # Latest known state per id; the counts below are derived incrementally
+        self.walks: Dict[str, Tuple[str, str]] = {}  # walk id -> (city, status)
+        self.assignments: Dict[str, Tuple[str, str]] = {}  # assignment id -> (walker id, status)
+        self.open_walks: Dict[str, int] = defaultdict(int)
+        self.walker_activity: Dict[str, Dict[str, Any]] = {}
+        # "walk:<id>" / "assignment:<id>" -> last applied version, kept after deletes
+        self.versions: Dict[str, List[int]] = {}
+        self.stale = 0
+
+    def _walk(self, walk_id: str, new: Optional[Tuple[str, str]]) -> None:
+        old = self.walks.pop(walk_id, None)
+        if old is not None and old[1] in OPEN_STATUSES:
+            self.open_walks[old[0]] -= 1
+            if not self.open_walks[old[0]]:
+                del self.open_walks[old[0]]
+        if new is not None:
+            self.walks[walk_id] = new
+            if new[1] in OPEN_STATUSES:
+                self.open_walks[new[0]] += 1
+
+    def _assignment(self, assignment_id: str, new: Optional[Tuple[str, str]], at: Optional[str]) -> None:
+        old = self.assignments.pop(assignment_id, None)
+        if old is not None:
+            counts = self.walker_activity[old[0]]["assignments"]
+            counts[old[1]] -= 1
+            if not counts[old[1]]:
+                del counts[old[1]]
+        if new is not None:
+            self.assignments[assignment_id] = new
+            activity = self.walker_activity.setdefault(new[0], {"assignments": {}, "last_active": None})
+            activity["assignments"][new[1]] = activity["assignments"].get(new[1], 0) + 1
+            if at and (activity["last_active"] is None or at > activity["last_active"]):
+                activity["last_active"] = at
+
+    def _is_stale(self, key: str, version: Optional[List[int]]) -> bool:
+        """Record ``version`` for ``key`` unless an equal or newer one was applied.
+
+        Messages without a version (older publishers) are always applied.
+        """
+        if version is None:
+            return False
+        seen = self.versions.get(key)
+        if seen is not None and seen >= version:
+            self.stale += 1
+            return True
+        self.versions[key] = version
+        return False
+
+    def apply(self, messages: Iterable[Optional[Dict[str, Any]]]) -> int:
+        """Apply decoded messages; returns how many were recognised and not stale."""
+        applied = 0
+        for message in messages:
+            if not message:
+                continue
+            event_type = message.get("event_type", "")
+            data = message.get("data") or {}
+            resource_id = data.get("id")
+            if resource_id is None:
+                continue
+            kind = event_type.split("_", 1)[0]
+            if kind not in ("walk", "assignment"):
+                continue
+            if self._is_stale(f"{kind}:{resource_id}", message.get("version")):
+                continue
+            if kind == "walk":
+                deleted = event_type == "walk_deleted"
+                self._walk(resource_id, None if deleted else (data.get("city"), data.get("status")))
+            else:
+                deleted = event_type == "assignment_deleted"
+                at = data.get("updated_at") or message.get("timestamp")
+                self._assignment(resource_id, None if deleted else (data.get("walker_id"), data.get("status")), at)
+            applied += 1
+        return applied
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "open_walks_by_city": dict(self.open_walks),
+            "walker_activity": self.walker_activity,
+            "walks": self.walks,
+            "assignments": self.assignments,
+            "versions": self.versions,
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        self.walks = {k: tuple(v) for k, v in snapshot["walks"].items()}
+        self.assignments = {k: tuple(v) for k, v in snapshot["assignments"].items()}
+        self.open_walks = defaultdict(int, snapshot["open_walks_by_city"])
+        self.walker_activity = snapshot["walker_activity"]
+        self.versions = snapshot.get("versions", {})
+
+    def commit(self, path: Optional[str]) -> None:
+        """Persist the views atomically; a no-op for in-memory runs."""
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+
+# -----------------------------------------------------------------------------
+# Message sources
+# -----------------------------------------------------------------------------
+
+class LocalSource:
+    """Local stand-in for a Pub/Sub subscription.
+
+    Messages come from an iterable of raw bodies (e.g. lines of an NDJSON
+    file). Pulled messages stay leased until acknowledged; ``nack`` puts them
+    back for redelivery, as Pub/Sub does when an ack deadline expires.
+    """
+
+    def __init__(self, bodies: Iterable[bytes]):
+        self._bodies = iter(bodies)
+        self._redeliver: List[Message] = []
+        self._leased: Dict[int, bytes] = {}
+        self._next_id = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "LocalSource":
+        def lines():
+            with open(path, "rb") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line
+        return cls(lines())
+
+    def pull(self, max_messages: int) -> List[Message]:
+        batch = self._redeliver[:max_messages]
+        del self._redeliver[:max_messages]
+        while len(batch) < max_messages:
+            body = next(self._bodies, None)
+            if body is None:
+                break
+            batch.append((self._next_id, body))
+            self._next_id += 1
+        for ack_id, body in batch:
+            self._leased[ack_id] = body
+        return batch
+
+    def ack(self, ack_ids: List[Any]) -> None:
+        for ack_id in ack_ids:
+            self._leased.pop(ack_id, None)
+
+    def nack(self, ack_ids: List[Any]) -> None:
+        for ack_id in ack_ids:
+            body = self._leased.pop(ack_id, None)
+            if body is not None:
+                self._redeliver.append((ack_id, body))
+
+
+class PubSubSource:
+    """Synchronous-pull source over a Pub/Sub subscription."""
+
+    def __init__(self, subscription: str, project_id: str = PROJECT_ID):
+        from google.cloud import pubsub_v1
+
+        self._client = pubsub_v1.SubscriberClient()
+        self._path = self._client.subscription_path(project_id, subscription)
+
+    def pull(self, max_messages: int) -> List[Message]:
+        response = self._client.pull(
+            request={"subscription": self._path, "max_messages": max_messages},
+            timeout=30,
+        )
+        return [(m.ack_id, m.message.data) for m in response.received_messages]
+
+    def ack(self, ack_ids: List[Any]) -> None:
+        if ack_ids:
+            self._client.acknowledge(request={"subscription": self._path, "ack_ids": ack_ids})
+
+    def nack(self, ack_ids: List[Any]) -> None:
+        if ack_ids:
+            self._client.modify_ack_deadline(
+                request={"subscription": self._path, "ack_ids": ack_ids, "ack_deadline_seconds": 0}
+            )
+
+
+# -----------------------------------------------------------------------------
+# Consumer loop
+# -----------------------------------------------------------------------------
+
+def consume(
+    source,
+    views: WalkViews,
+    batch_size: int = 1000,
+    views_path: Optional[str] = None,
+    commit_every: int = 1,
+    stop_when_idle: bool = True,
+) -> Dict[str, Any]:
+    """Pull, decode and apply batches; commit every ``commit_every`` batches, then ack them.
+
+    Returns throughput statistics.
+    """
+    started = time.perf_counter()
+    received = applied = batches = 0
+    pending: List[Any] = []  # ack ids applied but not yet committed
+    while True:
+        batch = source.pull(batch_size)
+        if batch:
+            pending.extend(ack_id for ack_id, _ in batch)
+            try:
+                applied += views.apply(decode_batch([body for _, body in batch]))
+            except Exception:
+                source.nack(pending)
+                raise
+            received += len(batch)
+            batches += 1
+        if pending and (not batch or batches % commit_every == 0):
+            try:
+                views.commit(views_path)
+            except Exception:
+                source.nack(pending)
+                raise
+            source.ack(pending)
+            pending = []
+        if not batch and stop_when_idle:
+            break
+
+    elapsed = time.perf_counter() - started
+    return {
+        "messages": received,
+        "applied": applied,
+        "batches": batches,
+        "seconds": elapsed,
+        "messages_per_second": received / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Consume Walk service events into materialized views.")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--local", help="NDJSON file of raw messages (local stand-in for Pub/Sub).")
+    source_group.add_argument("--subscription", help="Pub/Sub subscription to pull from.")
+    parser.add_argument("--project", default=PROJECT_ID)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--views", help="JSON file the views are committed to (and resumed from).")
+    parser.add_argument("--commit-every", type=int, default=1, help="Batches per commit (acks wait for it).")
+    args = parser.parse_args(argv)
+
+    views = WalkViews()
+    if args.views and os.path.exists(args.views):
+        with open(args.views) as f:
+            views.restore(json.load(f))
+
+    if args.local:
+        source = LocalSource.from_file(args.local)
+    else:
+        source = PubSubSource(args.subscription, args.project)
+
+    stats = consume(source, views, args.batch_size, args.views, args.commit_every, stop_when_idle=bool(args.local))
+    print(
+        f"Consumed {stats['messages']:,} messages in {stats['batches']:,} batches, "
+        f"{stats['seconds']:.2f}s ({stats['messages_per_second']:,.0f} msg/s)"
+    )
+    print(json.dumps({"open_walks_by_city": dict(views.open_walks)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,23 @@
 import base64
-import json
+
+from consumer import WalkViews, decode_batch
+
+# Warm instances keep their views between invocations
+views = WalkViews()
+
 
 def handle_walk_event(event, context):
-    if "data" in event:
-        decoded = base64.b64decode(event["data"]).decode("utf-8")
-        message = json.loads(decoded)
-        print("🔥 Cloud Function triggered!")
-        print("Event type:", message.get("event_type"))
-        print("Payload:", message.get("payload"))
-    else:
-        print("No data found in event")
\ No newline at end of file
+    """Pub/Sub-triggered entry point: one message per invocation.
+
+    The publisher sends ``{"event_type", "data", "timestamp"}``; the message
+    is applied to the same views the batched consumer (consumer.py) maintains.
+    """
+    if "data" not in event:
+        print("No data found in event")
+        return
+    message = decode_batch([base64.b64decode(event["data"])])[0]
+    if message is None:
+        return
+    views.apply([message])
+    print(f"Walk event {message.get('event_type')}: {message.get('data', {}).get('id')}")
+    print("Open walks by city:", dict(views.open_walks))
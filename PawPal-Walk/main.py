@@ -1,41 +1,326 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import socket
-from datetime import datetime
-from typing import Dict, List, Optional
+import time
+from contextlib import asynccontextmanager
+import heapq
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
 from uuid import UUID
 
-from fastapi import FastAPI, HTTPException, Query, Path
+from fastapi import FastAPI, HTTPException, Query, Path, Request, Response
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from utils.codec import MsgPackRoute, negotiate
 from utils.db import get_connection
-from utils.pubsub import publish_event
+from utils.pubsub import PublishQueue, warm_up as warm_up_pubsub
+from middleware.admission import AdmissionControl, AdmissionGate
 
 from models.walk import WalkCreate, WalkRead, WalkUpdate
 from models.assignment import AssignmentCreate, AssignmentRead, AssignmentUpdate
 from models.event import EventCreate, EventRead
+from models.change import ChangeRead, ChangesPage
+from models.analytics import DemandHeatmap
+from models.availability import AvailabilityCreate, AvailabilityRead, AvailabilityUpdate
+from models.search import SearchHit, SearchResults
+from models.schedule import (
+    OccurrenceMaterialize,
+    OccurrenceRead,
+    ScheduleCreate,
+    ScheduleRead,
+    ScheduleUpdate,
+)
+from services.availability import AvailabilityIndex
+from services.bitmap_index import WalkBitmapIndex
+from services.changes import Change, ChangeLog
+from services.dedup import SeenIds
+from services.demand import DemandRollup
+from services.event_log import latest_records, open_event_log
+from services.facets import FACET_FIELDS, FacetCounter
+from services.rate_limit import TokenBucketLimiter, retry_after_header
+from services.text_index import WalkEventSearch
+from services.recurrence import RecurrenceRule
+from services.timer_wheel import TimerWheel
+from utils.timeutil import as_utc, to_epoch
 
 port = int(os.environ.get("FASTAPIPORT", 8000))
 
+# Expiry of stale requests: a `requested` walk expires this long after its
+# scheduled_time; a `pending` assignment is cancelled at its walk's
+# scheduled_time or after the TTL, whichever comes first.
+WALK_REQUEST_GRACE_SECONDS = float(os.environ.get("WALK_REQUEST_GRACE_SECONDS", 0))
+ASSIGNMENT_PENDING_TTL_SECONDS = float(os.environ.get("ASSIGNMENT_PENDING_TTL_SECONDS", 24 * 3600))
+EXPIRY_TICK_SECONDS = float(os.environ.get("EXPIRY_TICK_SECONDS", 1))
+
+# Build the Pub/Sub client in the background at startup (1), or on first publish (0)
+PUBSUB_WARMUP = os.environ.get("PUBSUB_WARMUP", "1") == "1"
+# Events waiting for the publisher thread; beyond this, new events are dropped
+PUBSUB_MAX_BACKLOG = int(os.environ.get("PUBSUB_MAX_BACKLOG", 10_000))
+
+# Demand rollups: hourly ring buffer around now, then daily, then weekly buckets
+DEMAND_PAST_HOURS = int(os.environ.get("DEMAND_PAST_HOURS", 7 * 24))
+DEMAND_FUTURE_HOURS = int(os.environ.get("DEMAND_FUTURE_HOURS", 14 * 24))
+DEMAND_DAILY_DAYS = int(os.environ.get("DEMAND_DAILY_DAYS", 90))
+
+# Event ingest dedup: ids are remembered (probabilistically) for this long
+EVENT_DEDUP_WINDOW_SECONDS = float(os.environ.get("EVENT_DEDUP_WINDOW_SECONDS", 600))
+EVENT_DEDUP_CAPACITY = int(os.environ.get("EVENT_DEDUP_CAPACITY", 1_000_000))
+EVENT_DEDUP_ERROR_RATE = float(os.environ.get("EVENT_DEDUP_ERROR_RATE", 0.001))
+
+# Event ingest rate limits (events/second and burst size; rate 0 disables) and
+# global admission control (max requests in flight before shedding; 0 disables)
+EVENT_RATE_PER_WALK = float(os.environ.get("EVENT_RATE_PER_WALK", 5))
+EVENT_BURST_PER_WALK = float(os.environ.get("EVENT_BURST_PER_WALK", 20))
+EVENT_RATE_PER_WALKER = float(os.environ.get("EVENT_RATE_PER_WALKER", 10))
+EVENT_BURST_PER_WALKER = float(os.environ.get("EVENT_BURST_PER_WALKER", 40))
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", 256))
+
 # -----------------------------------------------------------------------------
 # In-memory "databases"
 # -----------------------------------------------------------------------------
 walks: Dict[UUID, WalkRead] = {}
 assignments: Dict[UUID, AssignmentRead] = {}
 events: Dict[UUID, EventRead] = {}
+schedules: Dict[UUID, ScheduleRead] = {}
+availability: Dict[UUID, AvailabilityRead] = {}
+
+# Schedule occurrences materialized as real walks: schedule id -> {occurrence time (UTC) -> walk id}
+schedule_walks: Dict[UUID, Dict[datetime, UUID]] = {}
+
+# Derived views maintained on every walk mutation
+walk_facets = FacetCounter()
+walk_index = WalkBitmapIndex()
+walk_demand = DemandRollup(DEMAND_PAST_HOURS, DEMAND_FUTURE_HOURS, DEMAND_DAILY_DAYS)
+# Text search over walk locations and event messages
+search_index = WalkEventSearch()
+walk_views = (walk_facets, walk_index, walk_demand, search_index)
+# Walker availability windows per city, for "who is free for [t, t + d)"
+availability_index = AvailabilityIndex()
+
+# Sequence-numbered feed of every walk/assignment/event/schedule mutation,
+# optionally mirrored to an append-only event log for offline replay and
+# for restoring the stores on the next start
+WALK_EVENT_LOG = os.environ.get("WALK_EVENT_LOG")
+event_log = open_event_log(WALK_EVENT_LOG)
+changes = ChangeLog(sink=event_log.append if event_log else None)
+
+# Recently ingested event ids, so client retries are acknowledged without a store probe
+seen_events = SeenIds(EVENT_DEDUP_WINDOW_SECONDS, EVENT_DEDUP_CAPACITY, EVENT_DEDUP_ERROR_RATE)
+
+# Per-walk and per-walker event ingest limits; the walker of a walk comes from its assignment
+walk_limiter = TokenBucketLimiter(EVENT_RATE_PER_WALK, EVENT_BURST_PER_WALK)
+walker_limiter = TokenBucketLimiter(EVENT_RATE_PER_WALKER, EVENT_BURST_PER_WALKER)
+walk_walkers: Dict[UUID, UUID] = {}
+# Writes are also refused while the event log writer is too far behind
+admission = AdmissionGate(ADMISSION_MAX_IN_FLIGHT, saturated=event_log.saturated if event_log else None)
+
+# Pending expiries, keyed by ("walk" | "assignment", id)
+expiry_wheel = TimerWheel(tick=EXPIRY_TICK_SECONDS, now=time.time())
+
+# Outgoing Pub/Sub events, published in mutation order by one thread
+publisher = PublishQueue(PUBSUB_MAX_BACKLOG)
+
+
+def publish_in_background(event_type: str, data: dict, seq: int) -> None:
+    """Queue an event for the publisher thread without delaying the response.
+
+    Publishing waits on the network, so it is the one thing handlers must
+    not do on the event loop. One thread publishes in mutation order; a
+    full backlog sheds events instead of growing. The message carries the mutation's version ``[run epoch, changes seq]``,
+    which orders messages about one resource even across restarts, so
+    consumers can drop redelivered or reordered stale ones.
+    """
+    publisher.submit(event_type, data, [changes.epoch, seq])
+
+
+def sync_walk_views(old: Optional[WalkRead], new: Optional[WalkRead]) -> int:
+    """Apply a walk create (old=None), update or delete (new=None) to every derived view.
+
+    Returns the change's seq.
+    """
+    for view in walk_views:
+        if old is None:
+            view.add(new)
+        elif new is None:
+            view.remove(old)
+        else:
+            view.replace(old, new)
+    if old is None:
+        seq = changes.record("walk", new.id, "create", new)
+    elif new is None:
+        seq = changes.record("walk", old.id, "delete")
+    else:
+        seq = changes.record("walk", new.id, "update", new)
+    if new is None:
+        expiry_wheel.cancel(("walk", old.id))
+    else:
+        schedule_walk_expiry(new)
+        if old is not None and old.scheduled_time != new.scheduled_time:
+            # Pending assignments expire no later than the walk's start
+            for assignment in list(assignments.values()):
+                if assignment.walk_id == new.id:
+                    schedule_assignment_expiry(assignment)
+    return seq
+
+
+# -----------------------------------------------------------------------------
+# Expiry of stale walk requests and pending assignments
+# -----------------------------------------------------------------------------
+def schedule_walk_expiry(walk: WalkRead) -> None:
+    if walk.status == "requested":
+        expiry_wheel.schedule(("walk", walk.id), to_epoch(walk.scheduled_time) + WALK_REQUEST_GRACE_SECONDS)
+    else:
+        expiry_wheel.cancel(("walk", walk.id))
+
+
+def schedule_assignment_expiry(assignment: AssignmentRead) -> None:
+    if assignment.status != "pending":
+        expiry_wheel.cancel(("assignment", assignment.id))
+        return
+    deadline = to_epoch(assignment.created_at) + ASSIGNMENT_PENDING_TTL_SECONDS
+    walk = walks.get(assignment.walk_id)
+    if walk is not None:
+        deadline = min(deadline, to_epoch(walk.scheduled_time))
+    expiry_wheel.schedule(("assignment", assignment.id), deadline)
+
+
+def track_walk_walker(old: Optional[AssignmentRead], new: Optional[AssignmentRead]) -> None:
+    """Keep walk_walkers pointing at the walker of each walk's live assignment."""
+    if old is not None and walk_walkers.get(old.walk_id) == old.walker_id:
+        del walk_walkers[old.walk_id]
+    if new is not None and new.status != "cancelled":
+        walk_walkers[new.walk_id] = new.walker_id
+
+
+# Stores rebuilt from the event log at startup, by change resource
+LOGGED_STORES = {
+    "walk": (walks, WalkRead),
+    "assignment": (assignments, AssignmentRead),
+    "event": (events, EventRead),
+    "schedule": (schedules, ScheduleRead),
+    "availability": (availability, AvailabilityRead),
+}
+
+
+def restore_from_event_log(path: Optional[str]) -> int:
+    """Rebuild the stores, derived views and changes feed from an earlier run's log (run at startup).
+
+    The changes feed resumes after the last logged seq, so sequence numbers
+    never repeat across restarts. Returns the number of resources restored.
+    """
+    if not path:
+        return 0
+    restored = 0
+    for seq, resource, op, resource_id, changed_at, data in latest_records(path):
+        store, model = LOGGED_STORES[resource]
+        item = None
+        if data is not None:
+            item = store[resource_id] = model(**data)
+            restored += 1
+        changes.restore(Change(seq, resource, resource_id, op, item, changed_at))
+
+    for walk in walks.values():
+        for view in walk_views:
+            view.add(walk)
+        # Skipped occurrences come back with their schedule; materialized
+        # ones are recorded on their walks
+        if walk.schedule_id in schedules and walk.occurrence_time is not None:
+            schedule_walks.setdefault(walk.schedule_id, {})[as_utc(walk.occurrence_time)] = walk.id
+    for assignment in assignments.values():
+        track_walk_walker(None, assignment)
+    for event in events.values():
+        search_index.add(event)
+    for window in availability.values():
+        availability_index.add(window)
+    print(f"Event log: restored {restored} resources up to seq {changes.last_seq}")
+    return restored
+
+
+def reschedule_expiries() -> None:
+    """Rebuild every expiry timer from stored state (run at startup)."""
+    for walk in list(walks.values()):
+        schedule_walk_expiry(walk)
+    for assignment in list(assignments.values()):
+        schedule_assignment_expiry(assignment)
+
+
+def expire_due(now: Optional[float] = None) -> int:
+    """Advance the expiry wheel and apply every transition that fell due."""
+    expired = 0
+    for (kind, resource_id), _ in expiry_wheel.advance(time.time() if now is None else now):
+        if kind == "walk":
+            walk = walks.get(resource_id)
+            if walk is None or walk.status != "requested":
+                continue
+            walks[resource_id] = walk.model_copy(update={"status": "expired", "updated_at": datetime.utcnow()})
+            seq = sync_walk_views(walk, walks[resource_id])
+            publish_in_background("walk_expired", walks[resource_id].model_dump(), seq)
+        else:
+            assignment = assignments.get(resource_id)
+            if assignment is None or assignment.status != "pending":
+                continue
+            assignments[resource_id] = assignment.model_copy(
+                update={"status": "cancelled", "updated_at": datetime.utcnow()}
+            )
+            seq = changes.record("assignment", resource_id, "update", assignments[resource_id])
+            track_walk_walker(assignment, assignments[resource_id])
+            publish_in_background("assignment_expired", assignments[resource_id].model_dump(), seq)
+        expired += 1
+    return expired
+
+
+async def run_expiry_wheel() -> None:
+    while True:
+        await asyncio.sleep(EXPIRY_TICK_SECONDS)
+        try:
+            # Runs on the event loop like the handlers, so state needs no locking.
+            expire_due()
+        except Exception as e:
+            print(f"Warning: expiry sweep failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    restore_from_event_log(WALK_EVENT_LOG)
+    reschedule_expiries()
+    expiry_task = asyncio.create_task(run_expiry_wheel())
+    # Serve immediately; the gRPC client is built on a worker thread meanwhile.
+    warmup_task = asyncio.create_task(run_in_threadpool(warm_up_pubsub)) if PUBSUB_WARMUP else None
+    yield
+    expiry_task.cancel()
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await run_in_threadpool(publisher.close)
+    if event_log is not None:
+        event_log.close()
 
 app = FastAPI(
     title="Walk Service API",
     description="Microservice for managing dog-walk requests, assignments, and event logs.",
     version="0.2.0",
+    lifespan=lifespan,
 )
+# Accept application/msgpack request bodies on every route
+app.router.route_class = MsgPackRoute
+# Shed load once too many requests are in flight, and writes while the event log is behind
+app.add_middleware(AdmissionControl, gate=admission, exempt=("/", "/metrics/ingest"))
 
 @app.get("/test-db")
-def test_db():
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT NOW() AS server_time;")
-        result = cursor.fetchone()
-    conn.close()
+async def test_db():
+    def query():
+        conn = get_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT NOW() AS server_time;")
+            result = cursor.fetchone()
+        conn.close()
+        return result
+
+    # Blocking driver: the only handler that still needs a worker thread
+    result = await run_in_threadpool(query)
     return {"cloud_sql_time": result["server_time"]}
 
 # -----------------------------------------------------------------------------
@@ -43,56 +328,89 @@ def test_db():
 # -----------------------------------------------------------------------------
 
 @app.post("/walks", response_model=WalkRead, status_code=201)
-def create_walk(walk: WalkCreate):
+async def create_walk(walk: WalkCreate, request: Request):
     if walk.id in walks:
         raise HTTPException(status_code=400, detail="Walk already exists")
 
     new_walk = WalkRead(**walk.model_dump())
     walks[walk.id] = new_walk
+    seq = sync_walk_views(None, new_walk)
 
-    publish_event("walk_created", new_walk.model_dump())
+    publish_in_background("walk_created", new_walk.model_dump(), seq)
 
-    return new_walk
+    return negotiate(request, new_walk, status_code=201)
 
 
 @app.get("/walks", response_model=List[WalkRead])
-def list_walks(
+async def list_walks(
+    request: Request,
     owner_id: Optional[UUID] = Query(None),
     city: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    scheduled_from: Optional[datetime] = Query(None, description="Only walks scheduled at or after this time."),
+    scheduled_to: Optional[datetime] = Query(None, description="Only walks scheduled before this time."),
 ):
-    results = list(walks.values())
-    if owner_id:
-        results = [w for w in results if w.owner_id == owner_id]
-    if city:
-        results = [w for w in results if w.city == city]
-    if status:
-        results = [w for w in results if w.status == status]
-    return results
+    if not (owner_id or city or status or scheduled_from or scheduled_to):
+        return negotiate(request, list(walks.values()))
+
+    ids = walk_index.match(owner_id, city, status, scheduled_from, scheduled_to)
+    results = [walks[walk_id] for walk_id in ids]
+    # The index buckets times per hour; trim the edges exactly.
+    if scheduled_from:
+        start = as_utc(scheduled_from)
+        results = [w for w in results if as_utc(w.scheduled_time) >= start]
+    if scheduled_to:
+        end = as_utc(scheduled_to)
+        results = [w for w in results if as_utc(w.scheduled_time) < end]
+    return negotiate(request, results)
+
+
+@app.get("/walks/facets", response_model=Dict[str, Dict[str, int]])
+async def walk_facet_counts(
+    fields: str = Query("city,status", description=f"Comma-separated subset of: {', '.join(FACET_FIELDS)}."),
+    status: Optional[str] = Query(None, description="Only count walks with this status."),
+):
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in FACET_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facet field(s): {', '.join(unknown)}")
+    return walk_facets.facets(requested, status=status)
 
 
 @app.get("/walks/{walk_id}", response_model=WalkRead)
-def get_walk(walk_id: UUID):
+async def get_walk(walk_id: UUID, request: Request):
     if walk_id not in walks:
         raise HTTPException(status_code=404, detail="Walk not found")
-    return walks[walk_id]
+    return negotiate(request, walks[walk_id])
 
 
 @app.patch("/walks/{walk_id}", response_model=WalkRead)
-def update_walk(walk_id: UUID, update: WalkUpdate):
+async def update_walk(walk_id: UUID, update: WalkUpdate, request: Request):
     if walk_id not in walks:
         raise HTTPException(status_code=404, detail="Walk not found")
-    stored = walks[walk_id].model_dump()
+    old = walks[walk_id]
+    stored = old.model_dump()
     stored.update(update.model_dump(exclude_unset=True))
+    stored["updated_at"] = datetime.utcnow()
     walks[walk_id] = WalkRead(**stored)
-    return walks[walk_id]
+    seq = sync_walk_views(old, walks[walk_id])
+    publish_in_background("walk_updated", walks[walk_id].model_dump(), seq)
+    return negotiate(request, walks[walk_id])
 
 
 @app.delete("/walks/{walk_id}", status_code=204)
-def delete_walk(walk_id: UUID):
+async def delete_walk(walk_id: UUID):
     if walk_id not in walks:
         raise HTTPException(status_code=404, detail="Walk not found")
-    del walks[walk_id]
+    deleted = walks.pop(walk_id)
+    if deleted.schedule_id is not None and deleted.occurrence_time is not None:
+        # Free the occurrence so the schedule can materialize it again
+        materialized = schedule_walks.get(deleted.schedule_id, {})
+        at = as_utc(deleted.occurrence_time)
+        if materialized.get(at) == walk_id:
+            del materialized[at]
+    seq = sync_walk_views(deleted, None)
+    publish_in_background("walk_deleted", deleted.model_dump(), seq)
     return None
 
 
@@ -100,15 +418,19 @@ def delete_walk(walk_id: UUID):
 # Assignment Endpoints
 # -----------------------------------------------------------------------------
 @app.post("/assignments", response_model=AssignmentRead, status_code=201)
-def create_assignment(assign: AssignmentCreate):
+async def create_assignment(assign: AssignmentCreate):
     if assign.id in assignments:
         raise HTTPException(status_code=400, detail="Assignment already exists")
     assignments[assign.id] = AssignmentRead(**assign.model_dump())
+    seq = changes.record("assignment", assign.id, "create", assignments[assign.id])
+    track_walk_walker(None, assignments[assign.id])
+    schedule_assignment_expiry(assignments[assign.id])
+    publish_in_background("assignment_created", assignments[assign.id].model_dump(), seq)
     return assignments[assign.id]
 
 
 @app.get("/assignments", response_model=List[AssignmentRead])
-def list_assignments(
+async def list_assignments(
     walker_id: Optional[UUID] = Query(None),
     status: Optional[str] = Query(None),
 ):
@@ -121,69 +443,494 @@ def list_assignments(
 
 
 @app.get("/assignments/{assignment_id}", response_model=AssignmentRead)
-def get_assignment(assignment_id: UUID):
+async def get_assignment(assignment_id: UUID):
     if assignment_id not in assignments:
         raise HTTPException(status_code=404, detail="Assignment not found")
     return assignments[assignment_id]
 
 
 @app.patch("/assignments/{assignment_id}", response_model=AssignmentRead)
-def update_assignment(assignment_id: UUID, update: AssignmentUpdate):
+async def update_assignment(assignment_id: UUID, update: AssignmentUpdate):
     if assignment_id not in assignments:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    stored = assignments[assignment_id].model_dump()
+    old = assignments[assignment_id]
+    stored = old.model_dump()
     stored.update(update.model_dump(exclude_unset=True))
     assignments[assignment_id] = AssignmentRead(**stored)
+    seq = changes.record("assignment", assignment_id, "update", assignments[assignment_id])
+    track_walk_walker(old, assignments[assignment_id])
+    schedule_assignment_expiry(assignments[assignment_id])
+    publish_in_background("assignment_updated", assignments[assignment_id].model_dump(), seq)
     return assignments[assignment_id]
 
 
 @app.delete("/assignments/{assignment_id}", status_code=204)
-def delete_assignment(assignment_id: UUID):
+async def delete_assignment(assignment_id: UUID):
     if assignment_id not in assignments:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    del assignments[assignment_id]
+    deleted = assignments.pop(assignment_id)
+    track_walk_walker(deleted, None)
+    seq = changes.record("assignment", assignment_id, "delete")
+    publish_in_background("assignment_deleted", deleted.model_dump(), seq)
+    expiry_wheel.cancel(("assignment", assignment_id))
+    return None
+
+
+# -----------------------------------------------------------------------------
+# Walker Availability Endpoints
+# -----------------------------------------------------------------------------
+def get_availability_or_404(availability_id: UUID) -> AvailabilityRead:
+    if availability_id not in availability:
+        raise HTTPException(status_code=404, detail="Availability window not found")
+    return availability[availability_id]
+
+
+def free_walkers(city: str, start: datetime, duration_minutes: int) -> List[AvailabilityRead]:
+    """One covering window per walker free for the whole of [start, start + duration)."""
+    start = as_utc(start)
+    window_ids = availability_index.free(city, start, start + timedelta(minutes=duration_minutes))
+    by_walker: Dict[UUID, AvailabilityRead] = {}
+    for window_id in window_ids:
+        window = availability[window_id]
+        by_walker.setdefault(window.walker_id, window)
+    return sorted(by_walker.values(), key=lambda w: (w.start_time, str(w.walker_id)))
+
+
+@app.post("/availability", response_model=AvailabilityRead, status_code=201)
+async def create_availability(window: AvailabilityCreate):
+    if window.id in availability:
+        raise HTTPException(status_code=400, detail="Availability window already exists")
+    availability[window.id] = AvailabilityRead(**window.model_dump())
+    availability_index.add(availability[window.id])
+    changes.record("availability", window.id, "create", availability[window.id])
+    return availability[window.id]
+
+
+@app.get("/availability", response_model=List[AvailabilityRead])
+async def list_availability(
+    walker_id: Optional[UUID] = Query(None),
+    city: Optional[str] = Query(None),
+):
+    results = list(availability.values())
+    if walker_id:
+        results = [w for w in results if w.walker_id == walker_id]
+    if city:
+        results = [w for w in results if w.city == city]
+    return results
+
+
+@app.get("/availability/free", response_model=List[AvailabilityRead])
+async def find_free_walkers(
+    city: str = Query(...),
+    start: datetime = Query(..., description="Walk start time."),
+    duration_minutes: int = Query(..., ge=1, description="Walk duration; the window must cover all of it."),
+):
+    """Walkers with an availability window in `city` covering the whole walk."""
+    return free_walkers(city, start, duration_minutes)
+
+
+@app.get("/availability/{availability_id}", response_model=AvailabilityRead)
+async def get_availability(availability_id: UUID):
+    return get_availability_or_404(availability_id)
+
+
+@app.patch("/availability/{availability_id}", response_model=AvailabilityRead)
+async def update_availability(availability_id: UUID, update: AvailabilityUpdate):
+    old = get_availability_or_404(availability_id)
+    stored = old.model_dump()
+    stored.update(update.model_dump(exclude_unset=True))
+    stored["updated_at"] = datetime.utcnow()
+    try:
+        # The merged window is validated as a whole, like a created one
+        window = AvailabilityRead(**stored)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]} for err in e.errors()],
+        )
+    availability[availability_id] = window
+    availability_index.replace(old, availability[availability_id])
+    changes.record("availability", availability_id, "update", availability[availability_id])
+    return availability[availability_id]
+
+
+@app.delete("/availability/{availability_id}", status_code=204)
+async def delete_availability(availability_id: UUID):
+    availability_index.remove(get_availability_or_404(availability_id))
+    del availability[availability_id]
+    changes.record("availability", availability_id, "delete")
+    return None
+
+
+@app.get("/walks/{walk_id}/available-walkers", response_model=List[AvailabilityRead])
+async def walk_available_walkers(walk_id: UUID):
+    """Walkers free in the walk's city for its whole scheduled duration."""
+    if walk_id not in walks:
+        raise HTTPException(status_code=404, detail="Walk not found")
+    walk = walks[walk_id]
+    return free_walkers(walk.city, walk.scheduled_time, walk.duration_minutes)
+
+
+# -----------------------------------------------------------------------------
+# Recurring Schedule Endpoints
+# -----------------------------------------------------------------------------
+# Occurrences are expanded lazily from the rule for the requested window; only
+# skipped occurrences (exceptions) and materialized ones are stored.
+
+@lru_cache(maxsize=1024)
+def parse_rule(rule: str) -> RecurrenceRule:
+    return RecurrenceRule.parse(rule)
+
+
+def expand_schedule(schedule: ScheduleRead, start: datetime, end: datetime) -> Iterator[OccurrenceRead]:
+    skipped = {as_utc(t) for t in schedule.skipped}
+    materialized = schedule_walks.get(schedule.id, {})
+    for at in parse_rule(schedule.rule).between(schedule.start_time, start, end):
+        if at in skipped:
+            continue
+        walk_id = materialized.get(at)
+        if walk_id is None:
+            yield OccurrenceRead(
+                schedule_id=schedule.id,
+                occurrence_time=at,
+                status="scheduled",
+                city=schedule.city,
+                location=schedule.location,
+                duration_minutes=schedule.duration_minutes,
+            )
+            continue
+        walk = walks.get(walk_id)
+        if walk is not None:
+            yield OccurrenceRead(
+                schedule_id=schedule.id,
+                occurrence_time=at,
+                walk_id=walk.id,
+                status=walk.status,
+                city=walk.city,
+                location=walk.location,
+                duration_minutes=walk.duration_minutes,
+            )
+
+
+def occurrence_window(start: Optional[datetime], end: Optional[datetime]):
+    start = as_utc(start) if start else datetime.utcnow()
+    end = as_utc(end) if end else start + timedelta(days=31)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    return start, end
+
+
+def get_schedule_or_404(schedule_id: UUID) -> ScheduleRead:
+    if schedule_id not in schedules:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return schedules[schedule_id]
+
+
+@app.post("/schedules", response_model=ScheduleRead, status_code=201)
+async def create_schedule(schedule: ScheduleCreate):
+    if schedule.id in schedules:
+        raise HTTPException(status_code=400, detail="Schedule already exists")
+    schedules[schedule.id] = ScheduleRead(**schedule.model_dump())
+    changes.record("schedule", schedule.id, "create", schedules[schedule.id])
+    return schedules[schedule.id]
+
+
+@app.get("/schedules", response_model=List[ScheduleRead])
+async def list_schedules(
+    owner_id: Optional[UUID] = Query(None),
+    city: Optional[str] = Query(None),
+):
+    results = list(schedules.values())
+    if owner_id:
+        results = [s for s in results if s.owner_id == owner_id]
+    if city:
+        results = [s for s in results if s.city == city]
+    return results
+
+
+@app.get("/schedules/occurrences", response_model=List[OccurrenceRead])
+async def list_all_occurrences(
+    owner_id: Optional[UUID] = Query(None),
+    city: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, alias="from", description="Window start (default: now)."),
+    end: Optional[datetime] = Query(None, alias="to", description="Window end, exclusive (default: from + 31 days)."),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Occurrences of every matching schedule in the window, merged in time order."""
+    start, end = occurrence_window(start, end)
+    selected = await list_schedules(owner_id=owner_id, city=city)
+    merged = heapq.merge(
+        *(expand_schedule(s, start, end) for s in selected),
+        key=lambda o: o.occurrence_time,
+    )
+    return list(islice(merged, limit))
+
+
+@app.get("/schedules/{schedule_id}", response_model=ScheduleRead)
+async def get_schedule(schedule_id: UUID):
+    return get_schedule_or_404(schedule_id)
+
+
+@app.patch("/schedules/{schedule_id}", response_model=ScheduleRead)
+async def update_schedule(schedule_id: UUID, update: ScheduleUpdate):
+    stored = get_schedule_or_404(schedule_id).model_dump()
+    stored.update(update.model_dump(exclude_unset=True))
+    stored["updated_at"] = datetime.utcnow()
+    schedules[schedule_id] = ScheduleRead(**stored)
+    changes.record("schedule", schedule_id, "update", schedules[schedule_id])
+    return schedules[schedule_id]
+
+
+@app.delete("/schedules/{schedule_id}", status_code=204)
+async def delete_schedule(schedule_id: UUID):
+    """Delete the schedule; walks already materialized from it are kept."""
+    get_schedule_or_404(schedule_id)
+    del schedules[schedule_id]
+    schedule_walks.pop(schedule_id, None)
+    changes.record("schedule", schedule_id, "delete")
+    return None
+
+
+@app.get("/schedules/{schedule_id}/occurrences", response_model=List[OccurrenceRead])
+async def list_occurrences(
+    schedule_id: UUID,
+    start: Optional[datetime] = Query(None, alias="from", description="Window start (default: now)."),
+    end: Optional[datetime] = Query(None, alias="to", description="Window end, exclusive (default: from + 31 days)."),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    schedule = get_schedule_or_404(schedule_id)
+    start, end = occurrence_window(start, end)
+    return list(islice(expand_schedule(schedule, start, end), limit))
+
+
+@app.post("/schedules/{schedule_id}/occurrences", response_model=WalkRead, status_code=201)
+async def materialize_occurrence(schedule_id: UUID, request: OccurrenceMaterialize):
+    """Turn one occurrence into a real walk (e.g. when it is accepted or edited)."""
+    schedule = get_schedule_or_404(schedule_id)
+    at = as_utc(request.occurrence_time)
+    if not parse_rule(schedule.rule).includes(schedule.start_time, at):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+    if at in {as_utc(t) for t in schedule.skipped}:
+        raise HTTPException(status_code=400, detail="Occurrence was skipped")
+    materialized = schedule_walks.setdefault(schedule_id, {})
+    if materialized.get(at) in walks:
+        raise HTTPException(status_code=400, detail="Occurrence already materialized")
+
+    new_walk = WalkRead(
+        owner_id=schedule.owner_id,
+        pet_id=schedule.pet_id,
+        location=request.location or schedule.location,
+        city=schedule.city,
+        scheduled_time=request.scheduled_time or at,
+        duration_minutes=request.duration_minutes or schedule.duration_minutes,
+        status=request.status,
+        schedule_id=schedule_id,
+        occurrence_time=at,
+    )
+    walks[new_walk.id] = new_walk
+    materialized[at] = new_walk.id
+    seq = sync_walk_views(None, new_walk)
+
+    publish_in_background("walk_created", new_walk.model_dump(), seq)
+
+    return new_walk
+
+
+@app.delete("/schedules/{schedule_id}/occurrences/{occurrence_time}", status_code=204)
+async def skip_occurrence(schedule_id: UUID, occurrence_time: datetime):
+    """Cancel a single occurrence, deleting its walk if it was materialized."""
+    schedule = get_schedule_or_404(schedule_id)
+    at = as_utc(occurrence_time)
+    if not parse_rule(schedule.rule).includes(schedule.start_time, at):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+    walk_id = schedule_walks.get(schedule_id, {}).pop(at, None)
+    if walk_id in walks:
+        deleted = walks.pop(walk_id)
+        seq = sync_walk_views(deleted, None)
+        publish_in_background("walk_deleted", deleted.model_dump(), seq)
+    if at not in {as_utc(t) for t in schedule.skipped}:
+        schedules[schedule_id] = schedule.model_copy(
+            update={"skipped": schedule.skipped + [at], "updated_at": datetime.utcnow()}
+        )
+        changes.record("schedule", schedule_id, "update", schedules[schedule_id])
     return None
 
 
 # -----------------------------------------------------------------------------
 # Event Endpoints
 # -----------------------------------------------------------------------------
+def throttle_event(walk_id: UUID) -> None:
+    wait = walk_limiter.acquire(walk_id)
+    if not wait:
+        walker_id = walk_walkers.get(walk_id)
+        if walker_id is not None:
+            wait = walker_limiter.acquire(walker_id)
+            if wait:
+                # Refused by the walker's bucket: the event never counts against the walk
+                walk_limiter.refund(walk_id)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many events, slow down",
+            headers=retry_after_header(wait),
+        )
+
+
 @app.post("/events", response_model=EventRead, status_code=201)
-def create_event(event: EventCreate):
-    if event.id in events:
-        raise HTTPException(status_code=400, detail="Event already exists")
-    events[event.id] = EventRead(**event.model_dump())
-    return events[event.id]
+async def create_event(event: EventCreate, request: Request, response: Response):
+    """Store an event; resending an existing id is acknowledged with 200 and the stored event.
+
+    New events are rate-limited per walk and per assigned walker; throttled
+    clients get 429 with ``Retry-After``. Resends are acknowledged before
+    throttling, so retrying an accepted event never spends tokens or gets 429.
+    """
+    # Only a filter hit probes the store; a miss is definitive within the window
+    if seen_events.check_and_add(event.id, events.__contains__):
+        response.status_code = 200
+        return negotiate(request, events[event.id], status_code=200)
+
+    new_event = EventRead(**event.model_dump())
+    stored = events.setdefault(event.id, new_event)
+    if stored is not new_event:
+        # Resent from outside the dedup window: the insert itself finds it
+        response.status_code = 200
+        return negotiate(request, stored, status_code=200)
+    try:
+        throttle_event(event.walk_id)
+    except HTTPException:
+        # Nothing awaited since the insert, so no other request saw the event.
+        # A throttled id stays in the dedup filter; its resend is then a
+        # false positive, resolved by the store probe
+        del events[event.id]
+        raise
+    search_index.add(new_event)
+    changes.record("event", event.id, "create", new_event)
+    return negotiate(request, new_event, status_code=201)
 
 
 @app.get("/events", response_model=List[EventRead])
-def list_events(walk_id: Optional[UUID] = Query(None)):
+async def list_events(request: Request, walk_id: Optional[UUID] = Query(None)):
     results = list(events.values())
     if walk_id:
         results = [e for e in results if e.walk_id == walk_id]
-    return results
+    return negotiate(request, results)
 
 
 @app.get("/events/{event_id}", response_model=EventRead)
-def get_event(event_id: UUID):
+async def get_event(event_id: UUID, request: Request):
     if event_id not in events:
         raise HTTPException(status_code=404, detail="Event not found")
-    return events[event_id]
+    return negotiate(request, events[event_id])
 
 
 @app.delete("/events/{event_id}", status_code=204)
-def delete_event(event_id: UUID):
+async def delete_event(event_id: UUID):
     if event_id not in events:
         raise HTTPException(status_code=404, detail="Event not found")
-    del events[event_id]
+    search_index.remove(events.pop(event_id))
+    changes.record("event", event_id, "delete")
     return None
 
 
+# -----------------------------------------------------------------------------
+# Analytics
+# -----------------------------------------------------------------------------
+@app.get("/analytics/demand", response_model=DemandHeatmap)
+async def demand_heatmap(
+    start: Optional[datetime] = Query(None, alias="from", description="Window start (default: now)."),
+    end: Optional[datetime] = Query(None, alias="to", description="Window end, exclusive (default: from + 7 days)."),
+    city: Optional[str] = Query(None),
+    status: str = Query("requested", description="Walk status to count, or 'all'."),
+):
+    """Demand heatmap served from rollup counters; never scans walks."""
+    start = as_utc(start) if start else datetime.utcnow()
+    end = as_utc(end) if end else start + timedelta(days=7)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    counted = None if status == "all" else status
+    cities = walk_demand.heatmap(start, end, city=city, status=counted)
+    return DemandHeatmap(
+        start=start,
+        end=end,
+        status=counted,
+        cities=cities,
+        total=sum(sum(row) for row in cities.values()),
+    )
+
+
+# -----------------------------------------------------------------------------
+# Search
+# -----------------------------------------------------------------------------
+@app.get("/search", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, description="Words to match; each also matches as a word prefix."),
+    kind: Optional[str] = Query(None, pattern="^(walk|event)$", description="Only return walks or events."),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Walks by location and events by message containing every query word, best match first."""
+    total, hits = search_index.search(q, limit=limit, kind=kind)
+    results = []
+    for (hit_kind, hit_id), score in hits:
+        if hit_kind == "walk":
+            walk = walks.get(hit_id)
+            if walk is not None:
+                results.append(SearchHit(kind="walk", id=hit_id, walk_id=hit_id, score=score, text=walk.location))
+        else:
+            event = events.get(hit_id)
+            if event is not None:
+                results.append(
+                    SearchHit(kind="event", id=hit_id, walk_id=event.walk_id, score=score, text=event.message)
+                )
+    return SearchResults(query=q, total=total, results=results)
+
+
+# -----------------------------------------------------------------------------
+# Changes Feed
+# -----------------------------------------------------------------------------
+@app.get("/changes", response_model=ChangesPage)
+async def list_changes(
+    since: int = Query(0, ge=0, description="Return changes with a sequence number greater than this."),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes to return."),
+):
+    page, last_seq, has_more = changes.since(since, limit)
+    return ChangesPage(
+        results=[
+            ChangeRead(
+                seq=c.seq,
+                resource=c.resource,
+                id=c.id,
+                op=c.op,
+                deleted=c.data is None,
+                data=c.data.model_dump(mode="json") if c.data is not None else None,
+                changed_at=c.changed_at,
+            )
+            for c in page
+        ],
+        last_seq=last_seq,
+        has_more=has_more,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Ingest Metrics
+# -----------------------------------------------------------------------------
+@app.get("/metrics/ingest")
+async def ingest_metrics():
+    """Rate-limit, admission-control, dedup and publish counters since startup."""
+    return {
+        "walk_rate_limit": walk_limiter.snapshot(),
+        "walker_rate_limit": walker_limiter.snapshot(),
+        "admission": admission.snapshot(),
+        "event_dedup": dict(seen_events.stats),
+        "publish": dict(publisher.stats),
+    }
+
+
 # -----------------------------------------------------------------------------
 # Root
 # -----------------------------------------------------------------------------
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to the Walk Service API. See /docs for details."}
 
 
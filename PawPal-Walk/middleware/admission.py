@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from typing import Callable, Dict, Iterable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdmissionGate:
+    """In-flight request counter and limit shared with the middleware.
+
+    Kept separate from the middleware because Starlette instantiates
+    middleware lazily; the service holds the gate to export its counters.
+    A ``max_in_flight`` of 0 disables shedding. While ``saturated()`` is
+    true (e.g. the event log writer is too far behind), writes are refused
+    and reads still admitted.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 256,
+        retry_after: int = 1,
+        saturated: Optional[Callable[[], bool]] = None,
+    ):
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.saturated = saturated
+        self.in_flight = 0
+        self.stats: Dict[str, int] = {"admitted": 0, "shed": 0, "shed_writes": 0, "peak_in_flight": 0}
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": self.in_flight, "max_in_flight": self.max_in_flight}
+
+
+class AdmissionControl:
+    """ASGI middleware that sheds load once too many requests are in flight.
+
+    The number of requests inside the app is the service's queue depth
+    (waiting on the event loop, or on worker threads for blocking I/O).
+    Past the gate's ``max_in_flight`` new requests are refused immediately
+    with 503 and ``Retry-After`` instead of waiting behind the backlog.
+    Paths in ``exempt`` (health checks, metrics) are always admitted.
+    """
+
+    def __init__(self, app: ASGIApp, gate: AdmissionGate, exempt: Iterable[str] = ()):
+        self.app = app
+        self.gate = gate
+        self.exempt = frozenset(exempt)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+        gate = self.gate
+        if gate.max_in_flight and gate.in_flight >= gate.max_in_flight:
+            gate.stats["shed"] += 1
+            await self._reject(send)
+            return
+        if gate.saturated is not None and scope["method"] not in READ_METHODS and gate.saturated():
+            gate.stats["shed_writes"] += 1
+            await self._reject(send)
+            return
+
+        # Runs on the event loop, so plain integer updates are race-free.
+        gate.in_flight += 1
+        gate.stats["admitted"] += 1
+        if gate.in_flight > gate.stats["peak_in_flight"]:
+            gate.stats["peak_in_flight"] = gate.in_flight
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.in_flight -= 1
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Service overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.gate.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
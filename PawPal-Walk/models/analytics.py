@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class DemandHeatmap(BaseModel):
+    """Walk demand per city and hour of day (UTC) over a time window."""
+
+    start: datetime = Field(..., alias="from", description="Window start (UTC).")
+    end: datetime = Field(..., alias="to", description="Window end, exclusive (UTC).")
+    status: Optional[str] = Field(
+        "requested",
+        description="Walk status counted, or null for all statuses.",
+        json_schema_extra={"example": "requested"},
+    )
+    cities: Dict[str, List[int]] = Field(
+        default_factory=dict,
+        description="City -> 24 counts, index = hour of day of scheduled_time (UTC).",
+    )
+    total: int = Field(..., description="Sum of all counts.", json_schema_extra={"example": 42})
+
+    model_config = {
+        "populate_by_name": True,
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "from": "2025-10-13T00:00:00Z",
+                    "to": "2025-10-20T00:00:00Z",
+                    "status": "requested",
+                    "cities": {"New York": [0, 0, 0, 0, 0, 0, 1, 4, 6, 3, 1, 0, 2, 1, 0, 0, 1, 3, 5, 4, 2, 1, 0, 0]},
+                    "total": 34,
+                }
+            ]
+        },
+    }
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID, uuid4
+from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+
+from utils.timeutil import as_utc
+
+
+class AvailabilityBase(BaseModel):
+    """A window of time in which a walker can take walks in a city."""
+
+    walker_id: UUID = Field(
+        ...,
+        description="Unique ID of the walker.",
+        json_schema_extra={"example": "22222222-2222-4222-8222-222222222222"},
+    )
+    city: str = Field(
+        ...,
+        description="City the walker is available in.",
+        json_schema_extra={"example": "New York"},
+    )
+    start_time: datetime = Field(
+        ...,
+        description="Start of the window (ISO 8601 UTC).",
+        json_schema_extra={"example": "2025-10-13T07:00:00Z"},
+    )
+    end_time: datetime = Field(
+        ...,
+        description="End of the window, exclusive (ISO 8601 UTC).",
+        json_schema_extra={"example": "2025-10-13T12:00:00Z"},
+    )
+
+    @model_validator(mode="after")
+    def check_window(self):
+        if as_utc(self.end_time) <= as_utc(self.start_time):
+            raise ValueError("end_time must be after start_time")
+        return self
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "walker_id": "22222222-2222-4222-8222-222222222222",
+                    "city": "New York",
+                    "start_time": "2025-10-13T07:00:00Z",
+                    "end_time": "2025-10-13T12:00:00Z",
+                }
+            ]
+        }
+    }
+
+
+class AvailabilityCreate(AvailabilityBase):
+    """Payload for publishing an availability window."""
+    id: UUID = Field(
+        default_factory=uuid4,
+        description="Server-generated window ID.",
+        json_schema_extra={"example": "66666666-6666-4666-8666-666666666666"},
+    )
+
+
+class AvailabilityUpdate(BaseModel):
+    """Partial update of an availability window."""
+    city: Optional[str] = Field(None, description="Updated city.")
+    start_time: Optional[datetime] = Field(None, description="New window start.")
+    end_time: Optional[datetime] = Field(None, description="New window end.")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {"end_time": "2025-10-13T14:00:00Z"},
+            ]
+        }
+    }
+
+
+class AvailabilityRead(AvailabilityBase):
+    """Server representation returned to clients."""
+    id: UUID = Field(default_factory=uuid4)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
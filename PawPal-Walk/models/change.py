@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ChangeRead(BaseModel):
+    """One entry of the changes feed: the latest state of a single resource."""
+
+    seq: int = Field(
+        ...,
+        description="Monotonically increasing sequence number of the mutation.",
+        json_schema_extra={"example": 42},
+    )
+    resource: str = Field(
+        ...,
+        description="Resource type: walk, assignment, event, schedule or availability.",
+        json_schema_extra={"example": "walk"},
+    )
+    id: UUID = Field(
+        ...,
+        description="ID of the changed resource.",
+        json_schema_extra={"example": "99999999-9999-4999-8999-999999999999"},
+    )
+    op: str = Field(
+        ...,
+        description="Mutation kind: create, update or delete.",
+        json_schema_extra={"example": "update"},
+    )
+    deleted: bool = Field(
+        default=False,
+        description="True for tombstones; `data` is then null.",
+        json_schema_extra={"example": False},
+    )
+    data: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Current representation of the resource, or null if deleted.",
+    )
+    changed_at: datetime = Field(
+        ...,
+        description="When the mutation was recorded (UTC).",
+        json_schema_extra={"example": "2025-10-12T15:10:05Z"},
+    )
+
+
+class ChangesPage(BaseModel):
+    """A page of the changes feed."""
+
+    results: List[ChangeRead] = Field(default_factory=list)
+    last_seq: int = Field(
+        ...,
+        description="Pass as `since` to fetch the next page.",
+        json_schema_extra={"example": 42},
+    )
+    has_more: bool = Field(
+        ...,
+        description="True if more changes are available after `last_seq`.",
+        json_schema_extra={"example": False},
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "results": [
+                        {
+                            "seq": 41,
+                            "resource": "walk",
+                            "id": "99999999-9999-4999-8999-999999999999",
+                            "op": "update",
+                            "deleted": False,
+                            "data": {"status": "accepted"},
+                            "changed_at": "2025-10-12T15:10:05Z",
+                        },
+                        {
+                            "seq": 42,
+                            "resource": "event",
+                            "id": "88888888-8888-4888-8888-888888888888",
+                            "op": "delete",
+                            "deleted": True,
+                            "data": None,
+                            "changed_at": "2025-10-12T15:11:00Z",
+                        },
+                    ],
+                    "last_seq": 42,
+                    "has_more": False,
+                }
+            ]
+        }
+    }
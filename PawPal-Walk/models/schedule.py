@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import List, Optional
+from uuid import UUID, uuid4
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+
+from services.recurrence import RecurrenceRule
+
+
+def _canonical_rule(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return value
+    return str(RecurrenceRule.parse(value))
+
+
+class ScheduleBase(BaseModel):
+    """A recurring walk request; occurrences are expanded on demand, not stored."""
+
+    owner_id: UUID = Field(
+        ...,
+        description="Unique ID of the dog owner requesting the walks.",
+        json_schema_extra={"example": "11111111-1111-4111-8111-111111111111"},
+    )
+    pet_id: UUID = Field(
+        ...,
+        description="Unique ID of the pet to be walked.",
+        json_schema_extra={"example": "550e8400-e29b-41d4-a716-446655440000"},
+    )
+    location: str = Field(
+        ...,
+        description="Walking start location (street or park).",
+        json_schema_extra={"example": "123 Riverside Park, NY"},
+    )
+    city: str = Field(
+        ...,
+        description="City where the walks occur.",
+        json_schema_extra={"example": "New York"},
+    )
+    start_time: datetime = Field(
+        ...,
+        description="First occurrence (ISO 8601 UTC); later occurrences share its time of day.",
+        json_schema_extra={"example": "2025-10-13T08:00:00Z"},
+    )
+    duration_minutes: int = Field(
+        ...,
+        description="Expected duration of each walk, in minutes.",
+        json_schema_extra={"example": 30},
+    )
+    rule: str = Field(
+        ...,
+        description="RRULE subset: FREQ=DAILY|WEEKLY, INTERVAL, BYDAY, COUNT, UNTIL (evaluated in UTC).",
+        json_schema_extra={"example": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"},
+    )
+
+    @field_validator("rule")
+    @classmethod
+    def check_rule(cls, value: str) -> str:
+        return _canonical_rule(value)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "owner_id": "11111111-1111-4111-8111-111111111111",
+                    "pet_id": "550e8400-e29b-41d4-a716-446655440000",
+                    "location": "123 Riverside Park, NY",
+                    "city": "New York",
+                    "start_time": "2025-10-13T08:00:00Z",
+                    "duration_minutes": 30,
+                    "rule": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+                }
+            ]
+        }
+    }
+
+
+class ScheduleCreate(ScheduleBase):
+    """Payload for creating a recurring schedule."""
+    id: UUID = Field(
+        default_factory=uuid4,
+        description="Server-generated schedule ID.",
+        json_schema_extra={"example": "77777777-7777-4777-8777-777777777777"},
+    )
+
+
+class ScheduleUpdate(BaseModel):
+    """Partial update for a schedule; affects only occurrences not yet materialized."""
+    location: Optional[str] = Field(None, description="Updated walk location.")
+    city: Optional[str] = Field(None, description="Updated walk city.")
+    duration_minutes: Optional[int] = Field(None, description="New duration (minutes).")
+    rule: Optional[str] = Field(None, description="New recurrence rule.")
+
+    @field_validator("rule")
+    @classmethod
+    def check_rule(cls, value: Optional[str]) -> Optional[str]:
+        return _canonical_rule(value)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {"rule": "FREQ=WEEKLY;BYDAY=MO,WE,FR"},
+                {"duration_minutes": 45},
+            ]
+        }
+    }
+
+
+class ScheduleRead(ScheduleBase):
+    """Server representation returned to clients."""
+    id: UUID = Field(default_factory=uuid4)
+    skipped: List[datetime] = Field(
+        default_factory=list,
+        description="Occurrences cancelled as exceptions to the rule.",
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OccurrenceRead(BaseModel):
+    """One occurrence of a schedule, either virtual or backed by a real walk."""
+
+    schedule_id: UUID = Field(..., description="Schedule that generated this occurrence.")
+    occurrence_time: datetime = Field(..., description="Start time given by the rule (UTC).")
+    walk_id: Optional[UUID] = Field(
+        None, description="ID of the materialized walk, or null while the occurrence is virtual."
+    )
+    status: str = Field(
+        ...,
+        description="'scheduled' for virtual occurrences, otherwise the status of the materialized walk.",
+        json_schema_extra={"example": "scheduled"},
+    )
+    city: str = Field(..., json_schema_extra={"example": "New York"})
+    location: str = Field(..., json_schema_extra={"example": "123 Riverside Park, NY"})
+    duration_minutes: int = Field(..., json_schema_extra={"example": 30})
+
+
+class OccurrenceMaterialize(BaseModel):
+    """Turns one occurrence into a real walk, optionally overriding its details."""
+
+    occurrence_time: datetime = Field(..., description="Occurrence to materialize, as returned by the rule.")
+    status: str = Field(
+        default="accepted",
+        description="Status of the new walk (e.g. accepted, or requested for an edited occurrence).",
+    )
+    scheduled_time: Optional[datetime] = Field(None, description="Moved start time for this occurrence only.")
+    duration_minutes: Optional[int] = Field(None, description="Different duration for this occurrence only.")
+    location: Optional[str] = Field(None, description="Different location for this occurrence only.")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {"occurrence_time": "2025-10-15T08:00:00Z"},
+                {"occurrence_time": "2025-10-17T08:00:00Z", "status": "requested", "scheduled_time": "2025-10-17T10:00:00Z"},
+            ]
+        }
+    }
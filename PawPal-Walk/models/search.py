@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    """A walk or event matching a text search."""
+
+    kind: str = Field(..., description="walk or event.", json_schema_extra={"example": "event"})
+    id: UUID = Field(
+        ...,
+        description="ID of the matching walk or event.",
+        json_schema_extra={"example": "99999999-9999-4999-8999-999999999999"},
+    )
+    walk_id: UUID = Field(
+        ...,
+        description="The walk itself, or the walk the event belongs to.",
+        json_schema_extra={"example": "11111111-1111-4111-8111-111111111111"},
+    )
+    score: float = Field(..., description="Relevance (BM25); higher is better.", json_schema_extra={"example": 7.31})
+    text: Optional[str] = Field(
+        None,
+        description="Walk location or event message that matched.",
+        json_schema_extra={"example": "Stopped by the vet for a paw check"},
+    )
+
+
+class SearchResults(BaseModel):
+    """Ranked search results."""
+
+    query: str = Field(..., json_schema_extra={"example": "vet"})
+    total: int = Field(..., description="Number of matching walks and events.", json_schema_extra={"example": 1})
+    results: List[SearchHit] = Field(default_factory=list)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "query": "vet",
+                    "total": 1,
+                    "results": [
+                        {
+                            "kind": "event",
+                            "id": "99999999-9999-4999-8999-999999999999",
+                            "walk_id": "11111111-1111-4111-8111-111111111111",
+                            "score": 7.31,
+                            "text": "Stopped by the vet for a paw check",
+                        }
+                    ],
+                }
+            ]
+        }
+    }
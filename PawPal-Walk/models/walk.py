@@ -39,7 +39,7 @@ class WalkBase(BaseModel):
     )
     status: str = Field(
         default="requested",
-        description="Walk status: requested, accepted, completed, cancelled.",
+        description="Walk status: requested, accepted, completed, cancelled, expired.",
         json_schema_extra={"example": "requested"},
     )
 
@@ -88,6 +88,12 @@ class WalkUpdate(BaseModel):
 class WalkRead(WalkBase):
     """Server representation returned to clients."""
     id: UUID = Field(default_factory=uuid4)
+    schedule_id: Optional[UUID] = Field(
+        None, description="Schedule this walk was materialized from, if any."
+    )
+    occurrence_time: Optional[datetime] = Field(
+        None, description="Schedule occurrence this walk stands for (UTC), if any."
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
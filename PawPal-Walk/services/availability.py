@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+from uuid import UUID
+
+from utils.timeutil import to_epoch
+
+SLOT_SECONDS = 15 * 60
+SLOT_BITS = 24  # 2**24 quarter-hours from 2000-01-01 covers ~478 years
+_EPOCH_2000 = 946_684_800
+
+
+def _slot(epoch: float) -> int:
+    return min(max(int((epoch - _EPOCH_2000) // SLOT_SECONDS), 0), (1 << SLOT_BITS) - 1)
+
+
+class _CityTree:
+    """Sparse max segment tree over start slots for one city.
+
+    Leaf ``s`` holds the windows starting in slot ``s``; every node stores
+    the latest end among the windows below it. "Windows starting by t and
+    ending no earlier than t + d" is then a descent into the slots up to t
+    that prunes any subtree whose latest end is too early, so the cost grows
+    with the number of matches, not with the number of windows. Nodes use
+    heap numbering (root 1, leaf ``2**SLOT_BITS + s``) and live in a dict, so
+    only occupied paths take memory.
+    """
+
+    __slots__ = ("max_end", "leaves")
+
+    def __init__(self):
+        self.max_end: Dict[int, float] = {}
+        self.leaves: Dict[int, Dict[UUID, Tuple[float, float]]] = {}  # slot -> {window id: (start, end)}
+
+    def _refresh(self, slot: int) -> None:
+        node = (1 << SLOT_BITS) + slot
+        windows = self.leaves.get(slot)
+        if windows:
+            self.max_end[node] = max(end for _, end in windows.values())
+        else:
+            self.max_end.pop(node, None)
+        max_end = self.max_end
+        while node > 1:
+            node >>= 1
+            best = max(max_end.get(2 * node, float("-inf")), max_end.get(2 * node + 1, float("-inf")))
+            if best == float("-inf"):
+                max_end.pop(node, None)
+            elif max_end.get(node) != best:
+                max_end[node] = best
+            else:
+                break
+
+    def add(self, window_id: UUID, start: float, end: float) -> None:
+        slot = _slot(start)
+        self.leaves.setdefault(slot, {})[window_id] = (start, end)
+        self._refresh(slot)
+
+    def remove(self, window_id: UUID, start: float) -> None:
+        slot = _slot(start)
+        windows = self.leaves.get(slot)
+        if windows is None or windows.pop(window_id, None) is None:
+            return
+        if not windows:
+            del self.leaves[slot]
+        self._refresh(slot)
+
+    def covering(self, start: float, end: float) -> Iterator[UUID]:
+        """Ids of windows with window.start <= start and window.end >= end."""
+        last = _slot(start)
+        max_end = self.max_end
+        stack = [(1, 0, 1 << SLOT_BITS)]  # (node, first slot, slot count)
+        while stack:
+            node, lo, size = stack.pop()
+            if lo > last or max_end.get(node, float("-inf")) < end:
+                continue
+            if size == 1:
+                for window_id, (w_start, w_end) in self.leaves[lo].items():
+                    if w_start <= start and w_end >= end:
+                        yield window_id
+                continue
+            half = size >> 1
+            stack.append((2 * node + 1, lo + half, half))
+            stack.append((2 * node, lo, half))
+
+
+class AvailabilityIndex:
+    """Walker availability windows, indexed per city for "who is free for [t, t + d)"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cities: Dict[str, _CityTree] = {}
+
+    def add(self, window) -> None:
+        with self._lock:
+            tree = self._cities.setdefault(window.city, _CityTree())
+            tree.add(window.id, to_epoch(window.start_time), to_epoch(window.end_time))
+
+    def remove(self, window) -> None:
+        with self._lock:
+            tree = self._cities.get(window.city)
+            if tree is not None:
+                tree.remove(window.id, to_epoch(window.start_time))
+
+    def replace(self, old, new) -> None:
+        with self._lock:
+            tree = self._cities.get(old.city)
+            if tree is not None:
+                tree.remove(old.id, to_epoch(old.start_time))
+            tree = self._cities.setdefault(new.city, _CityTree())
+            tree.add(new.id, to_epoch(new.start_time), to_epoch(new.end_time))
+
+    def free(self, city: str, start: datetime, end: datetime) -> List[UUID]:
+        """Ids of windows in ``city`` that cover all of ``[start, end)``."""
+        with self._lock:
+            tree = self._cities.get(city)
+            if tree is None:
+                return []
+            return list(tree.covering(to_epoch(start), to_epoch(end)))
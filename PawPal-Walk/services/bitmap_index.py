@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from models.walk import WalkRead
+from utils.timeutil import as_utc
+
+# -----------------------------------------------------------------------------
+# Roaring-style compressed bitmap
+# -----------------------------------------------------------------------------
+# Values are split into a 16-bit "high" key and a 16-bit "low" part. Each high
+# key owns one container: a sorted array of uint16 while sparse, or a 65536-bit
+# Python int once it holds more than ARRAY_MAX values (the point at which the
+# array would be larger than the 8 KiB bitmap).
+
+ARRAY_MAX = 4096
+_CHUNK_BITS = 1 << 16
+
+# Set-bit positions for every byte value, used to decode bitmap containers.
+_BYTE_BITS = [tuple(i for i in range(8) if b >> i & 1) for b in range(256)]
+
+
+def _array_to_bits(values: Iterable[int]) -> int:
+    word = 0
+    for v in values:
+        word |= 1 << v
+    return word
+
+
+def _bits_to_array(word: int) -> array:
+    return array("H", _iter_bits(word))
+
+
+def _iter_bits(word: int) -> Iterator[int]:
+    raw = word.to_bytes(_CHUNK_BITS // 8, "little")
+    for i, byte in enumerate(raw):
+        if byte:
+            base = i << 3
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def _normalize(container):
+    """Pick the compact representation for a container, or None if empty."""
+    if isinstance(container, int):
+        count = container.bit_count()
+        if count == 0:
+            return None
+        if count <= ARRAY_MAX:
+            return _bits_to_array(container)
+        return container
+    if not container:
+        return None
+    if len(container) > ARRAY_MAX:
+        return _array_to_bits(container)
+    return container
+
+
+def _and(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return _normalize(a & b)
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        return _normalize(array("H", (v for v in a if b >> v & 1)))
+    if len(a) > len(b):
+        a, b = b, a
+    other = set(b)
+    return _normalize(array("H", (v for v in a if v in other)))
+
+
+def _or(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a | b
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        return b | _array_to_bits(a)
+    return _normalize(array("H", sorted(set(a).union(b))))
+
+
+def _andnot(a, b):
+    if isinstance(a, int):
+        return _normalize(a & ~(b if isinstance(b, int) else _array_to_bits(b)))
+    if isinstance(b, int):
+        return _normalize(array("H", (v for v in a if not b >> v & 1)))
+    other = set(b)
+    return _normalize(array("H", (v for v in a if v not in other)))
+
+
+class RoaringBitmap:
+    """A set of non-negative integers below 2**32, stored in 16-bit chunks."""
+
+    __slots__ = ("_containers",)
+
+    def __init__(self, containers: Optional[Dict[int, object]] = None):
+        self._containers: Dict[int, object] = containers or {}
+
+    def add(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            self._containers[high] = array("H", [low])
+        elif isinstance(container, int):
+            self._containers[high] = container | (1 << low)
+        else:
+            pos = bisect_left(container, low)
+            if pos == len(container) or container[pos] != low:
+                container.insert(pos, low)
+                if len(container) > ARRAY_MAX:
+                    self._containers[high] = _array_to_bits(container)
+
+    def discard(self, value: int) -> None:
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            container = _normalize(container & ~(1 << low))
+        else:
+            pos = bisect_left(container, low)
+            if pos < len(container) and container[pos] == low:
+                del container[pos]
+            container = _normalize(container)
+        if container is None:
+            del self._containers[high]
+        else:
+            self._containers[high] = container
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        pos = bisect_left(container, low)
+        return pos < len(container) and container[pos] == low
+
+    def __len__(self) -> int:
+        return sum(
+            c.bit_count() if isinstance(c, int) else len(c)
+            for c in self._containers.values()
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._containers):
+            container = self._containers[high]
+            base = high << 16
+            values = _iter_bits(container) if isinstance(container, int) else container
+            for low in values:
+                yield base | low
+
+    def __and__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        small, large = self._containers, other._containers
+        if len(small) > len(large):
+            small, large = large, small
+        result = {}
+        for high, container in small.items():
+            match = large.get(high)
+            if match is not None:
+                merged = _and(container, match)
+                if merged is not None:
+                    result[high] = merged
+        return RoaringBitmap(result)
+
+    def __or__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = dict(self._containers)
+        for high, container in other._containers.items():
+            existing = result.get(high)
+            result[high] = container if existing is None else _or(existing, container)
+        return RoaringBitmap(result)
+
+    def __sub__(self, other: "RoaringBitmap") -> "RoaringBitmap":
+        result = {}
+        for high, container in self._containers.items():
+            match = other._containers.get(high)
+            merged = container if match is None else _andnot(container, match)
+            if merged is not None:
+                result[high] = merged
+        return RoaringBitmap(result)
+
+
+# -----------------------------------------------------------------------------
+# Walk index
+# -----------------------------------------------------------------------------
+
+_EMPTY = RoaringBitmap()
+
+# Scheduled times are indexed as whole hours since 2000-01-01 UTC, bit-sliced
+# over TIME_BITS bitmaps (about 119 years of range).
+_EPOCH = datetime(2000, 1, 1)
+TIME_BITS = 20
+_MAX_HOUR = (1 << TIME_BITS) - 1
+
+
+def _hour(dt: datetime) -> int:
+    hours = int((as_utc(dt) - _EPOCH).total_seconds() // 3600)
+    return min(max(hours, 0), _MAX_HOUR)
+
+
+def _dense(container) -> int:
+    return container if isinstance(container, int) else _array_to_bits(container)
+
+
+def _at_least(live: int, slices: List[int], hour: int) -> int:
+    greater, equal = 0, live
+    for bit in reversed(range(TIME_BITS)):
+        if hour >> bit & 1:
+            equal &= slices[bit]
+        else:
+            greater |= equal & slices[bit]
+            equal &= ~slices[bit]
+    return greater | equal
+
+
+def _at_most(live: int, slices: List[int], hour: int) -> int:
+    less, equal = 0, live
+    for bit in reversed(range(TIME_BITS)):
+        if hour >> bit & 1:
+            less |= equal & ~slices[bit]
+            equal &= slices[bit]
+        else:
+            equal &= ~slices[bit]
+    return less | equal
+
+
+class WalkBitmapIndex:
+    """Bitmap per filter value over dense walk ordinals.
+
+    Ordinals are handed out in insertion order, so iterating a result bitmap
+    yields walks in the same order as the ``walks`` dict. Deleting a walk
+    leaves a hole; once holes outnumber live walks (and exceed
+    COMPACT_MIN_DEAD) every bitmap is renumbered densely, preserving order,
+    so the id table and bitmap widths track the live walk count.
+
+    Equality filters (owner, city, status) keep one bitmap per value. The
+    scheduled hour is stored bit-sliced (one bitmap per bit of the hour
+    number), so any time window is resolved with ~2 * TIME_BITS bitmap
+    operations regardless of how many distinct hours exist. Windows are
+    hour-granular (``scheduled_to`` is exclusive); callers re-check exact
+    bounds on the narrowed results.
+    """
+
+    FIELDS = ("owner_id", "city", "status")
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self):
+        self._ordinal: Dict[UUID, int] = {}
+        self._ids: List[Optional[UUID]] = []
+        self._dead = 0
+        self._live = RoaringBitmap()
+        self._bitmaps: Dict[Tuple[str, object], RoaringBitmap] = {}
+        self._slices = [RoaringBitmap() for _ in range(TIME_BITS)]
+
+    def _keys(self, walk: WalkRead) -> List[Tuple[str, object]]:
+        return [(field, getattr(walk, field)) for field in self.FIELDS]
+
+    def _set(self, walk: WalkRead, ordinal: int) -> None:
+        self._live.add(ordinal)
+        for key in self._keys(walk):
+            self._bitmaps.setdefault(key, RoaringBitmap()).add(ordinal)
+        hour = _hour(walk.scheduled_time)
+        for bit, bitmap in enumerate(self._slices):
+            if hour >> bit & 1:
+                bitmap.add(ordinal)
+
+    def _unset(self, walk: WalkRead, ordinal: int) -> None:
+        self._live.discard(ordinal)
+        for key in self._keys(walk):
+            bitmap = self._bitmaps.get(key)
+            if bitmap is not None:
+                bitmap.discard(ordinal)
+                if not bitmap._containers:
+                    del self._bitmaps[key]
+        hour = _hour(walk.scheduled_time)
+        for bit, bitmap in enumerate(self._slices):
+            if hour >> bit & 1:
+                bitmap.discard(ordinal)
+
+    def add(self, walk: WalkRead) -> None:
+        ordinal = len(self._ids)
+        self._ids.append(walk.id)
+        self._ordinal[walk.id] = ordinal
+        self._set(walk, ordinal)
+
+    def remove(self, walk: WalkRead) -> None:
+        ordinal = self._ordinal.pop(walk.id, None)
+        if ordinal is None:
+            return
+        self._unset(walk, ordinal)
+        self._ids[ordinal] = None
+        self._dead += 1
+        if self._dead > self.COMPACT_MIN_DEAD and self._dead * 2 > len(self._ids):
+            self.compact()
+
+    def compact(self) -> None:
+        """Renumber live walks to ordinals 0..n-1, keeping their order."""
+        remap: List[int] = [0] * len(self._ids)
+        ids: List[Optional[UUID]] = []
+        for ordinal, walk_id in enumerate(self._ids):
+            if walk_id is not None:
+                remap[ordinal] = len(ids)
+                self._ordinal[walk_id] = len(ids)
+                ids.append(walk_id)
+
+        def renumber(bitmap: RoaringBitmap) -> RoaringBitmap:
+            # Old ordinals ascend, so new ones are appended in order
+            result = RoaringBitmap()
+            for ordinal in bitmap:
+                result.add(remap[ordinal])
+            return result
+
+        self._ids = ids
+        self._dead = 0
+        self._live = renumber(self._live)
+        self._bitmaps = {key: renumber(b) for key, b in self._bitmaps.items()}
+        self._slices = [renumber(bitmap) for bitmap in self._slices]
+
+    def replace(self, old: WalkRead, new: WalkRead) -> None:
+        ordinal = self._ordinal.get(old.id)
+        if ordinal is None:
+            self.add(new)
+            return
+        self._unset(old, ordinal)
+        self._set(new, ordinal)
+
+    def _window(self, first: Optional[int], last: Optional[int]) -> RoaringBitmap:
+        """Ordinals whose scheduled hour lies in ``[first, last]`` (either bound optional).
+
+        Evaluated chunk by chunk on uncompressed 65536-bit words so every step
+        of the bit-sliced comparison is a single big-int operation.
+        """
+        result = {}
+        for high, live in self._live._containers.items():
+            live = _dense(live)
+            slices = [_dense(bitmap._containers.get(high, 0)) for bitmap in self._slices]
+            word = live
+            if first is not None:
+                word &= _at_least(live, slices, first)
+            if last is not None:
+                word &= _at_most(live, slices, last)
+            container = _normalize(word)
+            if container is not None:
+                result[high] = container
+        return RoaringBitmap(result)
+
+    def match(
+        self,
+        owner_id: Optional[UUID] = None,
+        city: Optional[str] = None,
+        status: Optional[str] = None,
+        scheduled_from: Optional[datetime] = None,
+        scheduled_to: Optional[datetime] = None,
+    ) -> List[UUID]:
+        """AND together the bitmaps for every supplied filter and return walk ids."""
+        bitmaps = [
+            self._bitmaps.get((field, value), _EMPTY)
+            for field, value in (("owner_id", owner_id), ("city", city), ("status", status))
+            if value
+        ]
+        if scheduled_from or scheduled_to:
+            bitmaps.append(self._window(
+                _hour(scheduled_from) if scheduled_from else None,
+                _hour(scheduled_to - timedelta(microseconds=1)) if scheduled_to else None,
+            ))
+        if not bitmaps:
+            return [walk_id for walk_id in self._ids if walk_id is not None]
+
+        bitmaps.sort(key=len)
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if not result._containers:
+                break
+            result = result & bitmap
+        ids = self._ids
+        return [ids[ordinal] for ordinal in result]
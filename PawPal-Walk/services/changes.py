@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+@dataclass
+class Change:
+    seq: int
+    resource: str
+    id: UUID
+    op: str
+    data: Optional[BaseModel]
+    changed_at: datetime
+
+
+class ChangeLog:
+    """Sequence-numbered log of every walk, assignment, event and schedule mutation.
+
+    The log is compacted per resource (like a CouchDB changes feed): a reader
+    catching up from ``since`` sees only the latest change of each resource,
+    so replicas converge without replaying every intermediate update.
+    Deletes are kept as tombstones. Every change, before compaction, is also
+    handed to ``sink`` (e.g. the append-only event log) in sequence order.
+
+    ``epoch`` (milliseconds at startup) identifies the run: ``(epoch, seq)``
+    orders every mutation even when seqs restart because no event log is
+    kept.
+    """
+
+    def __init__(self, sink: Optional[Callable[[Change], None]] = None):
+        self._sink = sink
+        self.epoch = time.time_ns() // 1_000_000
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._seqs: List[int] = []
+        self._entries: List[Change] = []
+        self._latest: Dict[Tuple[str, UUID], int] = {}
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def record(self, resource: str, resource_id: UUID, op: str, data: Optional[BaseModel] = None) -> int:
+        with self._lock:
+            self._seq += 1
+            change = Change(self._seq, resource, resource_id, op, data, datetime.utcnow())
+            self._seqs.append(change.seq)
+            self._entries.append(change)
+            self._latest[(resource, resource_id)] = change.seq
+            if self._sink is not None:
+                self._sink(change)
+            if len(self._entries) > 1024 and len(self._entries) > 2 * len(self._latest):
+                self._compact()
+            return change.seq
+
+    def restore(self, change: Change) -> None:
+        """Re-insert a change recorded by an earlier run (in sequence order), without the sink.
+
+        New changes continue from the highest restored seq, so ``since``
+        cursors handed out before a restart stay valid.
+        """
+        with self._lock:
+            self._seq = max(self._seq, change.seq)
+            self._seqs.append(change.seq)
+            self._entries.append(change)
+            self._latest[(change.resource, change.id)] = change.seq
+
+    def _compact(self) -> None:
+        live = [c for c in self._entries if self._latest[(c.resource, c.id)] == c.seq]
+        self._entries = live
+        self._seqs = [c.seq for c in live]
+
+    def since(self, seq: int, limit: int) -> Tuple[List[Change], int, bool]:
+        """Return up to ``limit`` current changes after ``seq``, the cursor to resume from, and whether more remain."""
+        with self._lock:
+            results: List[Change] = []
+            cursor = seq
+            pos = bisect_right(self._seqs, seq)
+            entries = self._entries
+            while pos < len(entries) and len(results) < limit:
+                change = entries[pos]
+                if self._latest[(change.resource, change.id)] == change.seq:
+                    results.append(change)
+                cursor = change.seq
+                pos += 1
+            has_more = pos < len(entries)
+            if not has_more:
+                cursor = max(cursor, self._seq)
+            return results, cursor, has_more
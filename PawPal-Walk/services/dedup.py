@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over UUIDs, using double hashing of a blake2b digest."""
+
+    __slots__ = ("size", "hashes", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key: UUID) -> List[int]:
+        digest = hashlib.blake2b(key.bytes, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key: UUID, positions: Optional[List[int]] = None) -> None:
+        bits = self.bits
+        for pos in positions or self.positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: UUID) -> bool:
+        return self.contains_positions(self.positions(key))
+
+    def contains_positions(self, positions: List[int]) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] >> (pos & 7) & 1 for pos in positions)
+
+
+class SeenIds:
+    """Time-windowed "have we seen this id?" set with bounded memory.
+
+    A ring of ``generations`` Bloom filters, each covering ``window /
+    generations`` seconds: new ids go into the newest filter, and the oldest
+    filter is dropped when a new one starts, so memory stays constant and an
+    id is remembered for between ``window * (generations - 1) / generations``
+    and ``window`` seconds. A negative answer is definitive; a positive one
+    may be false and must be confirmed against the store (``exact``).
+    """
+
+    def __init__(
+        self,
+        window: float = 600,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+        generations: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.span = window / generations
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._filters: Deque[Tuple[float, BloomFilter]] = deque(maxlen=generations)
+        self._filters.append((clock(), BloomFilter(capacity, error_rate)))
+        self.stats: Dict[str, int] = {"checked": 0, "maybe_seen": 0, "duplicates": 0, "false_positives": 0}
+
+    def _current(self) -> BloomFilter:
+        started, bloom = self._filters[-1]
+        now = self._clock()
+        if now - started >= self.span or bloom.count >= self.capacity:
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            self._filters.append((now, bloom))
+        return bloom
+
+    def check_and_add(self, key: UUID, exact: Callable[[UUID], bool]) -> bool:
+        """Return True if ``key`` is a duplicate; otherwise remember it and return False.
+
+        ``exact`` is only consulted when the filters report a possible match.
+        """
+        with self._lock:
+            self.stats["checked"] += 1
+            # All generations share one size, so the bit positions are hashed once
+            positions = self._filters[-1][1].positions(key)
+            maybe = any(bloom.contains_positions(positions) for _, bloom in self._filters)
+            if maybe:
+                self.stats["maybe_seen"] += 1
+                if exact(key):
+                    self.stats["duplicates"] += 1
+                    return True
+                self.stats["false_positives"] += 1
+            self._current().add(key, positions)
+            return False
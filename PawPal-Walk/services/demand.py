@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.walk import WalkRead
+from utils.timeutil import to_epoch
+
+Key = Tuple[str, str]  # (city, status)
+
+
+def _hour(dt: datetime) -> int:
+    return int(to_epoch(dt) // 3600)
+
+
+def _week(day: int) -> int:
+    # Unix day 0 was a Thursday; shift so weeks start on Monday.
+    return (day + 3) // 7
+
+
+class DemandRollup:
+    """Walk counts by scheduled hour, city and status, in three resolutions.
+
+    Hours near "now" (``past_hours`` back to ``future_hours`` ahead) live in a
+    fixed ring buffer of hourly buckets; later hours wait in a sparse hourly
+    map until the ring reaches them. As the ring slides forward, evicted hours
+    are folded into daily buckets, and days older than ``daily_days`` into
+    weekly buckets. Downsampled buckets keep a 24-slot hour-of-day profile,
+    so the heatmap stays exact; only the time-range resolution coarsens.
+    All times are UTC.
+    """
+
+    def __init__(self, past_hours: int = 7 * 24, future_hours: int = 14 * 24, daily_days: int = 90,
+                 clock: Callable[[], float] = time.time):
+        self.past_hours = past_hours
+        self.size = past_hours + future_hours
+        self.daily_days = daily_days
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._ring: List[Dict[Key, int]] = [{} for _ in range(self.size)]
+        self._start = int(clock() // 3600) - past_hours
+        self._future: Dict[int, Dict[Key, int]] = {}
+        self._daily: Dict[int, Dict[Key, List[int]]] = {}
+        self._weekly: Dict[int, Dict[Key, List[int]]] = {}
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _fold(self, hour: int, bucket: Dict[Key, int]) -> None:
+        day = hour // 24
+        if day >= self._start // 24 - self.daily_days:
+            target = self._daily.setdefault(day, {})
+        else:
+            target = self._weekly.setdefault(_week(day), {})
+        for key, count in bucket.items():
+            target.setdefault(key, [0] * 24)[hour % 24] += count
+
+    def _advance(self, now: float) -> None:
+        start = int(now // 3600) - self.past_hours
+        if start <= self._start:
+            return
+        for hour in range(self._start, min(start, self._start + self.size)):
+            slot = hour % self.size
+            if self._ring[slot]:
+                self._fold(hour, self._ring[slot])
+                self._ring[slot] = {}
+        self._start = start
+
+        end = start + self.size
+        for hour in [h for h in self._future if h < end]:
+            bucket = self._future.pop(hour)
+            if hour < start:
+                self._fold(hour, bucket)
+            else:
+                self._ring[hour % self.size] = bucket
+
+        cutoff = start // 24 - self.daily_days
+        for day in [d for d in self._daily if d < cutoff]:
+            target = self._weekly.setdefault(_week(day), {})
+            for key, profile in self._daily.pop(day).items():
+                merged = target.setdefault(key, [0] * 24)
+                for i, count in enumerate(profile):
+                    merged[i] += count
+
+    def _apply(self, walk: WalkRead, delta: int) -> None:
+        hour = _hour(walk.scheduled_time)
+        key = (walk.city, walk.status)
+        with self._lock:
+            self._advance(self._clock())
+            if hour >= self._start + self.size:
+                bucket = self._future.setdefault(hour, {})
+            elif hour >= self._start:
+                bucket = self._ring[hour % self.size]
+            else:
+                day = hour // 24
+                if day >= self._start // 24 - self.daily_days:
+                    profiles = self._daily.setdefault(day, {})
+                else:
+                    profiles = self._weekly.setdefault(_week(day), {})
+                profiles.setdefault(key, [0] * 24)[hour % 24] += delta
+                return
+            bucket[key] = bucket.get(key, 0) + delta
+            if bucket[key] == 0:
+                del bucket[key]
+
+    def add(self, walk: WalkRead) -> None:
+        self._apply(walk, 1)
+
+    def remove(self, walk: WalkRead) -> None:
+        self._apply(walk, -1)
+
+    def replace(self, old: WalkRead, new: WalkRead) -> None:
+        self.remove(old)
+        self.add(new)
+
+    # -- queries -------------------------------------------------------------
+
+    def heatmap(self, start: datetime, end: datetime, city: Optional[str] = None,
+                status: Optional[str] = "requested") -> Dict[str, List[int]]:
+        """Counts per city and UTC hour-of-day for walks scheduled in ``[start, end)``.
+
+        Buckets that only partly overlap the range (hours, or days and weeks
+        once downsampled) are counted whole.
+        """
+        first, last = _hour(start), _hour(end - timedelta(microseconds=1)) + 1
+        result: Dict[str, List[int]] = defaultdict(lambda: [0] * 24)
+
+        def wanted(key: Key) -> bool:
+            return (city is None or key[0] == city) and (status is None or key[1] == status)
+
+        def add_hour(hour: int, bucket: Dict[Key, int]) -> None:
+            for key, count in bucket.items():
+                if wanted(key):
+                    result[key[0]][hour % 24] += count
+
+        def add_profiles(profiles: Dict[Key, List[int]]) -> None:
+            for key, profile in profiles.items():
+                if wanted(key):
+                    row = result[key[0]]
+                    for i, count in enumerate(profile):
+                        row[i] += count
+
+        with self._lock:
+            self._advance(self._clock())
+            for hour in range(max(first, self._start), min(last, self._start + self.size)):
+                add_hour(hour, self._ring[hour % self.size])
+            for hour, bucket in self._future.items():
+                if first <= hour < last:
+                    add_hour(hour, bucket)
+            first_day, last_day = first // 24, (last - 1) // 24
+            for day, profiles in self._daily.items():
+                if first_day <= day <= last_day:
+                    add_profiles(profiles)
+            for week, profiles in self._weekly.items():
+                if _week(first_day) <= week <= _week(last_day):
+                    add_profiles(profiles)
+        return {c: row for c, row in result.items() if any(row)}
@@ -0,0 +1,145 @@
+"""Append-only event log (outbox) of every mutation, for offline replay.
+
+Each record is one msgpack array::
+
+    [seq, resource, op, id, changed_at, data]
+
+``id`` and UUIDs inside ``data`` are 16-byte bin values, ``changed_at`` and
+datetimes are msgpack Timestamps, and ``data`` is the full resource (or nil
+for deletes), so walks and assignments can be rebuilt from the log alone.
+See ``services/replay.py``.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from services.changes import Change
+from services.replay import read_batches, valid_length
+from utils.codec import msgpack, packb
+from utils.timeutil import as_utc
+
+
+class EventLog:
+    """Appends records on a writer thread, so handlers never wait on disk.
+
+    ``append`` only queues the change and never blocks: it runs on the
+    event loop, under the ChangeLog lock. The writer packs queued records
+    and flushes once per batch, in sequence order. Once ``max_pending``
+    records are waiting, ``saturated`` turns true and the service refuses
+    new writes with 503 (backpressure, see ``AdmissionGate``) until the
+    writer catches up; changes already admitted are still queued, never
+    dropped.
+
+    A record torn by a crash is cut off when the log is opened, so new
+    records never land behind bytes that cannot be decoded.
+    """
+
+    def __init__(self, path: str, max_pending: int = 100_000):
+        self.path = path
+        _truncate_torn_tail(path)
+        self._file = open(path, "ab")
+        self.max_pending = max_pending
+        self._queue: "queue.Queue[Optional[Change]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(self, change: Change) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                    self._thread.start()
+        self._queue.put_nowait(change)
+
+    def saturated(self) -> bool:
+        """True while the writer is ``max_pending`` or more records behind."""
+        return self._queue.qsize() >= self.max_pending
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < 1024:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for change in batch:
+                if change is not None:
+                    self._file.write(packb(_record(change)))
+            self._file.flush()
+            if batch[-1] is None:
+                return
+
+    def close(self) -> None:
+        """Write everything appended so far, then close the file."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+
+def _truncate_torn_tail(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    size = os.path.getsize(path)
+    end = valid_length(path)
+    if end < size:
+        with open(path, "r+b") as f:
+            f.truncate(end)
+        print(f"Warning: event log {path} ended in a torn record; dropped its last {size - end} bytes")
+
+
+def _record(change: Change) -> list:
+    return [
+        change.seq,
+        change.resource,
+        change.op,
+        change.id,
+        change.changed_at,
+        change.data.model_dump() if change.data is not None else None,
+    ]
+
+
+def _naive_utc(value: Any) -> Any:
+    """Timestamps decode as aware UTC datetimes; the stores hold naive UTC."""
+    if isinstance(value, datetime):
+        return as_utc(value)
+    if isinstance(value, dict):
+        return {k: _naive_utc(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_naive_utc(v) for v in value]
+    return value
+
+
+def latest_records(path: str) -> List[Tuple[int, str, str, UUID, datetime, Optional[Dict[str, Any]]]]:
+    """The last record of every resource in the log at ``path``, in sequence order.
+
+    Deletes are kept, as tombstones. The log ends at the first record that
+    does not decode (see ``read_batches``).
+    """
+    if msgpack is None or not os.path.exists(path):
+        return []
+    latest: Dict[Tuple[str, bytes], list] = {}
+    for batch, _ in read_batches(path):
+        for record in batch:
+            latest[(record[1], record[3])] = record
+    return [
+        (seq, resource, op, UUID(bytes=resource_id), as_utc(changed_at), _naive_utc(data))
+        for seq, resource, op, resource_id, changed_at, data in sorted(latest.values(), key=lambda r: r[0])
+    ]
+
+
+def open_event_log(path: Optional[str]) -> Optional[EventLog]:
+    """Open the log at ``path``, or return None if unset or msgpack is unavailable."""
+    if not path:
+        return None
+    if msgpack is None:
+        print("Warning: event log disabled, msgpack is not installed")
+        return None
+    print(f"Event log: appending to {path}")
+    return EventLog(path)
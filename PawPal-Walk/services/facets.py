@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from models.walk import WalkRead
+
+# Walk attributes that can be faceted on.
+FACET_FIELDS = ("city", "status", "owner_id")
+
+
+def _facet_value(walk: WalkRead, field: str) -> str:
+    return str(getattr(walk, field))
+
+
+class FacetCounter:
+    """Per-field value counts for walks, kept current on every mutation.
+
+    Counts are stored twice: overall, and split by walk status, so questions
+    like "requested walks per city" are answered without touching any walk.
+    """
+
+    def __init__(self, fields: Iterable[str] = FACET_FIELDS):
+        self.fields = tuple(fields)
+        self._counts: Dict[str, Dict[str, int]] = {f: defaultdict(int) for f in self.fields}
+        self._by_status: Dict[str, Dict[str, Dict[str, int]]] = {
+            f: defaultdict(lambda: defaultdict(int)) for f in self.fields
+        }
+
+    def _apply(self, walk: WalkRead, delta: int) -> None:
+        status = walk.status
+        for field in self.fields:
+            value = _facet_value(walk, field)
+            counts = self._counts[field]
+            counts[value] += delta
+            if counts[value] <= 0:
+                del counts[value]
+
+            scoped = self._by_status[field][status]
+            scoped[value] += delta
+            if scoped[value] <= 0:
+                del scoped[value]
+                if not scoped:
+                    del self._by_status[field][status]
+
+    def add(self, walk: WalkRead) -> None:
+        self._apply(walk, 1)
+
+    def remove(self, walk: WalkRead) -> None:
+        self._apply(walk, -1)
+
+    def replace(self, old: WalkRead, new: WalkRead) -> None:
+        self.remove(old)
+        self.add(new)
+
+    def facets(self, fields: Iterable[str], status: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Return ``{field: {value: count}}``, optionally restricted to one status."""
+        result: Dict[str, Dict[str, int]] = {}
+        for field in fields:
+            if status is None:
+                result[field] = dict(self._counts[field])
+            else:
+                result[field] = dict(self._by_status[field].get(status, {}))
+        return result
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by an arbitrary id (a walk, a walker, ...).
+
+    Each key may spend ``burst`` requests at once and refills at ``rate``
+    tokens per second. Buckets live in an LRU map capped at ``max_keys``;
+    evicting one only forgets its history, which at worst hands an idle key a
+    full bucket again. A ``rate`` of 0 disables the limiter.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> [tokens, last refill time]
+        self._buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"allowed": 0, "throttled": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens from ``key``'s bucket.
+
+        Returns 0 if the request may proceed, otherwise the number of seconds
+        until enough tokens will have refilled (nothing is taken in that case).
+        """
+        if not self.enabled:
+            return 0.0
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                self.stats["allowed"] += 1
+                return 0.0
+            self.stats["throttled"] += 1
+            return (cost - bucket[0]) / self.rate
+
+    def refund(self, key: Hashable, cost: float = 1.0) -> None:
+        """Give back tokens taken by ``acquire`` for a request that was refused elsewhere."""
+        if not self.enabled:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + cost)
+                self.stats["allowed"] -= 1
+
+    def snapshot(self) -> Dict[str, float]:
+        return {**self.stats, "keys": len(self._buckets), "rate": self.rate, "burst": self.burst}
+
+
+def retry_after_header(wait: float) -> Dict[str, str]:
+    """``Retry-After`` takes whole seconds; round up so clients never retry too early."""
+    return {"Retry-After": str(max(1, math.ceil(wait)))}
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+from utils.timeutil import as_utc
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+FREQUENCIES = ("DAILY", "WEEKLY")
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """Subset of RFC 5545 RRULE: FREQ=DAILY|WEEKLY, INTERVAL, BYDAY, COUNT, UNTIL.
+
+    Rules are evaluated in UTC, anchored at the schedule's start time.
+    """
+
+    freq: str
+    interval: int = 1
+    by_weekday: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "RecurrenceRule":
+        """Parse ``"FREQ=WEEKLY;BYDAY=MO,WE,FR"``-style text; raises ValueError if invalid."""
+        parts = {}
+        for item in text.strip().upper().removeprefix("RRULE:").split(";"):
+            if not item:
+                continue
+            name, sep, value = item.partition("=")
+            if not sep or not value:
+                raise ValueError(f"Malformed rule part '{item}'")
+            parts[name] = value
+
+        freq = parts.pop("FREQ", None)
+        if freq not in FREQUENCIES:
+            raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+        interval = int(parts.pop("INTERVAL", 1))
+        if interval < 1:
+            raise ValueError("INTERVAL must be positive")
+
+        by_weekday: Tuple[int, ...] = ()
+        if "BYDAY" in parts:
+            if freq != "WEEKLY":
+                raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+            try:
+                by_weekday = tuple(sorted({WEEKDAYS.index(d) for d in parts.pop("BYDAY").split(",")}))
+            except ValueError:
+                raise ValueError(f"BYDAY values must be among {', '.join(WEEKDAYS)}")
+
+        count = int(parts.pop("COUNT")) if "COUNT" in parts else None
+        if count is not None and count < 1:
+            raise ValueError("COUNT must be positive")
+        until = None
+        if "UNTIL" in parts:
+            raw = parts.pop("UNTIL")
+            try:
+                until = datetime.strptime(raw.rstrip("Z"), "%Y%m%dT%H%M%S")
+            except ValueError:
+                until = datetime.strptime(raw.rstrip("Z"), "%Y%m%d") + timedelta(days=1, microseconds=-1)
+        if count is not None and until is not None:
+            raise ValueError("COUNT and UNTIL are mutually exclusive")
+        if parts:
+            raise ValueError(f"Unsupported rule part(s): {', '.join(sorted(parts))}")
+        return cls(freq, interval, by_weekday, count, until)
+
+    def __str__(self) -> str:
+        text = f"FREQ={self.freq}"
+        if self.interval != 1:
+            text += f";INTERVAL={self.interval}"
+        if self.by_weekday:
+            text += ";BYDAY=" + ",".join(WEEKDAYS[d] for d in self.by_weekday)
+        if self.count is not None:
+            text += f";COUNT={self.count}"
+        if self.until is not None:
+            text += f";UNTIL={self.until:%Y%m%dT%H%M%SZ}"
+        return text
+
+    def _candidates(self, dtstart: datetime, after: datetime) -> Iterator[Tuple[int, datetime]]:
+        """Yield ``(ordinal, time)`` pairs in order, starting at or just before ``after``.
+
+        The starting period is computed arithmetically, so the cost does not
+        depend on how far ``after`` lies from ``dtstart``.
+        """
+        if self.freq == "DAILY":
+            step = timedelta(days=self.interval)
+            k = max(0, math.floor((after - dtstart) / step))
+            while True:
+                yield k, dtstart + k * step
+                k += 1
+
+        days = self.by_weekday or (dtstart.weekday(),)
+        week0 = dtstart - timedelta(days=dtstart.weekday())
+        skipped = sum(1 for d in days if d < dtstart.weekday())
+        step = timedelta(weeks=self.interval)
+        period = max(0, math.floor((after - week0) / step))
+        while True:
+            base = week0 + period * step
+            for j, d in enumerate(days):
+                ordinal = period * len(days) + j - skipped
+                if ordinal >= 0:
+                    yield ordinal, base + timedelta(days=d)
+            period += 1
+
+    def between(
+        self, dtstart: datetime, start: datetime, end: Optional[datetime] = None
+    ) -> Iterator[datetime]:
+        """Lazily yield occurrences in ``[start, end)``; unbounded if ``end`` is None."""
+        dtstart, start = as_utc(dtstart), max(as_utc(start), as_utc(dtstart))
+        end = as_utc(end) if end is not None else None
+        for ordinal, at in self._candidates(dtstart, start):
+            if self.count is not None and ordinal >= self.count:
+                return
+            if (self.until is not None and at > self.until) or (end is not None and at >= end):
+                return
+            if at >= start:
+                yield at
+
+    def includes(self, dtstart: datetime, at: datetime) -> bool:
+        at = as_utc(at)
+        return next(self.between(dtstart, at, at + timedelta(microseconds=1)), None) == at
@@ -0,0 +1,243 @@
+"""Offline replay of the Walk service event log into projections.
+
+Records are decoded in batches straight from the msgpack stream and applied
+to a projection as plain dicts (no pydantic on the hot path). Every
+``--checkpoint-every`` records the projection state and file offset are
+written atomically to ``--checkpoint``, so an interrupted replay resumes
+where it stopped instead of starting over.
+
+Usage (from the PawPal-Walk directory):
+
+    python -m services.replay walk-events.log --projection state --output state.json
+    python -m services.replay walk-events.log --projection earnings --rate-per-minute 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from utils.codec import msgpack, packb, unpackb
+
+Record = Tuple[int, str, str, bytes, Any, Optional[Dict[str, Any]]]
+
+
+def read_batches(path: str, offset: int = 0, batch_size: int = 10_000) -> Iterator[Tuple[List[Record], int]]:
+    """Yield ``(records, offset_after_batch)`` from the log starting at byte ``offset``.
+
+    The log ends at the first record that does not decode as one: a record
+    torn by a crash mid-write, and anything appended after it.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        unpacker = msgpack.Unpacker(f, timestamp=3, read_size=1 << 20)
+        batch: List[Record] = []
+        end = 0
+        try:
+            for record in unpacker:
+                if type(record) is not list or len(record) != 6 or type(record[0]) is not int:
+                    break
+                batch.append(record)
+                end = unpacker.tell()
+                if len(batch) >= batch_size:
+                    yield batch, offset + end
+                    batch = []
+        except (ValueError, msgpack.UnpackException):
+            pass
+        if batch:
+            yield batch, offset + end
+
+
+def valid_length(path: str) -> int:
+    """Bytes of the log at ``path`` up to the end of its last complete record."""
+    end = 0
+    for _, end in read_batches(path):
+        pass
+    return end
+
+
+# -----------------------------------------------------------------------------
+# Projections
+# -----------------------------------------------------------------------------
+
+class StateProjection:
+    """Current walks and assignments, exactly as the service held them."""
+
+    name = "state"
+    RESOURCES = {"walk": "walks", "assignment": "assignments"}
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[bytes, Dict[str, Any]]] = {t: {} for t in self.RESOURCES.values()}
+
+    def apply(self, batch: List[Record]) -> None:
+        tables, resources = self.tables, self.RESOURCES
+        for _, resource, op, resource_id, _, data in batch:
+            table = resources.get(resource)
+            if table is None:
+                continue
+            if op == "delete":
+                tables[table].pop(resource_id, None)
+            else:
+                tables[table][resource_id] = data
+
+    def snapshot(self) -> Any:
+        return self.tables
+
+    def restore(self, snapshot: Any) -> None:
+        self.tables = snapshot
+
+    def result(self) -> Any:
+        return {
+            table: [_jsonable(row) for row in rows.values()]
+            for table, rows in self.tables.items()
+        }
+
+
+class EarningsProjection:
+    """Completed walks, minutes and earnings per walker."""
+
+    name = "earnings"
+
+    def __init__(self, rate_per_minute: float = 0.5):
+        self.rate_per_minute = rate_per_minute
+        self.durations: Dict[bytes, int] = {}
+        # assignment id -> (walker_id, walk_id) for completed assignments only
+        self.completed: Dict[bytes, Tuple[bytes, bytes]] = {}
+
+    def apply(self, batch: List[Record]) -> None:
+        durations, completed = self.durations, self.completed
+        for _, resource, op, resource_id, _, data in batch:
+            if resource == "walk":
+                if op == "delete":
+                    durations.pop(resource_id, None)
+                else:
+                    durations[resource_id] = data["duration_minutes"]
+            elif resource == "assignment":
+                if op != "delete" and data["status"] == "completed":
+                    completed[resource_id] = (data["walker_id"], data["walk_id"])
+                else:
+                    completed.pop(resource_id, None)
+
+    def snapshot(self) -> Any:
+        return {"durations": self.durations, "completed": self.completed}
+
+    def restore(self, snapshot: Any) -> None:
+        self.durations = snapshot["durations"]
+        self.completed = {k: tuple(v) for k, v in snapshot["completed"].items()}
+
+    def result(self) -> Any:
+        walkers: Dict[str, Dict[str, Any]] = {}
+        for walker_id, walk_id in self.completed.values():
+            row = walkers.setdefault(str(UUID(bytes=walker_id)), {"walks": 0, "minutes": 0, "earnings": 0.0})
+            minutes = self.durations.get(walk_id, 0)
+            row["walks"] += 1
+            row["minutes"] += minutes
+            row["earnings"] = round(row["earnings"] + minutes * self.rate_per_minute, 2)
+        return walkers
+
+
+PROJECTIONS = {"state": StateProjection, "earnings": EarningsProjection}
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, bytes) and len(value) == 16:
+        return str(UUID(bytes=value))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+# -----------------------------------------------------------------------------
+# Replay driver
+# -----------------------------------------------------------------------------
+
+def _load_checkpoint(path: str, projection) -> Tuple[int, int]:
+    with open(path, "rb") as f:
+        checkpoint = unpackb(f.read())
+    if checkpoint["projection"] != projection.name:
+        raise ValueError(f"Checkpoint {path} belongs to projection '{checkpoint['projection']}'")
+    projection.restore(checkpoint["state"])
+    return checkpoint["offset"], checkpoint["seq"]
+
+
+def _save_checkpoint(path: str, projection, offset: int, seq: int) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(packb({"projection": projection.name, "offset": offset, "seq": seq, "state": projection.snapshot()}))
+    os.replace(tmp, path)
+
+
+def replay(
+    log_path: str,
+    projection,
+    batch_size: int = 10_000,
+    checkpoint: Optional[str] = None,
+    checkpoint_every: int = 1_000_000,
+) -> Dict[str, Any]:
+    """Apply the log to ``projection``; returns replay statistics."""
+    offset, seq = 0, 0
+    if checkpoint and os.path.exists(checkpoint):
+        offset, seq = _load_checkpoint(checkpoint, projection)
+
+    started = time.perf_counter()
+    applied = since_checkpoint = 0
+    for batch, offset in read_batches(log_path, offset, batch_size):
+        projection.apply(batch)
+        seq = batch[-1][0]
+        applied += len(batch)
+        since_checkpoint += len(batch)
+        if checkpoint and since_checkpoint >= checkpoint_every:
+            _save_checkpoint(checkpoint, projection, offset, seq)
+            since_checkpoint = 0
+    if checkpoint and since_checkpoint:
+        _save_checkpoint(checkpoint, projection, offset, seq)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "events": applied,
+        "last_seq": seq,
+        "seconds": elapsed,
+        "events_per_second": applied / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay the Walk service event log into a projection.")
+    parser.add_argument("log", help="Path to the event log (WALK_EVENT_LOG).")
+    parser.add_argument("--projection", choices=sorted(PROJECTIONS), default="state")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--checkpoint", help="Checkpoint file to resume from and update.")
+    parser.add_argument("--checkpoint-every", type=int, default=1_000_000, help="Records between checkpoints.")
+    parser.add_argument("--rate-per-minute", type=float, default=0.5, help="Walker pay rate (earnings projection).")
+    parser.add_argument("--output", help="Write the projection as JSON here (default: stdout).")
+    args = parser.parse_args(argv)
+
+    if msgpack is None:
+        sys.exit("msgpack is required to read the event log")
+    if args.projection == "earnings":
+        projection = EarningsProjection(args.rate_per_minute)
+    else:
+        projection = PROJECTIONS[args.projection]()
+
+    stats = replay(args.log, projection, args.batch_size, args.checkpoint, args.checkpoint_every)
+    print(
+        f"Replayed {stats['events']:,} events up to seq {stats['last_seq']} in {stats['seconds']:.2f}s "
+        f"({stats['events_per_second']:,.0f} events/s)",
+        file=sys.stderr,
+    )
+    output = json.dumps(projection.result(), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
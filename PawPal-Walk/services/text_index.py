@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from models.event import EventRead
+from models.walk import WalkRead
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+BLOCK_SIZE = 128
+MAX_TF = 15  # term frequency is packed into the low 4 bits of each posting
+PREFIX_EXPANSIONS = 64  # most frequent completions considered per query token
+PREFIX_WEIGHT = 0.8  # completions score a little below exact term matches
+K1, B = 1.2, 0.75  # BM25 parameters
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _encode(postings: List[Tuple[int, int]], first: int) -> bytes:
+    """Varint-encode ``(doc gap << 4 | tf)`` per posting; gaps are from ``first``."""
+    out = bytearray()
+    prev = first
+    for doc, tf in postings:
+        value = (doc - prev) << 4 | tf
+        prev = doc
+        while value > 0x7F:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode(data: bytes, first: int) -> Tuple[List[int], List[int]]:
+    docs: List[int] = []
+    tfs: List[int] = []
+    doc, value, shift = first, 0, 0
+    for byte in data:
+        if byte & 0x80:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            continue
+        value |= byte << shift
+        doc += value >> 4
+        docs.append(doc)
+        tfs.append(value & 0xF)
+        value, shift = 0, 0
+    return docs, tfs
+
+
+class PostingList:
+    """Ascending ``(doc, tf)`` postings, compressed in blocks of BLOCK_SIZE.
+
+    Full blocks are gap + varint encoded and carry their first and last doc
+    id, so lookups for a few candidate docs decode only the blocks that can
+    contain them. New postings collect in an uncompressed tail until a block
+    fills.
+    """
+
+    __slots__ = ("firsts", "lasts", "blocks", "tail", "count")
+
+    def __init__(self):
+        self.firsts = array("q")
+        self.lasts = array("q")
+        self.blocks: List[bytes] = []
+        self.tail: List[Tuple[int, int]] = []
+        self.count = 0
+
+    def append(self, doc: int, tf: int) -> None:
+        self.tail.append((doc, tf))
+        self.count += 1
+        if len(self.tail) == BLOCK_SIZE:
+            first = self.tail[0][0]
+            self.firsts.append(first)
+            self.lasts.append(self.tail[-1][0])
+            self.blocks.append(_encode(self.tail, first))
+            self.tail = []
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for docs, tfs in self.chunks():
+            yield from zip(docs, tfs)
+
+    def chunks(self) -> Iterator[Tuple[List[int], List[int]]]:
+        """All postings as ``(docs, tfs)`` lists, one pair per block."""
+        for first, data in zip(self.firsts, self.blocks):
+            yield _decode(data, first)
+        if self.tail:
+            yield [doc for doc, _ in self.tail], [tf for _, tf in self.tail]
+
+    def lookup(self, docs: List[int]) -> Iterator[Tuple[List[int], List[int]]]:
+        """``chunks`` restricted to the given ascending doc ids, skipping blocks that hold none of them."""
+        wanted = set(docs)
+        firsts, lasts = self.firsts, self.lasts
+        i = 0
+        while i < len(docs):
+            block = bisect_left(lasts, docs[i])
+            if block == len(lasts):
+                break
+            j = bisect_left(docs, firsts[block], i)
+            if j < len(docs) and docs[j] <= lasts[block]:
+                block_docs, block_tfs = _decode(self.blocks[block], firsts[block])
+                pairs = [(d, t) for d, t in zip(block_docs, block_tfs) if d in wanted]
+                yield [d for d, _ in pairs], [t for _, t in pairs]
+            i = bisect_right(docs, lasts[block], i)
+        pairs = [(d, t) for d, t in self.tail if d in wanted]
+        if pairs:
+            yield [d for d, _ in pairs], [t for _, t in pairs]
+
+    def nbytes(self) -> int:
+        return sum(map(len, self.blocks)) + 16 * len(self.blocks) + 16 * len(self.tail)
+
+
+class TextIndex:
+    """Inverted index with prefix matching and BM25 ranking.
+
+    Documents are keyed by any hashable (e.g. ``("walk", id)``) and mapped to
+    dense, increasing integer ids, so postings stay sorted and gap-encode
+    well. Removal only marks a doc dead; dead docs are skipped at query time
+    and dropped by ``compact``, which runs once they outnumber live ones.
+    Updates are a remove plus an add.
+    """
+
+    def __init__(self, compact_min_dead: int = 10_000):
+        self.compact_min_dead = compact_min_dead
+        self._lock = threading.Lock()
+        self._postings: Dict[str, PostingList] = {}
+        self._terms: List[str] = []  # sorted vocabulary, for prefix expansion
+        self._keys: List[Optional[Hashable]] = []  # doc id -> key (None once removed)
+        self._lengths = array("H")
+        self._docs: Dict[Hashable, int] = {}
+        self._total_length = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # -- writes --------------------------------------------------------------
+
+    def add(self, key: Hashable, text: str) -> None:
+        tokens = tokenize(text)
+        with self._lock:
+            self._remove(key)
+            doc = len(self._keys)
+            self._keys.append(key)
+            self._lengths.append(min(len(tokens), 0xFFFF))
+            self._docs[key] = doc
+            self._total_length += len(tokens)
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = PostingList()
+                    insort(self._terms, term)
+                postings.append(doc, min(tf, MAX_TF))
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+            if self._dead >= self.compact_min_dead and self._dead > len(self._docs):
+                self._compact()
+
+    def _remove(self, key: Hashable) -> None:
+        doc = self._docs.pop(key, None)
+        if doc is not None:
+            self._keys[doc] = None
+            self._total_length -= self._lengths[doc]
+            self._dead += 1
+
+    def compact(self) -> None:
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live docs densely and rebuild postings without dead ones."""
+        remap: Dict[int, int] = {}
+        keys: List[Optional[Hashable]] = []
+        lengths = array("H")
+        for doc, key in enumerate(self._keys):
+            if key is not None:
+                remap[doc] = len(keys)
+                keys.append(key)
+                lengths.append(self._lengths[doc])
+        rebuilt: Dict[str, PostingList] = {}
+        for term, postings in self._postings.items():
+            fresh = PostingList()
+            for doc, tf in postings:
+                new_doc = remap.get(doc)
+                if new_doc is not None:
+                    fresh.append(new_doc, tf)
+            if fresh.count:
+                rebuilt[term] = fresh
+        self._postings = rebuilt
+        self._terms = sorted(rebuilt)
+        self._keys = keys
+        self._lengths = lengths
+        self._docs = {key: doc for doc, key in enumerate(keys)}
+        self._dead = 0
+
+    # -- queries -------------------------------------------------------------
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Terms a query token matches: itself, plus its most frequent completions."""
+        lo = bisect_left(self._terms, token)
+        hi = bisect_right(self._terms, token + "\uffff")
+        completions = [t for t in self._terms[lo:hi] if t != token]
+        if len(completions) > PREFIX_EXPANSIONS:
+            completions = heapq.nlargest(PREFIX_EXPANSIONS, completions, key=lambda t: self._postings[t].count)
+        terms = [(t, PREFIX_WEIGHT) for t in completions]
+        if token in self._postings:
+            terms.append((token, 1.0))
+        return terms
+
+    def search(
+        self, query: str, limit: int = 20, kinds: Optional[Iterable[str]] = None
+    ) -> Tuple[int, List[Tuple[Hashable, float]]]:
+        """Docs containing every query token (as a word or word prefix), best first.
+
+        ``kinds`` keeps only keys whose first element is in it (keys are
+        ``(kind, id)`` tuples). Returns the total match count and the top
+        ``limit`` ``(key, score)`` pairs.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+        kinds = set(kinds) if kinds else None
+        with self._lock:
+            live = len(self._docs) or 1
+            avg_length = self._total_length / live or 1.0
+            lengths, keys = self._lengths, self._keys
+
+            expanded = [self._expand(token) for token in tokens]
+            if not all(expanded):
+                return 0, []
+            # Score the rarest token's postings, then probe the other tokens
+            # block by block for just those candidate docs.
+            expanded.sort(key=lambda terms: sum(self._postings[t].count for t, _ in terms))
+            c1, c2 = K1 * (1 - B), K1 * B / avg_length
+
+            def score_token(terms: List[Tuple[str, float]], candidates: Optional[List[int]]) -> Dict[int, float]:
+                """Best BM25 score per doc over a token's terms (its exact match and completions)."""
+                best: Dict[int, float] = {}
+                for term, weight in terms:
+                    postings = self._postings[term]
+                    df = postings.count
+                    idf = weight * (K1 + 1) * math.log(1 + (live - df + 0.5) / (df + 0.5))
+                    chunks = postings.chunks() if candidates is None else postings.lookup(candidates)
+                    for docs, tfs in chunks:
+                        values = [idf * tf / (tf + c1 + c2 * lengths[doc]) for doc, tf in zip(docs, tfs)]
+                        if len(terms) == 1:
+                            best.update(zip(docs, values))
+                            continue
+                        for doc, value in zip(docs, values):
+                            if value > best.get(doc, 0.0):
+                                best[doc] = value
+                return best
+
+            scores = score_token(expanded[0], None)
+            for doc in [d for d in scores if keys[d] is None or (kinds and keys[d][0] not in kinds)]:
+                del scores[doc]
+            for terms in expanded[1:]:
+                if not scores:
+                    break
+                matched = score_token(terms, sorted(scores))
+                scores = {doc: scores[doc] + value for doc, value in matched.items()}
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+            return len(scores), [(keys[doc], score) for doc, score in top]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "docs": len(self._docs),
+                "dead_docs": self._dead,
+                "terms": len(self._postings),
+                "postings": sum(p.count for p in self._postings.values()),
+                "posting_bytes": sum(p.nbytes() for p in self._postings.values()),
+            }
+
+
+class WalkEventSearch:
+    """Text search over walk locations and event messages.
+
+    Walks are indexed by location and city, events by message and type.
+    Has the add/remove/replace interface of the other walk views, and the
+    same methods take events too.
+    """
+
+    def __init__(self):
+        self.index = TextIndex()
+
+    @staticmethod
+    def _key(doc: Union[WalkRead, EventRead]) -> Tuple[str, object]:
+        return ("walk" if isinstance(doc, WalkRead) else "event", doc.id)
+
+    @staticmethod
+    def _text(doc: Union[WalkRead, EventRead]) -> str:
+        if isinstance(doc, WalkRead):
+            return f"{doc.location} {doc.city}"
+        return f"{doc.message or ''} {doc.event_type.replace('_', ' ')}"
+
+    def add(self, doc: Union[WalkRead, EventRead]) -> None:
+        self.index.add(self._key(doc), self._text(doc))
+
+    def remove(self, doc: Union[WalkRead, EventRead]) -> None:
+        self.index.remove(self._key(doc))
+
+    def replace(self, old: Union[WalkRead, EventRead], new: Union[WalkRead, EventRead]) -> None:
+        # Most walk updates are status changes; only reindex when the text changed.
+        if self._text(old) != self._text(new):
+            self.add(new)
+
+    def search(self, query: str, limit: int = 20, kind: Optional[str] = None):
+        return self.index.search(query, limit, kinds=(kind,) if kind else None)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimerWheel:
+    """Hierarchical hashed timer wheel (Varghese & Lauck).
+
+    ``levels`` wheels of ``slots`` buckets each; level ``n`` buckets span
+    ``slots ** n`` ticks. Scheduling and cancelling are O(1); each tick only
+    touches the current level-0 bucket plus, on wrap-around, one bucket of a
+    coarser level whose timers are cascaded down. Deadlines beyond the top
+    level wait in an overflow bucket that is re-sorted once per full turn.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4, now: float = 0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._lock = threading.Lock()
+        self._wheels: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, int] = {}
+        self._due: Dict[Hashable, int] = {}
+        self._where: Dict[Hashable, Dict[Hashable, int]] = {}
+        self._now = math.floor(now / tick)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _place(self, key: Hashable, at: int) -> None:
+        delta = at - self._now
+        if delta <= 0:
+            bucket = self._due
+        else:
+            bucket = self._overflow
+            span = 1
+            for level in range(self.levels):
+                if delta < span * self.slots:
+                    bucket = self._wheels[level][(at // span) % self.slots]
+                    break
+                span *= self.slots
+        bucket[key] = at
+        self._where[key] = bucket
+
+    def _cancel(self, key: Hashable) -> None:
+        bucket = self._where.pop(key, None)
+        if bucket is not None:
+            del bucket[key]
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """(Re)schedule ``key`` to expire at ``deadline`` (seconds, same clock as ``advance``)."""
+        with self._lock:
+            self._cancel(key)
+            self._place(key, math.ceil(deadline / self.tick))
+
+    def cancel(self, key: Hashable) -> None:
+        with self._lock:
+            self._cancel(key)
+
+    def advance(self, now: float) -> List[Tuple[Hashable, int]]:
+        """Move the wheel forward to ``now`` and return ``(key, tick)`` for every expired timer."""
+        target = math.floor(now / self.tick)
+        expired: List[Tuple[Hashable, int]] = []
+        with self._lock:
+            while True:
+                for key, at in self._due.items():
+                    del self._where[key]
+                    expired.append((key, at))
+                self._due.clear()
+                if self._now >= target:
+                    break
+                self._now += 1
+                self._cascade()
+                bucket = self._wheels[0][self._now % self.slots]
+                for key, at in list(bucket.items()):
+                    if at <= self._now:
+                        del bucket[key]
+                        del self._where[key]
+                        expired.append((key, at))
+        return expired
+
+    def _cascade(self) -> None:
+        span = 1
+        for level in range(1, self.levels + 1):
+            span *= self.slots
+            if self._now % span:
+                return
+            if level == self.levels:
+                pending, self._overflow = self._overflow, {}
+            else:
+                index = (self._now // span) % self.slots
+                pending = self._wheels[level][index]
+                self._wheels[level][index] = {}
+            for key, at in pending.items():
+                self._place(key, at)
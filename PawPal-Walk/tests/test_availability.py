@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from models.availability import AvailabilityRead
+from services.availability import AvailabilityIndex
+
+START = datetime(2025, 3, 1)
+
+
+def make_window(city: str, start: datetime, hours: float) -> AvailabilityRead:
+    return AvailabilityRead(
+        walker_id=uuid4(), city=city, start_time=start, end_time=start + timedelta(hours=hours)
+    )
+
+
+def test_free_agrees_with_a_scan():
+    rng = random.Random(11)
+    index, windows = AvailabilityIndex(), {}
+    for _ in range(2_000):
+        window = make_window(
+            rng.choice(["NYC", "Boston"]),
+            START + timedelta(minutes=rng.randrange(0, 60 * 24 * 14)),
+            rng.choice([0.5, 1, 2, 4, 8]),
+        )
+        windows[window.id] = window
+        index.add(window)
+    for window_id in rng.sample(list(windows), 500):
+        index.remove(windows.pop(window_id))
+
+    for _ in range(200):
+        city = rng.choice(["NYC", "Boston"])
+        start = START + timedelta(minutes=rng.randrange(0, 60 * 24 * 14))
+        end = start + timedelta(minutes=rng.choice([30, 60, 90]))
+        expected = {
+            w.id for w in windows.values()
+            if w.city == city and w.start_time <= start and w.end_time >= end
+        }
+        assert set(index.free(city, start, end)) == expected
+
+
+def test_window_must_cover_the_whole_walk():
+    index = AvailabilityIndex()
+    window = make_window("NYC", START + timedelta(hours=9), 2)
+    index.add(window)
+
+    assert index.free("NYC", START + timedelta(hours=9), START + timedelta(hours=11)) == [window.id]
+    assert index.free("NYC", START + timedelta(hours=10), START + timedelta(hours=11, minutes=1)) == []
+    assert index.free("NYC", START + timedelta(hours=8, minutes=59), START + timedelta(hours=10)) == []
+    assert index.free("Boston", START + timedelta(hours=9), START + timedelta(hours=10)) == []
+
+
+def test_replace_moves_window_between_cities_and_times():
+    index = AvailabilityIndex()
+    window = make_window("NYC", START, 1)
+    index.add(window)
+    moved = window.model_copy(
+        update={"city": "Boston", "start_time": START + timedelta(days=1), "end_time": START + timedelta(days=1, hours=3)}
+    )
+    index.replace(window, moved)
+
+    assert index.free("NYC", START, START + timedelta(minutes=30)) == []
+    assert index.free("Boston", START + timedelta(days=1, hours=1), START + timedelta(days=1, hours=2)) == [window.id]
@@ -0,0 +1,75 @@
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from models.walk import WalkRead
+from services.bitmap_index import RoaringBitmap, WalkBitmapIndex
+
+START = datetime(2025, 1, 1)
+
+
+def make_walk(rng: random.Random, **fields) -> WalkRead:
+    values = {
+        "owner_id": uuid4(),
+        "pet_id": uuid4(),
+        "location": "Central Park",
+        "city": rng.choice(["NYC", "Boston", "Austin"]),
+        "scheduled_time": START + timedelta(minutes=rng.randrange(0, 60 * 24 * 30)),
+        "duration_minutes": 30,
+        "status": rng.choice(["requested", "accepted", "completed"]),
+    }
+    values.update(fields)
+    return WalkRead(**values)
+
+
+def test_roaring_bitmap_set_operations_across_container_kinds():
+    # A dense run (bitmap container) and sparse values (array container)
+    a, b = RoaringBitmap(), RoaringBitmap()
+    for value in list(range(0, 10_000)) + [70_000, 200_000]:
+        a.add(value)
+    for value in range(5_000, 80_000, 7):
+        b.add(value)
+
+    expected_a = set(range(0, 10_000)) | {70_000, 200_000}
+    expected_b = set(range(5_000, 80_000, 7))
+    assert set(a & b) == expected_a & expected_b
+    assert set(a | b) == expected_a | expected_b
+    assert len(a) == len(expected_a)
+
+    a.discard(70_000)
+    assert 70_000 not in a
+
+
+def test_match_agrees_with_a_scan_through_adds_removes_and_compaction():
+    rng = random.Random(7)
+    index, live = WalkBitmapIndex(), {}
+    for _ in range(6_000):
+        if live and rng.random() < 0.5:
+            index.remove(live.pop(rng.choice(list(live))))
+        else:
+            walk = make_walk(rng)
+            live[walk.id] = walk
+            index.add(walk)
+
+    assert index.match() == list(live)
+    for city in ("NYC", "Boston", "Austin"):
+        for status in ("requested", "completed"):
+            expected = [k for k, w in live.items() if w.city == city and w.status == status]
+            assert index.match(city=city, status=status) == expected
+
+    start, end = START + timedelta(days=3), START + timedelta(days=9)
+    expected = [k for k, w in live.items() if start <= w.scheduled_time < end]
+    assert index.match(scheduled_from=start, scheduled_to=end) == expected
+
+
+def test_replace_moves_walk_between_values():
+    rng = random.Random(1)
+    index = WalkBitmapIndex()
+    walk = make_walk(rng, city="NYC", status="requested")
+    index.add(walk)
+
+    accepted = walk.model_copy(update={"status": "accepted"})
+    index.replace(walk, accepted)
+
+    assert index.match(status="requested") == []
+    assert index.match(city="NYC", status="accepted") == [walk.id]
@@ -0,0 +1,66 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from models.walk import WalkRead
+from services.changes import ChangeLog
+from services.event_log import EventLog, latest_records
+
+pytest.importorskip("msgpack")
+
+
+def make_walk(**fields) -> WalkRead:
+    values = {
+        "owner_id": uuid4(), "pet_id": uuid4(), "location": "Central Park", "city": "NYC",
+        "scheduled_time": datetime(2025, 1, 1, 9, 30), "duration_minutes": 30,
+    }
+    values.update(fields)
+    return WalkRead(**values)
+
+
+def write(path, *mutations) -> None:
+    log = EventLog(str(path))
+    changes = ChangeLog(sink=log.append)
+    for resource, resource_id, op, data in mutations:
+        changes.record(resource, resource_id, op, data)
+    log.close()
+
+
+def test_latest_record_per_resource_rebuilds_the_store(tmp_path):
+    path = tmp_path / "events.log"
+    kept, gone = make_walk(), make_walk()
+    accepted = kept.model_copy(update={"status": "accepted"})
+    write(
+        path,
+        ("walk", kept.id, "create", kept),
+        ("walk", gone.id, "create", gone),
+        ("walk", kept.id, "update", accepted),
+        ("walk", gone.id, "delete", None),
+    )
+
+    records = latest_records(str(path))
+
+    assert [(seq, op, resource_id) for seq, _, op, resource_id, _, _ in records] == [
+        (3, "update", kept.id),
+        (4, "delete", gone.id),
+    ]
+    restored = WalkRead(**records[0][5])
+    assert restored == accepted
+    assert records[1][5] is None
+
+
+def test_torn_tail_is_cut_on_open_and_new_records_stay_readable(tmp_path):
+    path = tmp_path / "events.log"
+    first, second = make_walk(), make_walk()
+    write(path, ("walk", first.id, "create", first))
+    intact = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b"\x96\x02\xa4wa")  # a record cut off mid-write
+
+    assert [r[3] for r in latest_records(str(path))] == [first.id]
+
+    write(path, ("walk", second.id, "create", second))
+
+    assert path.stat().st_size > intact
+    assert {r[3] for r in latest_records(str(path))} == {first.id, second.id}
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from itertools import islice
+
+import pytest
+
+from services.recurrence import RecurrenceRule
+
+DTSTART = datetime(2025, 1, 1, 9)  # a Wednesday; rules work in naive UTC
+
+
+def expand_naively(rule: RecurrenceRule, dtstart: datetime, start: datetime, end: datetime):
+    """Walk day by day from dtstart, as a reference for the arithmetic expansion."""
+    found, ordinal, day = [], 0, dtstart
+    while day < end:
+        if rule.freq == "DAILY":
+            hit = (day - dtstart).days % rule.interval == 0
+        else:
+            week_start = dtstart - timedelta(days=dtstart.weekday())
+            weeks = (day - week_start).days // 7
+            hit = weeks % rule.interval == 0 and day.weekday() in (rule.by_weekday or (dtstart.weekday(),))
+        if hit:
+            if rule.count is not None and ordinal >= rule.count:
+                break
+            if rule.until is not None and day > rule.until:
+                break
+            if day >= start:
+                found.append(day)
+            ordinal += 1
+        day += timedelta(days=1)
+    return found
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "FREQ=DAILY",
+        "FREQ=DAILY;INTERVAL=3",
+        "FREQ=DAILY;COUNT=10",
+        "FREQ=WEEKLY",
+        "FREQ=WEEKLY;BYDAY=MO,WE,FR",
+        "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,SA;COUNT=7",
+        "FREQ=WEEKLY;BYDAY=MO,FR;UNTIL=20250301",
+    ],
+)
+def test_between_matches_day_by_day_expansion(text):
+    rule = RecurrenceRule.parse(text)
+    start, end = datetime(2025, 1, 20), datetime(2025, 4, 1)
+
+    assert list(rule.between(DTSTART, start, end)) == expand_naively(rule, DTSTART, start, end)
+
+
+def test_far_window_is_reached_without_scanning_from_dtstart():
+    rule = RecurrenceRule.parse("FREQ=WEEKLY;BYDAY=MO")
+    start = datetime(2400, 1, 1)
+
+    first = next(rule.between(DTSTART, start))
+    assert first >= start and first.weekday() == 0
+    assert first - start < timedelta(days=7)
+
+
+def test_unbounded_expansion_is_lazy_and_includes_checks_membership():
+    rule = RecurrenceRule.parse("RRULE:FREQ=DAILY;INTERVAL=2")
+    occurrences = list(islice(rule.between(DTSTART, DTSTART), 3))
+
+    assert occurrences == [DTSTART + timedelta(days=d) for d in (0, 2, 4)]
+    assert rule.includes(DTSTART, DTSTART + timedelta(days=4))
+    assert not rule.includes(DTSTART, DTSTART + timedelta(days=3))
+    assert not rule.includes(DTSTART, DTSTART + timedelta(days=4, minutes=1))
+
+
+def test_str_round_trips():
+    text = "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR;UNTIL=20250301T000000Z"
+    assert str(RecurrenceRule.parse(text)) == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "FREQ=HOURLY",
+        "FREQ=DAILY;INTERVAL=0",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=WEEKLY;BYDAY=XX",
+        "FREQ=DAILY;COUNT=3;UNTIL=20250301",
+        "FREQ=DAILY;BYMONTH=1",
+        "FREQ",
+    ],
+)
+def test_parse_rejects_invalid_rules(text):
+    with pytest.raises(ValueError):
+        RecurrenceRule.parse(text)
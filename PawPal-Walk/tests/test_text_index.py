@@ -0,0 +1,88 @@
+import random
+from datetime import datetime
+from uuid import uuid4
+
+from models.event import EventRead
+from models.walk import WalkRead
+from services.text_index import PostingList, TextIndex, WalkEventSearch
+
+
+def test_posting_list_round_trips_across_blocks():
+    postings = PostingList()
+    expected = [(doc, doc % 5 + 1) for doc in range(0, 3_000, 3)]
+    for doc, tf in expected:
+        postings.append(doc, tf)
+
+    assert list(postings) == expected
+    assert postings.count == len(expected)
+    found = [doc for docs, _ in postings.lookup([0, 3, 1_500, 1_501, 2_997]) for doc in docs]
+    assert {0, 3, 1_500, 2_997} <= set(found)
+
+
+def test_search_requires_every_token_and_matches_prefixes():
+    index = TextIndex()
+    index.add("a", "Central Park loop with the beagle")
+    index.add("b", "Riverside park")
+    index.add("c", "Central station pickup")
+
+    assert index.search("central park")[0] == 1
+    assert [key for key, _ in index.search("central park")[1]] == ["a"]
+    assert {key for key, _ in index.search("cent")[1]} == {"a", "c"}
+    assert index.search("harbor") == (0, [])
+
+
+def test_exact_match_outranks_prefix_and_shorter_doc_ranks_higher():
+    index = TextIndex()
+    index.add("prefix", "parkway")
+    index.add("exact", "park")
+    assert [key for key, _ in index.search("park")[1]] == ["exact", "prefix"]
+
+    index = TextIndex()
+    index.add("long", "park " + "filler " * 20)
+    index.add("short", "park")
+    assert [key for key, _ in index.search("park")[1]] == ["short", "long"]
+
+
+def test_removed_docs_disappear_before_and_after_compaction():
+    rng = random.Random(3)
+    index = TextIndex(compact_min_dead=50)
+    words = ["leash", "fetch", "treat", "puddle", "squirrel"]
+    docs = {}
+    for i in range(400):
+        docs[i] = " ".join(rng.choice(words) for _ in range(4))
+        index.add(i, docs[i])
+    for i in range(400):
+        if i % 3:
+            index.remove(i)
+            del docs[i]
+
+    def assert_matches():
+        for word in words:
+            total, top = index.search(word, limit=1_000)
+            expected = {i for i, text in docs.items() if word in text.split()}
+            assert total == len(expected)
+            assert {key for key, _ in top} == expected
+
+    assert_matches()
+    index.compact()
+    assert index.stats()["dead_docs"] == 0
+    assert_matches()
+
+
+def test_walk_event_search_filters_by_kind_and_reindexes_changed_text():
+    search = WalkEventSearch()
+    walk = WalkRead(
+        owner_id=uuid4(), pet_id=uuid4(), location="Prospect Park", city="Brooklyn",
+        scheduled_time=datetime(2025, 1, 1, 9), duration_minutes=30,
+    )
+    event = EventRead(walk_id=walk.id, event_type="photo_uploaded", message="Dog at the park")
+    search.add(walk)
+    search.add(event)
+
+    assert search.search("park")[0] == 2
+    assert [key for key, _ in search.search("park", kind="event")[1]] == [("event", event.id)]
+
+    moved = walk.model_copy(update={"location": "Fort Greene"})
+    search.replace(walk, moved)
+    assert search.search("greene", kind="walk")[1][0][0] == ("walk", walk.id)
+    assert search.search("prospect")[0] == 0
@@ -0,0 +1,112 @@
+"""MessagePack content negotiation for walk and event endpoints.
+
+Bodies sent as ``application/msgpack`` are decoded before validation, and
+clients that ``Accept`` msgpack get compact binary responses: UUIDs travel as
+16-byte ``bin`` values and datetimes as msgpack Timestamps (ext -1, naive
+values meaning UTC) instead of strings. Pydantic accepts both forms as-is on
+the way in, so decoding needs no per-value Python hooks.
+"""
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, List, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+# Optional dependency - JSON keeps working if msgpack is not installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _is_msgpack(header: Optional[str]) -> bool:
+    if not header:
+        return False
+    return any(part.split(";")[0].strip().lower() in MSGPACK_TYPES for part in header.split(","))
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, uuid.UUID):
+        return obj.bytes
+    if isinstance(obj, datetime):
+        if obj.tzinfo is not None:
+            return msgpack.Timestamp.from_datetime(obj)
+        # Cheaper than Timestamp.from_datetime for the naive-UTC values we store
+        delta = obj - _EPOCH
+        return msgpack.Timestamp(delta.days * 86400 + delta.seconds, delta.microseconds * 1000)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to msgpack")
+
+
+def packb(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default, datetime=False)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, timestamp=3)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_TYPES[0]
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
+
+
+def wants_msgpack(request: Request) -> bool:
+    return msgpack is not None and _is_msgpack(request.headers.get("accept"))
+
+
+def negotiate(request: Request, content: Any, status_code: int = 200) -> Any:
+    """Return ``content`` unchanged for JSON clients, or a MsgPackResponse if the client accepts it."""
+    if not wants_msgpack(request):
+        return content
+    if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+        content = _list_adapter(type(content[0])).dump_python(content)
+    elif isinstance(content, BaseModel):
+        content = content.model_dump()
+    return MsgPackResponse(content, status_code=status_code)
+
+
+class MsgPackRequest(Request):
+    """Request whose ``json()`` decodes a msgpack body."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = unpackb(await self.body())
+        return self._json
+
+
+class MsgPackRoute(APIRoute):
+    """Route class that accepts ``application/msgpack`` request bodies.
+
+    FastAPI only parses bodies it recognises as JSON, or bodies without a
+    content type, via ``request.json()``. For msgpack bodies the content-type
+    header is dropped and the request is wrapped so ``json()`` decodes msgpack.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if _is_msgpack(request.headers.get("content-type")):
+                if msgpack is None:
+                    return Response(status_code=415)
+                scope = dict(request.scope)
+                scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"content-type"]
+                request = MsgPackRequest(scope, request.receive)
+            return await handler(request)
+
+        return route_handler
@@ -1,21 +1,43 @@
 import json
+import queue
+import threading
 import uuid
 from datetime import datetime
 
 PROJECT_ID = "w4153-walk-service"
 TOPIC_ID = "walk-events"
 
-# Initialize Pub/Sub client (optional - fails gracefully if not configured)
+# Pub/Sub client (optional - fails gracefully if not configured). Created on
+# first use rather than at import: importing the client pulls in gRPC and runs
+# credential discovery, which would otherwise delay every cold start.
 publisher = None
 topic_path = None
+_init_lock = threading.Lock()
+_init_done = False
 
-try:
-    from google.cloud import pubsub_v1
-    publisher = pubsub_v1.PublisherClient()
-    topic_path = publisher.topic_path(PROJECT_ID, TOPIC_ID)
-    print(f"Pub/Sub initialized: {topic_path}")
-except Exception as e:
-    print(f"Warning: Pub/Sub not available: {e}")
+
+def get_publisher():
+    """Return the Pub/Sub publisher, creating it on first call; None if unavailable."""
+    global publisher, topic_path, _init_done
+    if _init_done:
+        return publisher
+    with _init_lock:
+        if not _init_done:
+            try:
+                from google.cloud import pubsub_v1
+                client = pubsub_v1.PublisherClient()
+                topic_path = client.topic_path(PROJECT_ID, TOPIC_ID)
+                publisher = client
+                print(f"Pub/Sub initialized: {topic_path}")
+            except Exception as e:
+                print(f"Warning: Pub/Sub not available: {e}")
+            _init_done = True
+    return publisher
+
+
+def warm_up():
+    """Build the publisher ahead of the first publish (run off the event loop)."""
+    get_publisher()
 
 
 def encode(obj):
@@ -29,9 +51,12 @@ def encode(obj):
     return obj
 
 
-def publish_event(event_type: str, data: dict):
-    """Publish event to Pub/Sub. Fails silently if Pub/Sub is not configured."""
-    if publisher is None:
+def publish_event(event_type: str, data: dict, version=None):
+    """Publish event to Pub/Sub. Fails silently if Pub/Sub is not configured.
+
+    ``version`` orders messages about the same resource (newer compares greater).
+    """
+    if get_publisher() is None:
         print(f"Skipping event '{event_type}': Pub/Sub not configured")
         return None
 
@@ -41,6 +66,8 @@ def publish_event(event_type: str, data: dict):
             "data": data,
             "timestamp": datetime.utcnow().isoformat(),
         }
+        if version is not None:
+            message["version"] = version
 
         # Convert all nested objects into JSON-safe versions
         message_json = json.dumps(message, default=encode)
@@ -52,4 +79,52 @@ def publish_event(event_type: str, data: dict):
         return future.result(timeout=5)  # Add timeout to prevent hanging
     except Exception as e:
         print(f"Warning: Failed to publish event '{event_type}': {e}")
-        return None  # Don't fail the request if Pub/Sub is unavailable
\ No newline at end of file
+        return None  # Don't fail the request if Pub/Sub is unavailable
+
+class PublishQueue:
+    """Publishes events one at a time, in submission order, on a single thread.
+
+    ``submit`` never blocks the caller: the backlog is bounded at ``maxsize``
+    and further events are dropped (and counted in ``stats``) until the
+    thread catches up. The thread starts on the first submit.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"queued": 0, "published": 0, "dropped": 0}
+
+    def submit(self, event_type: str, data: dict, version=None) -> bool:
+        """Queue an event; False if the backlog is full and it was dropped."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="pubsub-publisher", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((event_type, data, version))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            print(f"Warning: publish backlog full, dropping event '{event_type}'")
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            publish_event(*item)
+            self.stats["published"] += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Publish what is queued (up to ``timeout`` seconds), then stop the thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
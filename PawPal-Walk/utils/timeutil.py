@@ -0,0 +1,13 @@
+from datetime import datetime, timezone
+
+
+def as_utc(dt: datetime) -> datetime:
+    """Return ``dt`` as a naive UTC datetime (the convention used by ``datetime.utcnow``)."""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_epoch(dt: datetime) -> float:
+    """Seconds since the Unix epoch; naive datetimes are taken to be UTC."""
+    return as_utc(dt).replace(tzinfo=timezone.utc).timestamp()